@@ -184,3 +184,27 @@ else:
             "BACKEND": "channels.layers.InMemoryChannelLayer"
         }
     }
+
+# Reachability engine for legal-move generation (game/engine/move_validator.py):
+# 'bitboard' (default), 'bfs' or 'numpy' (needs numpy installed, else falls
+# back to 'bfs'). All produce identical move sets.
+GAME_MOVE_ENGINE = os.environ.get('GAME_MOVE_ENGINE', 'bitboard').strip() or 'bitboard'
+
+# JSON codec for WebSocket frames and structured logs (game/utils.py): 'auto'
+# (default - the fastest installed), 'orjson', 'msgspec', 'ujson' or 'json'.
+GAME_JSON_CODEC = os.environ.get('GAME_JSON_CODEC', 'auto').strip() or 'auto'
+
+# Offer the MessagePack subprotocol (game/wire.py). Its frames are about a
+# third smaller than JSON, but encoding and decoding them is slower than the
+# orjson path (manage.py bench_json_codecs), so it is off unless bandwidth
+# matters more than server CPU.
+GAME_MSGPACK_WIRE = _env_bool('GAME_MSGPACK_WIRE', False)
+
+# Seconds a live game's in-memory state may stay unsaved (game/live_games.py).
+# Moves within the window are coalesced into one database write; game endings
+# and disconnects are always written immediately.
+GAME_STATE_FLUSH_DELAY = float(os.environ.get('GAME_STATE_FLUSH_DELAY', '0.5'))
+
+# Turns between full board snapshots in GameState.board_state. In between,
+# writes carry only each move's changed cells (GameMove.delta).
+GAME_STATE_SNAPSHOT_INTERVAL = int(os.environ.get('GAME_STATE_SNAPSHOT_INTERVAL', '20'))
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game'
+
+    def ready(self):
+        from django.conf import settings
+        from .engine.move_validator import set_move_engine
+        from .live_games import flush_all_on_shutdown
+        from .utils import set_json_codec
+
+        set_move_engine(getattr(settings, 'GAME_MOVE_ENGINE', 'bitboard'))
+        set_json_codec(getattr(settings, 'GAME_JSON_CODEC', 'auto'))
+        flush_all_on_shutdown()
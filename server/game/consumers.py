@@ -4,7 +4,6 @@ Uses Django ORM models instead of in-memory class-level dictionaries
 """
 import asyncio
 import datetime
-import json
 import logging
 import random
 import secrets
@@ -14,30 +13,37 @@ import uuid
 from collections import deque
 from datetime import timedelta
 
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.db import transaction
 from django.utils import timezone
 
-from typing import Optional, Any, Dict, cast, Union
+from typing import Optional, Any, Callable, ClassVar, Dict, Tuple, cast, Union
 from .models import (
     GameRoom,
     GameChallenge,
     PlayerConnection,
     PlayerReadyStatus,
     GameState,
+    GameConfigBlob,
+    GameMove,
 )
-from .validators import (
-    ValidationError, validate_required_fields, validate_username,
-    validate_status, validate_game_mode, validate_game_options,
-    validate_chat_message
-)
+from .validators import ValidationError
+from . import messages
+from .messages import decode_frame, decode_message, handles, message_dispatch
 from .utils import (
-    send_json_response, send_error, broadcast_to_group,
+    send_json_response, send_frames, encode_frames, send_error, broadcast_to_group, group_send_event,
+    decode_json, JsonDecodeError,
     get_challenge_expiration_time, structured_log, get_idempotency, set_idempotency
 )
-from .engine import load_config, build_initial_board, DEFAULT_CONFIG
-from .engine.board import HexBoard, parse_coord
-from .engine.game_logic import get_legal_moves_filtered, resolve_combat, detect_outcome
+from .engine import load_config, compiled_configs, get_compiled_config
+from .engine.board import coord_key, parse_coord
+from .engine.game_logic import detect_outcome, keep_move, make_move, unmake_move
+from .engine.move_cache import legal_move_cache
+from .engine.move_validator import get_all_legal_move_keys
+from .live_games import live_games
+from . import wire
 
 logger = logging.getLogger('game')
 
@@ -58,6 +64,11 @@ DISCONNECT_GRACE_SECONDS = 30
 # Key: (game_id, username), Value: asyncio.Task
 _pending_disconnect_timers: dict = {}
 
+# Which move_made form each of this process's game-room connections takes,
+# so a move encodes only the forms someone reads (see _move_made_forms).
+# Key: game_id, Value: {channel_name: board_deltas}
+_room_move_forms: Dict[str, Dict[str, bool]] = {}
+
 # Per-connection flood protection. Rate limiting is naturally per-connection
 # here (not shared/Redis-backed) since Channels gives each WebSocket its own
 # consumer instance for its whole lifetime - no cross-process state needed.
@@ -66,17 +77,64 @@ RATE_LIMIT_WINDOW_SECONDS = 10
 RATE_LIMIT_MAX_MESSAGES = 30  # ~3/sec sustained, generous burst allowance
 
 
-def _extract_secret(data: Dict[str, Any]) -> str:
-    """Pull the client-asserted identity secret out of an incoming message."""
-    return str(data.get('secret') or '').strip()[:64]
-
-
+def _board_hash(board) -> str:
+    """A board's Zobrist hash as sent to clients: 16 hex digits (a 64-bit
+    integer doesn't survive a JavaScript number)."""
+    return f'{board.zobrist_hash:016x}'
+
+
+def _move_made_forms(game_id: str) -> Tuple[bool, bool]:
+    """(full, delta): whether anyone in the room takes move_made with the
+    whole board, and whether anyone takes it as a delta. With a channel
+    layer shared between processes the room may have members elsewhere,
+    so both are sent."""
+    if live_games.shared:
+        return True, True
+    forms = _room_move_forms.get(game_id, {}).values()
+    return not all(forms), any(forms)
+
+
+def _forget_move_form(game_id: str, channel_name: str) -> None:
+    forms = _room_move_forms.get(game_id)
+    if forms is not None:
+        forms.pop(channel_name, None)
+        if not forms:
+            del _room_move_forms[game_id]
+
+
+def game_state_update(game_id: str, state, include_config: bool = True) -> Dict[str, Any]:
+    """The full-resync ``game_state_update`` message for a live game."""
+    update = {
+        'type': 'game_state_update',
+        'gameId': game_id,
+        'boardState': state.board_state,
+        'currentTurn': state.current_turn,
+        'turnNumber': state.turn_number,
+        'moveHistory': state.move_history,
+        'playerWhite': state.player_white,
+        'playerBlack': state.player_black,
+        'winner': state.winner,
+        'endReason': state.end_reason,
+        'configHash': state.config_hash,
+        'boardHash': _board_hash(state.board),
+        'turnStartedAt': (state.turn_started_at or timezone.now()).isoformat(),
+        'drawOfferedBy': state.draw_offered_by or '',
+    }
+    if include_config:
+        update['config'] = state.config_snapshot
+    return update
+
+
+@message_dispatch
 class GameConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer handling all game and lobby operations.
     Uses async/await pattern with database operations for thread-safety.
     """
 
+    # message type -> handler, filled in by @message_dispatch
+    message_handlers: ClassVar[Dict[str, Callable[..., Any]]]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Initialize as strings to satisfy type checks for broadcast/group methods
@@ -87,6 +145,9 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.leaving_game_room = False  # Track if user is leaving to lobby
         self._last_activity_update = None  # Throttle activity updates
         self._message_timestamps: deque = deque()  # sliding-window rate limit
+        self.board_deltas = False  # move_made carries changed cells only (join_game_room)
+        self.legal_moves = False  # move_made carries our move map on our turn (join_game_room)
+        self.wire_format = 'json'  # or 'msgpack', negotiated in connect (see wire.py)
     
     async def connect(self):
         """Handle WebSocket connection"""
@@ -102,7 +163,13 @@ class GameConsumer(AsyncWebsocketConsumer):
                 await self.channel_layer.group_add(self.room_group_name, self.channel_name)
             # For game rooms, we'll add to the group in _handle_join_game_room after validation
             
-            await self.accept()
+            # Clients offering the MessagePack subprotocol get binary frames,
+            # if it is enabled at all (it costs more CPU than JSON; see wire.py)
+            subprotocol = None
+            if wire.enabled() and wire.SUBPROTOCOL in self.scope.get('subprotocols', ()):
+                subprotocol = wire.SUBPROTOCOL
+                self.wire_format = 'msgpack'
+            await self.accept(subprotocol)
             
             await send_json_response(self, {
                 'type': 'connection_established',
@@ -144,6 +211,8 @@ class GameConsumer(AsyncWebsocketConsumer):
             # For game rooms, users are only added after validation, so this is safe
             if self.room_name == 'lobby' or self.game_id:
                 await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+            if self.game_id:
+                _forget_move_form(self.game_id, self.channel_name)
         except Exception as e:
             logger.error(f"Error during disconnect cleanup: {e}")
     
@@ -193,6 +262,9 @@ class GameConsumer(AsyncWebsocketConsumer):
             # is left running: if the disconnected player was on the clock it
             # should still expire normally.
             await self._start_disconnect_grace_timer(self.game_id, self.username)
+            # Get this game onto disk while only one player is around (the
+            # others keep their write-behind batching)
+            await live_games.flush_or_retry(self.game_id)
             await broadcast_to_group(self.channel_layer, self.room_group_name, {
                 'type': 'opponent_disconnected',
                 'username': self.username,
@@ -232,42 +304,27 @@ class GameConsumer(AsyncWebsocketConsumer):
                 await send_error(self, 'RATE_LIMITED', 'Too many messages - please slow down')
                 return
 
-            data = json.loads(incoming_data)
-            message_type = data.get('type', '')
+            # Parsed and validated in one pass; a malformed message never
+            # reaches its handler. A JSON frame goes straight to its struct
+            # where msgspec allows; anything else takes the dict path, which
+            # answers for unknown types and malformed messages.
+            packed = self.wire_format == 'msgpack' and isinstance(incoming_data, bytes)
+            message = decode_frame(incoming_data) if not packed else None
+            if message is not None:
+                message_type = message.type
+            else:
+                if isinstance(incoming_data, bytes) and packed:
+                    data = wire.unpack_request(incoming_data)
+                else:
+                    data = decode_json(incoming_data)
+                message = decode_message(data)
+                message_type = message.type if message is not None else data.get('type', '')
 
-            logger.debug(f"Message received from {self.username}: {message_type}")
             structured_log('debug', 'message_received', username=self.username, message_type=message_type)
 
-            handlers = {
-                'join_lobby': self._handle_join_lobby,
-                'leave_lobby': self._handle_leave_lobby,
-                'chat_message': self._handle_chat_message,
-                'change_username': self._handle_change_username,
-                'set_status': self._handle_set_status,
-                'game_challenge': self._handle_game_challenge,
-                'challenge_accept': self._handle_challenge_accept,
-                'challenge_decline': self._handle_challenge_decline,
-                'join_game_room': self._handle_join_game_room,
-                'leave_game_room': self._handle_leave_game_room,
-                'game_room_message': self._handle_game_room_message,
-                'player_ready': self._handle_player_ready,
-                'player_unready': self._handle_player_unready,
-                'change_game_mode': self._handle_change_game_mode,
-                'set_custom_config': self._handle_set_custom_config,
-                'request_reveal_mode': self._handle_request_reveal_mode,
-                'reveal_response': self._handle_reveal_response,
-                'start_game': self._handle_start_game,
-                'request_user_list': self._handle_request_user_list,
-                'heartbeat': self._handle_heartbeat,
-                # Gameplay handlers (in-game)
-                'make_move': self._handle_make_move,
-                'resign': self._handle_resign,
-                'offer_draw': self._handle_offer_draw,
-                'respond_draw': self._handle_respond_draw,
-                'request_game_state': self._handle_request_game_state,
-            }
-            
-            handler = handlers.get(message_type)
+            # type -> handler, collected once when the class was created
+            # (see messages.message_dispatch)
+            handler = self.message_handlers.get(message_type) if message is not None else None
             if handler:
                 # touch last_activity for presence (throttled to every 10 seconds)
                 if self.username:
@@ -282,11 +339,14 @@ class GameConsumer(AsyncWebsocketConsumer):
                             self._last_activity_update = now
                         except Exception:
                             structured_log('warning', 'update_activity_failed', username=self.username)
-                await handler(data)
+                await handler(self, message)
             else:
                 logger.warning(f"Unknown message type: {message_type}")
         
-        except json.JSONDecodeError as e:
+        except wire.WireDecodeError as e:
+            logger.error(f"Invalid MessagePack received: {e}")
+            await send_error(self, 'INVALID_MESSAGE', 'Message must be a valid MessagePack map')
+        except JsonDecodeError as e:
             logger.error(f"Invalid JSON received: {e}")
             await send_error(self, 'INVALID_JSON', 'Message must be valid JSON')
         except ValidationError as e:
@@ -298,25 +358,24 @@ class GameConsumer(AsyncWebsocketConsumer):
     
     # ==================== Message Handlers ====================
     
-    async def _handle_join_lobby(self, data):
+    @handles(messages.JoinLobby)
+    async def _handle_join_lobby(self, msg):
         """Handle user joining the lobby"""
         try:
-            username = data.get('username', '').strip()
+            username = msg.username
             original_username = username
             username_was_taken = False
-            client_secret = _extract_secret(data)
-
-            validate_username(username)
+            client_secret = msg.secret
 
             existing_connection = await self._get_player_connection(username)
             if existing_connection and existing_connection.channel_name != self.channel_name:
                 # ponytail: single seam for identity verification - replace this
                 # comparison with real credential checking if accounts are added later.
                 secret_ok = bool(existing_connection.secret) and existing_connection.secret == client_secret
-                if data.get('rejoining', False) and secret_ok:
+                if msg.rejoining and secret_ok:
                     logger.info(f"User {username} rejoining lobby with new channel")
                 else:
-                    if data.get('rejoining', False):
+                    if msg.rejoining:
                         logger.warning(f"Rejected rejoin claim for '{username}': secret mismatch")
                     # Generate a random username instead of rejecting
                     random_suffix = ''.join(random.choices(string.digits, k=6))
@@ -336,7 +395,7 @@ class GameConsumer(AsyncWebsocketConsumer):
                 })
             
             # Notify others (only if not rejoining, to avoid duplicate notifications)
-            if not data.get('rejoining', False):
+            if not msg.rejoining:
                 await broadcast_to_group(self.channel_layer, self.room_group_name, {
                     'type': 'user_joined',
                     'username': username
@@ -344,17 +403,16 @@ class GameConsumer(AsyncWebsocketConsumer):
             
             await self._send_user_list()
             
-            logger.info(f"User {username} joined lobby (rejoining: {data.get('rejoining', False)})")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+            logger.info(f"User {username} joined lobby (rejoining: {msg.rejoining})")
         except Exception as e:
             logger.error(f"Error in join_lobby: {e}")
             await send_error(self, 'INTERNAL_ERROR', str(e))
     
-    async def _handle_leave_lobby(self, data):
+    @handles(messages.LeaveLobby)
+    async def _handle_leave_lobby(self, msg):
         """Handle user leaving the lobby"""
         try:
-            username = data.get('username', '').strip()
+            username = msg.username
             
             if self.username != username:
                 await send_error(self, 'INVALID_REQUEST', 'Cannot leave as different user')
@@ -374,566 +432,509 @@ class GameConsumer(AsyncWebsocketConsumer):
             logger.error(f"Error in leave_lobby: {e}")
             await send_error(self, 'INTERNAL_ERROR', str(e))
     
-    async def _handle_chat_message(self, data):
+    @handles(messages.ChatMessage)
+    async def _handle_chat_message(self, msg):
         """Handle chat message in lobby (or from game room to lobby)"""
-        try:
-            validate_required_fields(data, ['content'])
-            validate_chat_message(data['content'])
-            
-            # Broadcast to lobby group only
-            # Game room users are also in the lobby group, so they'll receive this too
-            await broadcast_to_group(self.channel_layer, 'game_lobby', {
-                'type': 'chat_message',
-                'username': self.username,
-                'content': data['content'],
-                'timestamp': data.get('timestamp', datetime.datetime.now().isoformat())
-            })
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        # Broadcast to lobby group only
+        # Game room users are also in the lobby group, so they'll receive this too
+        await broadcast_to_group(self.channel_layer, 'game_lobby', {
+            'type': 'chat_message',
+            'username': self.username,
+            'content': msg.content,
+            'timestamp': msg.timestamp or datetime.datetime.now().isoformat()
+        })
     
-    async def _handle_change_username(self, data):
+    @handles(messages.ChangeUsername)
+    async def _handle_change_username(self, msg):
         """Handle username change request"""
-        try:
-            old_username = data.get('oldUsername', '').strip()
-            new_username = data.get('newUsername', '').strip()
-            client_secret = _extract_secret(data)
+        old_username = msg.old_username
+        new_username = msg.new_username
+        client_secret = msg.secret
 
-            validate_username(new_username)
-
-            if self.username != old_username:
-                await send_error(self, 'INVALID_REQUEST', 'Cannot change username for another user')
-                return
+        if self.username != old_username:
+            await send_error(self, 'INVALID_REQUEST', 'Cannot change username for another user')
+            return
 
-            existing = await self._get_player_connection(new_username)
-            if existing:
-                await send_error(self, 'USERNAME_TAKEN', f'Username "{new_username}" is already taken')
-                return
+        existing = await self._get_player_connection(new_username)
+        if existing:
+            await send_error(self, 'USERNAME_TAKEN', f'Username "{new_username}" is already taken')
+            return
 
-            # Update in database - first delete old, then create new to avoid duplicates
-            # This is more reliable than updating in place
-            await self._delete_player_connection(old_username, channel_name=self.channel_name)
-            await self._create_or_update_player_connection(new_username, self.channel_name, 'online', secret=client_secret)
-            
-            self.username = new_username
-            
-            await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                'type': 'username_changed',
-                'oldUsername': old_username,
-                'newUsername': new_username
-            })
-            
-            await self._send_user_list()
-            
-            logger.info(f"User renamed from {old_username} to {new_username}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        # Update in database - first delete old, then create new to avoid duplicates
+        # This is more reliable than updating in place
+        await self._delete_player_connection(old_username, channel_name=self.channel_name)
+        await self._create_or_update_player_connection(new_username, self.channel_name, 'online', secret=client_secret)
+        
+        self.username = new_username
+        
+        await broadcast_to_group(self.channel_layer, self.room_group_name, {
+            'type': 'username_changed',
+            'oldUsername': old_username,
+            'newUsername': new_username
+        })
+        
+        await self._send_user_list()
+        
+        logger.info(f"User renamed from {old_username} to {new_username}")
     
-    async def _handle_set_status(self, data):
+    @handles(messages.SetStatus)
+    async def _handle_set_status(self, msg):
         """Handle player status change"""
-        try:
-            username = data.get('username', '').strip()
-            status = data.get('status', '').strip()
-            
-            if self.username != username:
-                await send_error(self, 'INVALID_REQUEST', 'Cannot set status for another user')
-                return
-            
-            validate_status(status)
-            
-            await self._update_player_status(username, status)
-            
-            await self._send_user_list()
-            
-            # If user is in a game room, also send updated player list to that room
-            if self.game_id:
-                game = await self._get_game_by_id(self.game_id)
-                if game:
-                    is_inviter = username == game.host
-                    await self._send_game_player_list(self.game_id, is_inviter)
-            
-            logger.info(f"User {username} status changed to {status}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        username = msg.username
+        status = msg.status
+        
+        if self.username != username:
+            await send_error(self, 'INVALID_REQUEST', 'Cannot set status for another user')
+            return
+        
+        await self._update_player_status(username, status)
+        
+        await self._send_user_list()
+        
+        # If user is in a game room, also send updated player list to that room
+        if self.game_id:
+            game = await self._get_game_by_id(self.game_id)
+            if game:
+                is_inviter = username == game.host
+                await self._send_game_player_list(self.game_id, is_inviter)
+        
+        logger.info(f"User {username} status changed to {status}")
     
-    async def _handle_game_challenge(self, data):
+    @handles(messages.GameChallenge)
+    async def _handle_game_challenge(self, msg):
         """Handle game challenge/invitation"""
-        try:
-            validate_required_fields(data, ['challenger', 'opponent'])
-            
-            challenger = data.get('challenger', '').strip()
-            opponent = data.get('opponent', '').strip()
-            
-            if self.username != challenger:
-                await send_error(self, 'INVALID_REQUEST', 'Can only challenge as yourself')
-                return
-            
-            if challenger == opponent:
-                await send_error(self, 'INVALID_OPPONENT', 'Cannot challenge yourself')
-                return
-            
-            # Validate both users exist and are online (batch query for efficiency)
-            connections = await self._get_player_connections_batch([challenger, opponent])
-            challenger_conn = connections.get(challenger)
-            opponent_conn = connections.get(opponent)
-            
-            if not challenger_conn or not opponent_conn:
-                await send_error(self, 'USER_NOT_FOUND', 'One or both users not found')
-                return
-            
-            # Check if challenger is available (not already in-game or invited)
-            if challenger_conn.status in ['in-game', 'invited']:
-                await send_error(self, 'CHALLENGER_BUSY', 'You are already in a game or have a pending invite')
+        challenger = msg.challenger
+        opponent = msg.opponent
+        
+        if self.username != challenger:
+            await send_error(self, 'INVALID_REQUEST', 'Can only challenge as yourself')
+            return
+        
+        if challenger == opponent:
+            await send_error(self, 'INVALID_OPPONENT', 'Cannot challenge yourself')
+            return
+        
+        # Validate both users exist and are online (batch query for efficiency)
+        connections = await self._get_player_connections_batch([challenger, opponent])
+        challenger_conn = connections.get(challenger)
+        opponent_conn = connections.get(opponent)
+        
+        if not challenger_conn or not opponent_conn:
+            await send_error(self, 'USER_NOT_FOUND', 'One or both users not found')
+            return
+        
+        # Check if challenger is available (not already in-game or invited)
+        if challenger_conn.status in ['in-game', 'invited']:
+            await send_error(self, 'CHALLENGER_BUSY', 'You are already in a game or have a pending invite')
+            return
+        
+        # Check if opponent is available (not already in-game or invited)
+        if opponent_conn.status in ['in-game', 'invited']:
+            status_msg = 'in a game' if opponent_conn.status == 'in-game' else 'handling an invite'
+            await send_error(self, 'OPPONENT_BUSY', f'{opponent} is currently {status_msg}')
+            return
+        
+        # Check if opponent already has a pending challenge from this challenger
+        existing = await self._get_challenge(challenger, opponent)
+        if existing:
+            if existing.status == 'pending':
+                await send_error(self, 'CHALLENGE_EXISTS', 'You have already challenged this user')
                 return
-            
-            # Check if opponent is available (not already in-game or invited)
-            if opponent_conn.status in ['in-game', 'invited']:
-                status_msg = 'in a game' if opponent_conn.status == 'in-game' else 'handling an invite'
-                await send_error(self, 'OPPONENT_BUSY', f'{opponent} is currently {status_msg}')
+            else:
+                # Delete old declined/expired challenges to allow re-invitation
+                await self._delete_challenge(existing)
+        
+        idem_key = msg.idempotency_key
+        if idem_key:
+            prior = get_idempotency(idem_key)
+            if prior:
+                await send_json_response(self, {
+                    'type': 'challenge_existing',
+                    'invite_id': prior.get('invite_id')
+                })
+                structured_log('info', 'challenge_idempotent_hit', key=idem_key, challenger=challenger, opponent=opponent)
                 return
-            
-            # Check if opponent already has a pending challenge from this challenger
-            existing = await self._get_challenge(challenger, opponent)
-            if existing:
-                if existing.status == 'pending':
-                    await send_error(self, 'CHALLENGE_EXISTS', 'You have already challenged this user')
-                    return
-                else:
-                    # Delete old declined/expired challenges to allow re-invitation
-                    await self._delete_challenge(existing)
-            
-            idem_key = data.get('idempotency_key')
-            if idem_key:
-                prior = get_idempotency(idem_key)
-                if prior:
-                    await send_json_response(self, {
-                        'type': 'challenge_existing',
-                        'invite_id': prior.get('invite_id')
-                    })
-                    structured_log('info', 'challenge_idempotent_hit', key=idem_key, challenger=challenger, opponent=opponent)
-                    return
 
-            challenge = await self._create_challenge(challenger, opponent)
-            if idem_key:
-                try:
-                    set_idempotency(idem_key, {'invite_id': challenge.challenge_id}, timeout=60)
-                except Exception:
-                    structured_log('warning', 'idempotency_set_failed', key=idem_key)
-            
-            # Set both players' status to 'invited' so third parties can't invite them
-            await self._update_player_status(challenger, 'invited')
-            await self._update_player_status(opponent, 'invited')
-            
-            await self._send_user_list()
-            
-            await self.channel_layer.send(opponent_conn.channel_name, {
-                'type': 'send_game_challenge',
-                'challenger': challenger,
-                'opponent': opponent,
-                'invite_id': challenge.challenge_id
-            })
-            
-            logger.info(f"Challenge created: {challenger} -> {opponent}")
-            structured_log('info', 'challenge_created', challenger=challenger, opponent=opponent, invite_id=challenge.challenge_id)
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        challenge = await self._create_challenge(challenger, opponent)
+        if idem_key:
+            try:
+                set_idempotency(idem_key, {'invite_id': challenge.challenge_id}, timeout=60)
+            except Exception:
+                structured_log('warning', 'idempotency_set_failed', key=idem_key)
+        
+        # Set both players' status to 'invited' so third parties can't invite them
+        await self._update_player_status(challenger, 'invited')
+        await self._update_player_status(opponent, 'invited')
+        
+        await self._send_user_list()
+        
+        await self.channel_layer.send(opponent_conn.channel_name, {
+            'type': 'send_game_challenge',
+            'challenger': challenger,
+            'opponent': opponent,
+            'invite_id': challenge.challenge_id
+        })
+        
+        logger.info(f"Challenge created: {challenger} -> {opponent}")
+        structured_log('info', 'challenge_created', challenger=challenger, opponent=opponent, invite_id=challenge.challenge_id)
     
-    async def _handle_challenge_accept(self, data):
+    @handles(messages.ChallengeAccept)
+    async def _handle_challenge_accept(self, msg):
         """Handle challenge acceptance"""
-        try:
-            validate_required_fields(data, ['challenger', 'opponent'])
-            
-            challenger = data.get('challenger', '').strip()
-            opponent = data.get('opponent', '').strip()
-            
-            if self.username != opponent:
-                await send_error(self, 'INVALID_REQUEST', 'Only the challenged player can accept')
-                return
-            
-            challenge = await self._get_challenge(challenger, opponent)
-            if not challenge or challenge.status != 'pending':
-                await send_error(self, 'CHALLENGE_NOT_FOUND', 'Challenge not found or no longer pending')
+        challenger = msg.challenger
+        opponent = msg.opponent
+        
+        if self.username != opponent:
+            await send_error(self, 'INVALID_REQUEST', 'Only the challenged player can accept')
+            return
+        
+        challenge = await self._get_challenge(challenger, opponent)
+        if not challenge or challenge.status != 'pending':
+            await send_error(self, 'CHALLENGE_NOT_FOUND', 'Challenge not found or no longer pending')
+            return
+        
+        game_id = str(uuid.uuid4())
+        
+        idem_key = msg.idempotency_key
+        if idem_key:
+            prior = get_idempotency(idem_key)
+            if prior:
+                existing_game_id = prior.get('game_id')
+                await send_json_response(self, {
+                    'type': 'game_already_created',
+                    'gameId': existing_game_id
+                })
+                structured_log('info', 'game_create_idempotent_hit', key=idem_key, game_id=existing_game_id)
                 return
-            
-            game_id = str(uuid.uuid4())
-            
-            idem_key = data.get('idempotency_key')
-            if idem_key:
-                prior = get_idempotency(idem_key)
-                if prior:
-                    existing_game_id = prior.get('game_id')
-                    await send_json_response(self, {
-                        'type': 'game_already_created',
-                        'gameId': existing_game_id
-                    })
-                    structured_log('info', 'game_create_idempotent_hit', key=idem_key, game_id=existing_game_id)
-                    return
 
-            logger.info(f"[challenge_accept] Creating game room: challenger={challenger}, opponent={opponent}, game_id={game_id}")
-            game = await self._create_game_room(challenger, opponent, game_id)
-            logger.info(f"[challenge_accept] Game created: host={game.host}, opponent={game.opponent}, host_token_len={len(game.host_token)}, opponent_token_len={len(game.opponent_token)}")
-            if idem_key:
-                try:
-                    set_idempotency(idem_key, {'game_id': game.game_id}, timeout=300)
-                except Exception:
-                    structured_log('warning', 'idempotency_set_failed', key=idem_key)
-            
-            # Delete the challenge now that game is created (prevents CHALLENGE_EXISTS on re-invite)
-            await self._delete_challenge(challenge)
-            
-            # Update both players' status to 'in-game' before they navigate to the game room
-            # This prevents the PlayerConnection from being deleted when lobby disconnects
-            await self._update_player_status(challenger, 'in-game')
-            await self._update_player_status(opponent, 'in-game')
-            
-            # Notify both players with their respective tokens (batch query for efficiency)
-            connections = await self._get_player_connections_batch([challenger, opponent])
-            challenger_conn = connections.get(challenger)
-            opponent_conn = connections.get(opponent)
-            
-            if challenger_conn:
-                await self.channel_layer.send(challenger_conn.channel_name, {
-                    'type': 'send_challenge_accepted',
-                    'username': opponent,
-                    'gameId': game_id,
-                    'token': game.host_token
-                })
-            
-            if opponent_conn:
-                await self.channel_layer.send(opponent_conn.channel_name, {
-                    'type': 'send_challenge_accepted',
-                    'username': opponent,
-                    'gameId': game_id,
-                    'token': game.opponent_token
-                })
-            
-            await self._send_user_list()
-            
-            logger.info(f"Challenge accepted: {challenger} <-> {opponent} (game: {game_id})")
-            structured_log('info', 'challenge_accepted', challenger=challenger, opponent=opponent, game_id=game_id)
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        logger.info(f"[challenge_accept] Creating game room: challenger={challenger}, opponent={opponent}, game_id={game_id}")
+        game = await self._create_game_room(challenger, opponent, game_id)
+        logger.info(f"[challenge_accept] Game created: host={game.host}, opponent={game.opponent}, host_token_len={len(game.host_token)}, opponent_token_len={len(game.opponent_token)}")
+        if idem_key:
+            try:
+                set_idempotency(idem_key, {'game_id': game.game_id}, timeout=300)
+            except Exception:
+                structured_log('warning', 'idempotency_set_failed', key=idem_key)
+        
+        # Delete the challenge now that game is created (prevents CHALLENGE_EXISTS on re-invite)
+        await self._delete_challenge(challenge)
+        
+        # Update both players' status to 'in-game' before they navigate to the game room
+        # This prevents the PlayerConnection from being deleted when lobby disconnects
+        await self._update_player_status(challenger, 'in-game')
+        await self._update_player_status(opponent, 'in-game')
+        
+        # Notify both players with their respective tokens (batch query for efficiency)
+        connections = await self._get_player_connections_batch([challenger, opponent])
+        challenger_conn = connections.get(challenger)
+        opponent_conn = connections.get(opponent)
+        
+        if challenger_conn:
+            await self.channel_layer.send(challenger_conn.channel_name, {
+                'type': 'send_challenge_accepted',
+                'username': opponent,
+                'gameId': game_id,
+                'token': game.host_token
+            })
+        
+        if opponent_conn:
+            await self.channel_layer.send(opponent_conn.channel_name, {
+                'type': 'send_challenge_accepted',
+                'username': opponent,
+                'gameId': game_id,
+                'token': game.opponent_token
+            })
+        
+        await self._send_user_list()
+        
+        logger.info(f"Challenge accepted: {challenger} <-> {opponent} (game: {game_id})")
+        structured_log('info', 'challenge_accepted', challenger=challenger, opponent=opponent, game_id=game_id)
     
-    async def _handle_challenge_decline(self, data):
+    @handles(messages.ChallengeDecline)
+    async def _handle_challenge_decline(self, msg):
         """Handle challenge decline"""
-        try:
-            validate_required_fields(data, ['challenger', 'opponent'])
-            
-            challenger = data.get('challenger', '').strip()
-            opponent = data.get('opponent', '').strip()
-            
-            if self.username != opponent:
-                await send_error(self, 'INVALID_REQUEST', 'Only the challenged player can decline')
-                return
-            
-            challenge = await self._get_challenge(challenger, opponent)
-            if not challenge:
-                await send_error(self, 'CHALLENGE_NOT_FOUND', 'Challenge not found')
-                return
-            
-            await self._update_challenge_status(challenge.challenge_id, 'declined')
-            
-            await self._update_player_status(challenger, 'online')
-            await self._update_player_status(opponent, 'online')
-            
-            await self._send_user_list()
-            
-            challenger_conn = await self._get_player_connection(challenger)
-            if challenger_conn:
-                await self.channel_layer.send(challenger_conn.channel_name, {
-                    'type': 'send_challenge_declined',
-                    'username': opponent
-                })
-            
-            logger.info(f"Challenge declined: {challenger} <- {opponent}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        challenger = msg.challenger
+        opponent = msg.opponent
+        
+        if self.username != opponent:
+            await send_error(self, 'INVALID_REQUEST', 'Only the challenged player can decline')
+            return
+        
+        challenge = await self._get_challenge(challenger, opponent)
+        if not challenge:
+            await send_error(self, 'CHALLENGE_NOT_FOUND', 'Challenge not found')
+            return
+        
+        await self._update_challenge_status(challenge.challenge_id, 'declined')
+        
+        await self._update_player_status(challenger, 'online')
+        await self._update_player_status(opponent, 'online')
+        
+        await self._send_user_list()
+        
+        challenger_conn = await self._get_player_connection(challenger)
+        if challenger_conn:
+            await self.channel_layer.send(challenger_conn.channel_name, {
+                'type': 'send_challenge_declined',
+                'username': opponent
+            })
+        
+        logger.info(f"Challenge declined: {challenger} <- {opponent}")
     
-    async def _handle_join_game_room(self, data):
+    @handles(messages.JoinGameRoom)
+    async def _handle_join_game_room(self, msg):
         """Handle player joining a game room"""
-        try:
-            validate_required_fields(data, ['username', 'gameId', 'token'])
-            
-            username = data.get('username', '').strip()
-            game_id = data.get('gameId', '').strip()
-            token = data.get('token', '').strip()
-            
-            logger.info(f"[join_game_room] User {username} attempting to join game {game_id}")
-            
-            # Set username if not already set (for new WebSocket connections)
-            if not self.username:
-                self.username = username
-            
-            if self.username != username:
-                await send_error(self, 'INVALID_REQUEST', 'Can only join as yourself')
-                return
-            
-            game = await self._get_game_by_id(game_id)
-            if not game or game.status == 'closed':
-                await send_error(self, 'GAME_NOT_FOUND', 'Game room not found')
-                return
-
-            logger.info(f"[join_game_room] Game found: host={game.host}, opponent={game.opponent}")
-
-            if username != game.host and username != game.opponent:
-                logger.warning(f"[join_game_room] User {username} not in game - host={game.host}, opponent={game.opponent}")
-                await send_error(self, 'NOT_IN_GAME', 'You are not in this game')
-                return
-            
-            expected_token = game.host_token if username == game.host else game.opponent_token
-            if not expected_token or token != expected_token:
-                await send_error(self, 'INVALID_TOKEN', 'Invalid or missing access token')
-                return
-            
-            if game.token_expires_at and timezone.now() > game.token_expires_at:
-                await send_error(self, 'TOKEN_EXPIRED', 'Access token has expired')
-                return
-            
-            self.game_id = game_id
+        username = msg.username
+        game_id = msg.game_id
+        token = msg.token
+        
+        logger.info(f"[join_game_room] User {username} attempting to join game {game_id}")
+        
+        # Set username if not already set (for new WebSocket connections)
+        if not self.username:
+            self.username = username
+        
+        if self.username != username:
+            await send_error(self, 'INVALID_REQUEST', 'Can only join as yourself')
+            return
+        
+        game = await self._get_game_by_id(game_id)
+        if not game or game.status == 'closed':
+            await send_error(self, 'GAME_NOT_FOUND', 'Game room not found')
+            return
 
-            # Cancel any pending disconnect-forfeit grace timer
-            had_pending_grace = (game_id, username) in _pending_disconnect_timers
-            self._cancel_disconnect_timer(game_id, username)
+        logger.info(f"[join_game_room] Game found: host={game.host}, opponent={game.opponent}")
 
-            # The game room may arrive on a fresh WebSocket, so refresh the stored channel
-            await self._create_or_update_player_connection(username, self.channel_name, 'in-game')
-            
-            # Add to the game room group, but keep lobby group membership for lobby chat
-            self.room_name = game_id
-            self.room_group_name = f'game_{game_id}'
-            await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-            await self.channel_layer.group_add('game_lobby', self.channel_name)
-            
-            await self._send_user_list()
+        if username != game.host and username != game.opponent:
+            logger.warning(f"[join_game_room] User {username} not in game - host={game.host}, opponent={game.opponent}")
+            await send_error(self, 'NOT_IN_GAME', 'You are not in this game')
+            return
+        
+        expected_token = game.host_token if username == game.host else game.opponent_token
+        if not expected_token or token != expected_token:
+            await send_error(self, 'INVALID_TOKEN', 'Invalid or missing access token')
+            return
+        
+        if game.token_expires_at and timezone.now() > game.token_expires_at:
+            await send_error(self, 'TOKEN_EXPIRED', 'Access token has expired')
+            return
+        
+        self.game_id = game_id
+        # Opt-ins: receive move_made as a delta, and with this side's move
+        # map when it is to move next (see send_move_made)
+        self.board_deltas = msg.board_deltas
+        self.legal_moves = msg.legal_moves
+
+        # Cancel any pending disconnect-forfeit grace timer
+        had_pending_grace = (game_id, username) in _pending_disconnect_timers
+        self._cancel_disconnect_timer(game_id, username)
 
-            logger.info(f"Sending player_list for game {game_id}, is_inviter: {username == game.host}")
+        # The game room may arrive on a fresh WebSocket, so refresh the stored channel
+        await self._create_or_update_player_connection(username, self.channel_name, 'in-game')
+        
+        # Add to the game room group, but keep lobby group membership for lobby chat
+        self.room_name = game_id
+        self.room_group_name = f'game_{game_id}'
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        await self.channel_layer.group_add('game_lobby', self.channel_name)
+        _room_move_forms.setdefault(game_id, {})[self.channel_name] = self.board_deltas
+        
+        await self._send_user_list()
 
-            await self._send_game_player_list(game_id, username == game.host)
+        logger.info(f"Sending player_list for game {game_id}, is_inviter: {username == game.host}")
 
-            if had_pending_grace:
-                await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                    'type': 'opponent_reconnected',
-                    'username': username,
-                })
+        await self._send_game_player_list(game_id, username == game.host)
 
-            # Notify client of join success with game status (for reconnection)
-            await send_json_response(self, {
-                'type': 'join_game_room_success',
-                'gameId': game_id,
-                'gameStatus': game.status,
+        if had_pending_grace:
+            await broadcast_to_group(self.channel_layer, self.room_group_name, {
+                'type': 'opponent_reconnected',
+                'username': username,
             })
 
-            logger.info(f"User {username} joined game room {game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        # Notify client of join success with game status (for reconnection)
+        await send_json_response(self, {
+            'type': 'join_game_room_success',
+            'gameId': game_id,
+            'gameStatus': game.status,
+        })
+
+        logger.info(f"User {username} joined game room {game_id}")
     
-    async def _handle_leave_game_room(self, data):
+    @handles(messages.LeaveGameRoom)
+    async def _handle_leave_game_room(self, msg):
         """Handle player leaving a game room"""
-        try:
-            validate_required_fields(data, ['username', 'gameId'])
-            
-            username = data.get('username', '').strip()
-            game_id = data.get('gameId', '').strip()
-            
-            if self.username != username:
-                await send_error(self, 'INVALID_REQUEST', 'Can only leave as yourself')
-                return
-            
-            # Verify user is actually in this game before allowing leave
-            game = await self._get_game_by_id(game_id)
-            if not game:
-                logger.warning(f"[leave_game_room] Game {game_id} not found, skipping leave")
-                return
-            
-            if username != game.host and username != game.opponent:
-                logger.warning(f"[leave_game_room] User {username} not in game {game_id} (host={game.host}, opponent={game.opponent}), ignoring leave request")
-                return
-            
-            logger.info(f"[leave_game_room] User {username} leaving game {game_id}")
-
-            # Stop any pending turn timer - this room is being abandoned
-            self._cancel_turn_timer(game_id)
-
-            # Deliberately leaving an active match forfeits it - record the
-            # result and tell both players. (The disconnect path gets a grace
-            # period because it can be accidental; walking out is a choice.)
-            forfeited = False
-            state = await self._get_game_state(game_id)
-            if state and not state.is_finished:
-                winner = game.opponent if username == game.host else game.host
-                if await self._end_game(game_id, state, winner, 'resign'):
-                    await self._broadcast_game_over(game_id, winner, 'resign', resignedBy=username)
-                    forfeited = True
-                    logger.info(f"Game {game_id} forfeited to {winner} - {username} left mid-game")
-
-            # Send to game room BEFORE leaving the group
-            game_room_group = f'game_{game_id}'
-            await self.channel_layer.group_send(
-                game_room_group,
-                {
-                    'type': 'partner_left',
-                    'username': username,
-                    'gameId': game_id
-                }
-            )
-            self.leaving_game_room = True
-
-            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
-            self.room_name = 'lobby'
-            self.room_group_name = 'game_lobby'
-            await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-
-            # Update player status back to 'online' (keep the connection alive)
-            await self._update_player_status(username, 'online')
-
-            await self._delete_ready_status(game_id, username)
+        username = msg.username
+        game_id = msg.game_id
+        
+        if self.username != username:
+            await send_error(self, 'INVALID_REQUEST', 'Can only leave as yourself')
+            return
+        
+        # Verify user is actually in this game before allowing leave
+        game = await self._get_game_by_id(game_id)
+        if not game:
+            logger.warning(f"[leave_game_room] Game {game_id} not found, skipping leave")
+            return
+        
+        if username != game.host and username != game.opponent:
+            logger.warning(f"[leave_game_room] User {username} not in game {game_id} (host={game.host}, opponent={game.opponent}), ignoring leave request")
+            return
+        
+        logger.info(f"[leave_game_room] User {username} leaving game {game_id}")
 
-            # Always close the room: there's no way for anyone but the
-            # original host/opponent to join it (see _handle_join_game_room),
-            # so a deliberate leave - by either player, before or after the
-            # game starts - always makes the room unusable. The remaining
-            # player is sent back to the lobby by partner_left if they're
-            # actively in the room; if they're elsewhere (e.g. configuring),
-            # closing it here is what makes their eventual rejoin attempt
-            # bounce them to the lobby instead of rejoining a stale room.
-            await self._close_game_room(game_id, f"{username} left the game room")
+        # Stop any pending turn timer - this room is being abandoned
+        self._cancel_turn_timer(game_id)
 
-            await self._send_user_list()
-            
-            logger.info(f"User {username} left game room {game_id}, returning to lobby")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        # Deliberately leaving an active match forfeits it - record the
+        # result and tell both players. (The disconnect path gets a grace
+        # period because it can be accidental; walking out is a choice.)
+        winner = game.opponent if username == game.host else game.host
+        if await live_games.run(game_id, self._forfeit, winner, 'resign', resignedBy=username):
+            logger.info(f"Game {game_id} forfeited to {winner} - {username} left mid-game")
+
+        # Send to game room BEFORE leaving the group
+        game_room_group = f'game_{game_id}'
+        await self.channel_layer.group_send(
+            game_room_group,
+            {
+                'type': 'partner_left',
+                'username': username,
+                'gameId': game_id
+            }
+        )
+        self.leaving_game_room = True
+
+        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        _forget_move_form(game_id, self.channel_name)
+        self.room_name = 'lobby'
+        self.room_group_name = 'game_lobby'
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+
+        # Update player status back to 'online' (keep the connection alive)
+        await self._update_player_status(username, 'online')
+
+        await self._delete_ready_status(game_id, username)
+
+        # Always close the room: there's no way for anyone but the
+        # original host/opponent to join it (see _handle_join_game_room),
+        # so a deliberate leave - by either player, before or after the
+        # game starts - always makes the room unusable. The remaining
+        # player is sent back to the lobby by partner_left if they're
+        # actively in the room; if they're elsewhere (e.g. configuring),
+        # closing it here is what makes their eventual rejoin attempt
+        # bounce them to the lobby instead of rejoining a stale room.
+        await self._close_game_room(game_id, f"{username} left the game room")
+
+        await self._send_user_list()
+        
+        logger.info(f"User {username} left game room {game_id}, returning to lobby")
     
-    async def _handle_game_room_message(self, data):
+    @handles(messages.GameRoomMessage)
+    async def _handle_game_room_message(self, msg):
         """Handle game room chat message"""
-        try:
-            validate_required_fields(data, ['content'])
-            validate_chat_message(data['content'])
-            
-            # Send directly to game room group (not wrapped in broadcast_message)
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'game_room_message',
-                    'username': self.username,
-                    'content': data['content'],
-                    'timestamp': data.get('timestamp', datetime.datetime.now().isoformat())
-                }
-            )
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
-    
-    async def _handle_player_ready(self, data):
-        """Handle player marking themselves as ready"""
-        try:
-            validate_required_fields(data, ['username', 'gameId'])
-            
-            username = data.get('username', '').strip()
-            game_id = data.get('gameId', '').strip()
-            
-            if self.username != username:
-                await send_error(self, 'INVALID_REQUEST', 'Can only ready yourself')
-                return
-            
-            game = await self._get_game_by_id(game_id)
-            if not game:
-                await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
-                return
-            
-            await self._set_ready_status(game_id, username, True)
-            
-            await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                'type': 'player_ready',
-                'username': username
-            })
-            
-            logger.info(f"Player {username} is ready in game {game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        # Send directly to game room group (not wrapped in broadcast_message)
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'game_room_message',
+                'username': self.username,
+                'content': msg.content,
+                'timestamp': msg.timestamp or datetime.datetime.now().isoformat()
+            }
+        )
     
-    async def _handle_player_unready(self, data):
+    @handles(messages.PlayerReady)
+    async def _handle_player_ready(self, msg):
+        """Handle player marking themselves as ready"""
+        username = msg.username
+        game_id = msg.game_id
+        
+        if self.username != username:
+            await send_error(self, 'INVALID_REQUEST', 'Can only ready yourself')
+            return
+        
+        game = await self._get_game_by_id(game_id)
+        if not game:
+            await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
+            return
+        
+        await self._set_ready_status(game_id, username, True)
+        
+        await broadcast_to_group(self.channel_layer, self.room_group_name, {
+            'type': 'player_ready',
+            'username': username
+        })
+        
+        logger.info(f"Player {username} is ready in game {game_id}")
+    
+    @handles(messages.PlayerUnready)
+    async def _handle_player_unready(self, msg):
         """Handle player marking themselves as not ready"""
-        try:
-            validate_required_fields(data, ['username', 'gameId'])
-            
-            username = data.get('username', '').strip()
-            game_id = data.get('gameId', '').strip()
-            
-            if self.username != username:
-                await send_error(self, 'INVALID_REQUEST', 'Can only unready yourself')
-                return
-            
-            game = await self._get_game_by_id(game_id)
-            if not game:
-                await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
-                return
-            
-            await self._set_ready_status(game_id, username, False)
+        username = msg.username
+        game_id = msg.game_id
+        
+        if self.username != username:
+            await send_error(self, 'INVALID_REQUEST', 'Can only unready yourself')
+            return
+        
+        game = await self._get_game_by_id(game_id)
+        if not game:
+            await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
+            return
+        
+        await self._set_ready_status(game_id, username, False)
 
-            silent = data.get('silent', False)
-            await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                'type': 'player_unready',
-                'username': username,
-                'silent': silent
-            })
-            
-            logger.info(f"Player {username} is not ready in game {game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        await broadcast_to_group(self.channel_layer, self.room_group_name, {
+            'type': 'player_unready',
+            'username': username,
+            'silent': msg.silent
+        })
+        
+        logger.info(f"Player {username} is not ready in game {game_id}")
     
-    async def _handle_change_game_mode(self, data):
+    @handles(messages.ChangeGameMode)
+    async def _handle_change_game_mode(self, msg):
         """Handle game mode change"""
-        try:
-            validate_required_fields(data, ['mode', 'gameId'])
-            
-            mode = data.get('mode', '').strip()
-            game_id = data.get('gameId', '').strip()
-            
-            validate_game_mode(mode)
-            
-            game = await self._get_game_by_id(game_id)
-            if not game:
-                await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
-                return
-            
-            if self.username != game.host:
-                await send_error(self, 'PERMISSION_DENIED', 'Only the host can change game mode')
-                return
-            
-            options = {}
-            if mode == 'custom':
-                if 'options' in data:
-                    validate_game_options(data['options'])
-                    options = data['options']
-            
-            await self._update_game_mode(game_id, mode, options)
-            
-            message_data = {
-                'type': 'game_mode_changed',
-                'mode': mode
-            }
-            if options:
-                message_data['options'] = options
-            
-            await broadcast_to_group(self.channel_layer, self.room_group_name, message_data)
-            
-            mode_text = "Default Mode" if mode == "default" else "Custom Mode"
-            options_text = ""
-            if mode == 'custom' and options:
-                option_list = [f"{k}: {v}" for k, v in options.items()]
-                if option_list:
-                    options_text = f" (Options: {', '.join(option_list)})"
-            
-            logger.info(f"Game mode changed to {mode_text}{options_text} in game {game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        mode = msg.mode
+        game_id = msg.game_id
+        
+        game = await self._get_game_by_id(game_id)
+        if not game:
+            await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
+            return
+        
+        if self.username != game.host:
+            await send_error(self, 'PERMISSION_DENIED', 'Only the host can change game mode')
+            return
+        
+        options = (msg.options or {}) if mode == 'custom' else {}
+        
+        await self._update_game_mode(game_id, mode, options)
+        
+        message_data = {
+            'type': 'game_mode_changed',
+            'mode': mode
+        }
+        if options:
+            message_data['options'] = options
+        
+        await broadcast_to_group(self.channel_layer, self.room_group_name, message_data)
+        
+        mode_text = "Default Mode" if mode == "default" else "Custom Mode"
+        options_text = ""
+        if mode == 'custom' and options:
+            option_list = [f"{k}: {v}" for k, v in options.items()]
+            if option_list:
+                options_text = f" (Options: {', '.join(option_list)})"
+        
+        logger.info(f"Game mode changed to {mode_text}{options_text} in game {game_id}")
 
-    async def _handle_set_custom_config(self, data):
+    @handles(messages.SetCustomConfig)
+    async def _handle_set_custom_config(self, msg):
         """Handle the host saving a full custom board/unit config for their
         game room (from the setup screen). Only takes effect at game start
         if the room is still in 'custom' mode at that point."""
         try:
-            validate_required_fields(data, ['config'])
-
             if not self.game_id or not self.username:
                 await send_error(self, 'NOT_IN_GAME_ROOM', 'You are not in a game room')
                 return
@@ -948,7 +949,7 @@ class GameConsumer(AsyncWebsocketConsumer):
                 return
 
             try:
-                config = load_config(data['config'])
+                config = load_config(msg.config)
             except ValueError as e:
                 await send_error(self, 'INVALID_CONFIG', str(e))
                 return
@@ -961,23 +962,16 @@ class GameConsumer(AsyncWebsocketConsumer):
             })
 
             logger.info(f"Custom config saved for game {self.game_id} by {self.username}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
         except Exception as e:
             logger.error(f"Error in _handle_set_custom_config: {e}", exc_info=True)
             await send_error(self, 'INTERNAL_ERROR', 'Failed to save custom config')
 
-    async def _handle_request_reveal_mode(self, data):
+    @handles(messages.RequestRevealMode)
+    async def _handle_request_reveal_mode(self, msg):
         """Handle request to enable/disable reveal mode (requires opponent acceptance)"""
         try:
-            validate_required_fields(data, ['gameId', 'action'])
-            
-            game_id = data.get('gameId', '').strip()
-            action = data.get('action', '').strip().lower()
-            
-            if action not in ['enable', 'disable']:
-                await send_error(self, 'INVALID_ACTION', 'Action must be enable or disable')
-                return
+            game_id = msg.game_id
+            action = msg.action  # 'enable' or 'disable'
             
             game = await self._get_game_by_id(game_id)
             if not game:
@@ -1023,19 +1017,16 @@ class GameConsumer(AsyncWebsocketConsumer):
             })
             
             logger.info(f"Reveal mode {action} requested by {self.username} in game {game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
         except Exception as e:
             logger.error(f"Error in _handle_request_reveal_mode: {e}")
             await send_error(self, 'INTERNAL_ERROR', 'Failed to request reveal mode')
     
-    async def _handle_reveal_response(self, data):
+    @handles(messages.RevealResponse)
+    async def _handle_reveal_response(self, msg):
         """Handle opponent's response to reveal mode request"""
         try:
-            validate_required_fields(data, ['gameId', 'accepted'])
-            
-            game_id = data.get('gameId', '').strip()
-            accepted = data.get('accepted', False)
+            game_id = msg.game_id
+            accepted = msg.accepted
             
             if game_id not in _pending_reveal_requests:
                 await send_error(self, 'NO_PENDING_REQUEST', 'No pending reveal mode request')
@@ -1067,94 +1058,97 @@ class GameConsumer(AsyncWebsocketConsumer):
                     'username': self.username
                 })
                 logger.info(f"Reveal mode {action} declined in game {game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
         except Exception as e:
             logger.error(f"Error in _handle_reveal_response: {e}")
             await send_error(self, 'INTERNAL_ERROR', 'Failed to handle reveal response')
     
-    async def _handle_start_game(self, data):
+    @handles(messages.StartGame)
+    async def _handle_start_game(self, msg):
         """Handle game start request: initialise and broadcast the game state."""
-        try:
-            validate_required_fields(data, ['gameId'])
-            game_id = data.get('gameId', '').strip()
-            game = await self._get_game_by_id(game_id)
-            if not game:
-                await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
-                return
-            if self.username != game.host:
-                await send_error(self, 'PERMISSION_DENIED', 'Only the host can start the game')
-                return
-            all_ready = await self._all_players_ready(game_id)
-            if not all_ready:
-                await send_error(self, 'NOT_ALL_READY', 'Not all players are ready')
-                return
-
-            # Reject a replayed start_game while a match is in progress.
-            # Ready statuses persist after start, so without this a duplicate
-            # message (double-click, retry, or crafted) would re-randomize
-            # colours and wipe the live board. A *finished* GameState is fine -
-            # that's the rematch flow.
-            existing_state = await self._get_game_state(game_id)
-            if existing_state and not existing_state.is_finished:
-                await send_error(self, 'GAME_IN_PROGRESS', 'The game has already started')
-                return
-
-            # Load and validate the config BEFORE mutating any state, so a bad
-            # saved custom config fails cleanly instead of leaving the room
-            # half-started (players flipped to in-game with no GameState).
-            raw_config = game.custom_config if game.game_mode == 'custom' and game.custom_config else None
-            try:
-                config = load_config(raw_config)
-            except ValueError as e:
-                await send_error(self, 'INVALID_CONFIG', f'Saved custom config is invalid: {e}')
-                return
-            board = build_initial_board(config)
-
-            await self._update_player_status(game.host, 'in-game')
-            await self._update_player_status(game.opponent, 'in-game')
-            await self._send_user_list()
-            await self._send_game_player_list(game_id, is_inviter=(self.username == game.host))
+        game_id = msg.game_id
+        game = await self._get_game_by_id(game_id)
+        if not game:
+            await send_error(self, 'GAME_NOT_FOUND', 'Game not found')
+            return
+        if self.username != game.host:
+            await send_error(self, 'PERMISSION_DENIED', 'Only the host can start the game')
+            return
+        all_ready = await self._all_players_ready(game_id)
+        if not all_ready:
+            await send_error(self, 'NOT_ALL_READY', 'Not all players are ready')
+            return
 
-            if random.random() < 0.5:
-                p_white, p_black = game.host, game.opponent
-            else:
-                p_white, p_black = game.opponent, game.host
+        # Reject a replayed start_game while a match is in progress.
+        # Ready statuses persist after start, so without this a duplicate
+        # message (double-click, retry, or crafted) would re-randomize
+        # colours and wipe the live board. A *finished* GameState is fine -
+        # that's the rematch flow.
+        existing_state = await self._get_game_state(game_id)
+        if existing_state and not existing_state.is_finished:
+            await send_error(self, 'GAME_IN_PROGRESS', 'The game has already started')
+            return
 
-            turn_started_dt = timezone.now()
-            await self._create_game_state(
-                game_id=game_id,
-                board_state=board.to_dict(),
-                current_turn=p_white,       # white always moves first
-                player_white=p_white,
-                player_black=p_black,
-                config_snapshot=config,
-                turn_started_at=turn_started_dt,
-            )
+        # Load and validate the config BEFORE mutating any state, so a bad
+        # saved custom config fails cleanly instead of leaving the room
+        # half-started (players flipped to in-game with no GameState).
+        raw_config = game.custom_config if game.game_mode == 'custom' and game.custom_config else None
+        try:
+            # Shared compiled instance: every game on the same rules reuses it.
+            config = get_compiled_config(raw_config)
+        except ValueError as e:
+            await send_error(self, 'INVALID_CONFIG', f'Saved custom config is invalid: {e}')
+            return
+        # Built once per config; the board itself is never needed here.
+        initial = config.initial_position
+
+        await self._update_player_status(game.host, 'in-game')
+        await self._update_player_status(game.opponent, 'in-game')
+        await self._send_user_list()
+        await self._send_game_player_list(game_id, is_inviter=(self.username == game.host))
+
+        if random.random() < 0.5:
+            p_white, p_black = game.host, game.opponent
+        else:
+            p_white, p_black = game.opponent, game.host
+
+        # The template's serialised form is persisted and broadcast as is.
+        board_state = initial.board_state
+        turn_started_dt = timezone.now()
+        state = await self._create_game_state(
+            game_id=game_id,
+            board_state=board_state,
+            current_turn=p_white,       # white always moves first
+            player_white=p_white,
+            player_black=p_black,
+            config=config,
+            turn_started_at=turn_started_dt,
+        )
+        live_games.start(state, config)
 
-            await self._update_game_status(game_id, 'started')
+        await self._update_game_status(game_id, 'started')
 
-            await broadcast_to_group(self.channel_layer, f'game_{game_id}', {
-                'type': 'game_started',
-                'gameId': game_id,
-                'boardState': board.to_dict(),
-                'currentTurn': p_white,
-                'turnNumber': 1,
-                'playerWhite': p_white,
-                'playerBlack': p_black,
-                'config': config,
-                'turnStartedAt': turn_started_dt.isoformat(),
-            })
+        await broadcast_to_group(self.channel_layer, f'game_{game_id}', {
+            'type': 'game_started',
+            'gameId': game_id,
+            'boardState': board_state,
+            'currentTurn': p_white,
+            'turnNumber': 1,
+            'playerWhite': p_white,
+            'playerBlack': p_black,
+            'config': config.raw,
+            'configHash': config.fingerprint,
+            'boardHash': _board_hash(initial.board),
+            'turnStartedAt': turn_started_dt.isoformat(),
+        })
 
-            time_limit = config.get('rules', {}).get('turnTimeLimit', 0)
-            if time_limit > 0:
-                await self._start_turn_timer(game_id, time_limit, turn_number=1, current_turn=p_white)
+        time_limit = config.turn_time_limit
+        if time_limit > 0:
+            await self._start_turn_timer(game_id, time_limit, turn_number=1, current_turn=p_white)
 
-            logger.info(f"Game {game_id} started immediately: {p_white} (white) vs {p_black} (black)")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
+        logger.info(f"Game {game_id} started immediately: {p_white} (white) vs {p_black} (black)")
     
-    async def _handle_request_user_list(self, data):
+    @handles(messages.RequestUserList)
+    async def _handle_request_user_list(self, msg):
         """Handle request for user list (for real-time sync)"""
         try:
             await self._send_user_list()
@@ -1178,28 +1172,33 @@ class GameConsumer(AsyncWebsocketConsumer):
         if time_limit <= 0:
             return  # no time limit configured
 
+        async def _expire(state):
+            # Timer expired - the current player loses, unless the game
+            # has already moved on since this timer was armed.
+            if not state or state.is_finished:
+                return
+            if state.turn_number != turn_number or state.current_turn != current_turn:
+                logger.info(f"Stale turn timer for game {game_id} (armed for turn {turn_number}) ignored")
+                return
+
+            winner = state.player_black if state.current_turn == state.player_white else state.player_white
+            if await self._forfeit(state, winner, 'timeout'):
+                logger.info(f"Turn timer expired in game {game_id} - {winner} wins")
+
         async def _timer_task():
             try:
                 await asyncio.sleep(time_limit)
-                # Timer expired - the current player loses, unless the game
-                # has already moved on since this timer was armed.
-                state = await self._get_game_state(game_id)
-                if not state or state.is_finished:
-                    return
-                if state.turn_number != turn_number or state.current_turn != current_turn:
-                    logger.info(f"Stale turn timer for game {game_id} (armed for turn {turn_number}) ignored")
-                    return
-
-                winner = state.player_black if state.current_turn == state.player_white else state.player_white
-                if await self._end_game(game_id, state, winner, 'timeout'):
-                    await self._broadcast_game_over(game_id, winner, 'timeout')
-                    logger.info(f"Turn timer expired in game {game_id} - {winner} wins")
+                # Queued behind any move already submitted, which then
+                # makes this timer stale instead of racing it.
+                await live_games.run(game_id, _expire)
             except asyncio.CancelledError:
                 pass
             except Exception as e:
                 logger.error(f"Error in turn timer for game {game_id}: {e}", exc_info=True)
             finally:
-                _pending_turn_timers.pop(game_id, None)
+                # Not if a newer timer has taken this one's place
+                if _pending_turn_timers.get(game_id) is asyncio.current_task():
+                    del _pending_turn_timers[game_id]
 
         task = asyncio.create_task(_timer_task())
         _pending_turn_timers[game_id] = task
@@ -1207,10 +1206,10 @@ class GameConsumer(AsyncWebsocketConsumer):
     def _cancel_turn_timer(self, game_id: Optional[str]):
         """Cancel a running turn timer for the given game (if any).
 
-        A timer's own expiry coroutine calls this (via _broadcast_game_over)
-        to retire itself from the tracking dict - in that case the task is
-        asyncio.current_task(), and cancelling it would throw CancelledError
-        into its own in-flight broadcast. Only cancel a *different* task.
+        A timer's expiry runs on the game's actor, which calls this (via
+        _broadcast_game_over) while the timer task is only waiting for it -
+        cancelling that task then just stops the wait. Any other current
+        task is never cancelled from under itself.
         """
         if game_id is None:
             return
@@ -1238,15 +1237,13 @@ class GameConsumer(AsyncWebsocketConsumer):
                 game = await self._get_game_by_id(game_id)
                 if not game or game.status == 'closed':
                     return
-                state = await self._get_game_state(game_id)
-
-                if state and not state.is_finished:
-                    winner = game.opponent if username == game.host else game.host
-                    if await self._end_game(game_id, state, winner, 'disconnect'):
-                        await self._broadcast_game_over(game_id, winner, 'disconnect', disconnectedPlayer=username)
-                        await self._close_game_room(game_id, f"{username} did not reconnect within the grace period")
-                        await self._send_user_list()
-                        logger.info(f"Game {game_id} forfeited to {winner} - {username} did not reconnect in time")
+
+                winner = game.opponent if username == game.host else game.host
+                if await live_games.run(game_id, self._forfeit, winner, 'disconnect',
+                                        disconnectedPlayer=username):
+                    await self._close_game_room(game_id, f"{username} did not reconnect within the grace period")
+                    await self._send_user_list()
+                    logger.info(f"Game {game_id} forfeited to {winner} - {username} did not reconnect in time")
                 else:
                     await broadcast_to_group(self.channel_layer, f'game_{game_id}', {
                         'type': 'room_abandoned',
@@ -1260,7 +1257,8 @@ class GameConsumer(AsyncWebsocketConsumer):
             except Exception as e:
                 logger.error(f"Error in disconnect grace timer for game {game_id}: {e}", exc_info=True)
             finally:
-                _pending_disconnect_timers.pop((game_id, username), None)
+                if _pending_disconnect_timers.get((game_id, username)) is asyncio.current_task():
+                    del _pending_disconnect_timers[(game_id, username)]
 
         task = asyncio.create_task(_grace_task())
         _pending_disconnect_timers[(game_id, username)] = task
@@ -1277,47 +1275,32 @@ class GameConsumer(AsyncWebsocketConsumer):
     # ==================== Game-over helpers ====================
 
     async def _end_game(self, game_id: str, state, winner: str, end_reason: str) -> bool:
-        """Persist a game ending that leaves the board untouched (resign/timeout/draw).
+        """End a game that leaves the board untouched (resign/timeout/draw)
+        and write it to the database before returning.
 
         Conditional on the game still being at state.turn_number and
-        unfinished (see _update_game_state) - if a concurrent move or
+        unfinished (see LiveGame.finish) - if a concurrent move or
         another end-game path already advanced past that turn, this is a
         no-op. Returns True if this call's ending is the one that applied.
+        Called from mutations on the game's actor, so nothing else in this
+        process can get in between; the condition, and the write's own
+        turn-number guard, are the safety net for anything else.
         """
-        return await self._update_game_state(
-            game_id=game_id,
-            board_state=state.board_state,
-            current_turn=state.current_turn,
-            turn_number=state.turn_number,
-            move_history=state.move_history,
-            winner=winner,
-            end_reason=end_reason,
-            expected_turn_number=state.turn_number,
-        )
-
-    async def _end_game_with_retry(self, game_id: str, winner: str, end_reason: str,
-                                    precondition=None) -> bool:
-        """End a game, retrying once if a concurrent move advanced the turn
-        between the caller's state read and the conditional write.
-
-        Without this, a resign/draw-accept racing an opponent's move fails its
-        OCC write (turn number changed) and would be misreported as "game
-        already ended" while the game is in fact still running.
-
-        precondition, if given, is re-checked against each fresh state read
-        (e.g. "the draw offer is still pending"). Returns True if this call's
-        ending applied; False if the game is finished or the precondition no
-        longer holds.
-        """
-        for _ in range(2):
-            state = await self._get_game_state(game_id)
-            if not state or state.is_finished:
-                return False
-            if precondition is not None and not precondition(state):
-                return False
-            if await self._end_game(game_id, state, winner, end_reason):
-                return True
-        return False
+        live = await self._get_game_state(game_id)
+        if not live or not live.finish(winner, end_reason, expected_turn_number=state.turn_number):
+            return False
+        return await live_games.flush(live)
+
+    async def _forfeit(self, state, winner: str, end_reason: str, **extra) -> bool:
+        """End an unfinished game in *winner*'s favour and tell both players
+        (a live_games.run mutation). False if there was no game in progress
+        or its ending didn't apply."""
+        if not state or state.is_finished:
+            return False
+        if not await self._end_game(state.game_id, state, winner, end_reason):
+            return False
+        await self._broadcast_game_over(state.game_id, winner, end_reason, **extra)
+        return True
 
     async def _broadcast_game_over(self, game_id: str, winner: str, end_reason: str, **extra):
         """Cancel the turn timer and notify both players that the game ended."""
@@ -1331,59 +1314,77 @@ class GameConsumer(AsyncWebsocketConsumer):
 
     # ==================== Gameplay Handlers ====================
 
-    async def _handle_make_move(self, data):
+    @handles(messages.MakeMove)
+    async def _handle_make_move(self, msg):
         """Handle a player submitting a move during an active game."""
         try:
-            validate_required_fields(data, ['from', 'to'])
-
             if not self.game_id or not self.username:
                 await send_error(self, 'NOT_IN_GAME', 'You are not in an active game')
                 return
 
-            state = await self._get_game_state(self.game_id)
-            if not state:
-                await send_error(self, 'GAME_NOT_STARTED', 'Game state not found')
-                return
-            if state.is_finished:
-                await send_error(self, 'GAME_OVER', 'This game has already ended')
-                return
-            if state.current_turn != self.username:
-                await send_error(self, 'NOT_YOUR_TURN', 'It is not your turn')
-                return
+            # Applied on the game's actor, behind anything already queued
+            await live_games.run(self.game_id, self._apply_move, msg)
+        except Exception as e:
+            logger.error(f"Error in _handle_make_move: {e}", exc_info=True)
+            await send_error(self, 'INTERNAL_ERROR', 'Failed to process move')
 
-            from_coord = data['from']  # "q,r"
-            to_coord = data['to']      # "q,r"
+    async def _apply_move(self, state, msg):
+        """Validate and apply a move (a live_games.run mutation), then tell
+        both players."""
+        if not state:
+            await send_error(self, 'GAME_NOT_STARTED', 'Game state not found')
+            return
+        if state.is_finished:
+            await send_error(self, 'GAME_OVER', 'This game has already ended')
+            return
+        if state.current_turn != self.username:
+            await send_error(self, 'NOT_YOUR_TURN', 'It is not your turn')
+            return
 
-            config = state.config_snapshot
-            radius = config.get('board', {}).get('radius', DEFAULT_CONFIG['board']['radius'])
-            board = HexBoard.from_dict(radius, state.board_state)
+        from_coord = msg.from_coord  # "q,r"
+        to_coord = msg.to_coord      # "q,r"
 
-            # Coordinates come straight off the wire - reject malformed input
-            # as a client error, not an INTERNAL_ERROR with a traceback.
-            try:
-                fq, fr = parse_coord(from_coord)
-                tq, tr = parse_coord(to_coord)
-            except ValueError:
-                await send_error(self, 'INVALID_MOVE', 'Malformed move coordinates')
-                return
+        # The live game's own board and compiled config. Nothing else
+        # touches the game while this runs on its actor.
+        config = state.config
+        board = state.board
 
-            piece = board.get(fq, fr)
-            if not piece:
-                await send_error(self, 'INVALID_MOVE', 'No piece at source coordinate')
-                return
+        # Coordinates come straight off the wire - reject malformed input
+        # as a client error, not an INTERNAL_ERROR with a traceback.
+        try:
+            fq, fr = parse_coord(from_coord)
+            tq, tr = parse_coord(to_coord)
+        except ValueError:
+            await send_error(self, 'INVALID_MOVE', 'Malformed move coordinates')
+            return
+        # Recorded, broadcast and logged in canonical form, whatever
+        # spelling parse_coord accepted (" -5, 010" and the like)
+        from_coord, to_coord = coord_key(fq, fr), coord_key(tq, tr)
 
-            my_color = 'white' if self.username == state.player_white else 'black'
-            if piece['color'] != my_color:
-                await send_error(self, 'INVALID_MOVE', 'That piece is not yours')
-                return
+        piece = board.get(fq, fr)
+        if not piece:
+            await send_error(self, 'INVALID_MOVE', 'No piece at source coordinate')
+            return
 
-            legal_dests = get_legal_moves_filtered(board, (fq, fr), config, my_color)
-            if (tq, tr) not in legal_dests:
-                await send_error(self, 'INVALID_MOVE', 'Illegal move for this piece')
-                return
+        my_color = 'white' if self.username == state.player_white else 'black'
+        if piece['color'] != my_color:
+            await send_error(self, 'INVALID_MOVE', 'That piece is not yours')
+            return
 
-            combat = resolve_combat(board, (fq, fr), (tq, tr), config)
+        legal_dests = legal_move_cache.get_legal_moves(board, (fq, fr), config, my_color)
+        if (tq, tr) not in legal_dests:
+            await send_error(self, 'INVALID_MOVE', 'Illegal move for this piece')
+            return
 
+        base_hash = _board_hash(board)
+        # Made on the board's undo journal: the move stands only once it has
+        # been persisted (below) and is taken back on any other way out, so
+        # a failed write can't leave the live game ahead of what the room
+        # was told.
+        combat, undo_mark = make_move(board, (fq, fr), (tq, tr), config)
+        before = state.snapshot()
+        applied = kept = False
+        try:
             next_player = state.player_black if self.username == state.player_white else state.player_white
             next_color = 'black' if my_color == 'white' else 'white'
 
@@ -1402,167 +1403,204 @@ class GameConsumer(AsyncWebsocketConsumer):
             if combat['defender_hp'] is not None:
                 move_record['defender_hp'] = combat['defender_hp']
 
-            new_history = list(state.move_history) + [move_record]
-
             winner = ''
             end_reason = ''
             outcome = detect_outcome(board, next_color, config)
             if outcome == 'elimination':
-                winner = self.username
+                winner = state.current_turn  # the mover (checked above)
                 end_reason = 'elimination'
 
-            max_turns = config.get('rules', {}).get('maxTurns', 0)
+            max_turns = config.max_turns
             if not end_reason and max_turns > 0 and state.turn_number >= max_turns:
                 end_reason = 'draw_max_turns'
 
-            # Persist updated state - conditional on the game still being at
-            # state.turn_number and unfinished, so a turn timer that already
-            # ended the game while this move was in flight can't be clobbered.
+            # Record the move - still conditional on the game being at
+            # state.turn_number and unfinished, as a safety net behind the
+            # actor's ordering.
             next_turn_number = state.turn_number + 1
             turn_started_dt = timezone.now()
-            applied = await self._update_game_state(
-                game_id=self.game_id,
-                board_state=board.to_dict(),
+            changes = state.cells_changed(move_record)
+            applied = state.advance(
+                move_record,
                 current_turn=next_player if not end_reason else state.current_turn,
                 turn_number=next_turn_number,
-                move_history=new_history,
                 winner=winner,
                 end_reason=end_reason,
-                expected_turn_number=state.turn_number,
                 turn_started_at=turn_started_dt,
+                expected_turn_number=state.turn_number,
+                changes=changes,
             )
             if not applied:
                 await send_error(self, 'GAME_OVER', 'This game already ended before your move was processed')
                 return
-
-            await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                'type': 'move_made',
-                'move': move_record,
-                'boardState': board.to_dict(),
-                'currentTurn': next_player if not end_reason else '',
-                'turnNumber': next_turn_number,
-                'turnStartedAt': turn_started_dt.isoformat(),
-            })
-
             if end_reason:
-                await self._broadcast_game_over(self.game_id, winner, end_reason)
+                # A result is written before anyone is told about it.
+                if not await live_games.flush(state):
+                    await send_error(self, 'GAME_OVER', 'This game already ended before your move was processed')
+                    return
+            elif not await live_games.save(state):
+                # Only when games are shared between processes: the row moved on
+                # elsewhere, and the room has been resynced to it.
+                await send_error(self, 'INVALID_MOVE', 'The game changed before your move was processed')
+                return
+            kept = True
+        finally:
+            if kept:
+                keep_move(board, undo_mark)
             else:
-                time_limit = config.get('rules', {}).get('turnTimeLimit', 0)
-                if time_limit > 0:
-                    await self._start_turn_timer(
-                        self.game_id, time_limit,
-                        turn_number=next_turn_number, current_turn=next_player,
-                    )
+                unmake_move(board, undo_mark)
+                if applied:
+                    state.take_back(move_record, before)
+                    # a write that raised left earlier unsaved moves unscheduled
+                    live_games.retry(state)
+
+        move_made = {
+            'type': 'move_made',
+            'move': move_record,
+            'currentTurn': next_player if not end_reason else '',
+            'turnNumber': next_turn_number,
+            'turnStartedAt': turn_started_dt.isoformat(),
+            'baseHash': base_hash,
+            'boardHash': _board_hash(board),
+        }
+        # Each form someone in the room takes is encoded once here and
+        # forwarded as is; the other is left out.
+        want_full, want_delta = _move_made_forms(state.game_id)
+        await group_send_event(self.channel_layer, self.room_group_name, {
+            'type': 'send_move_made',
+            'game_id': state.game_id,
+            'current_turn': move_made['currentTurn'],
+            'turn_number': next_turn_number,
+            'full': encode_frames(dict(move_made, boardState=board.to_dict())) if want_full else None,
+            'delta': encode_frames(dict(move_made, changes=changes)) if want_delta else None,
+        })
 
-            logger.info(f"Move in game {self.game_id}: {from_coord}->{to_coord} by {self.username}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
-        except Exception as e:
-            logger.error(f"Error in _handle_make_move: {e}", exc_info=True)
-            await send_error(self, 'INTERNAL_ERROR', 'Failed to process move')
+        if end_reason:
+            await self._broadcast_game_over(state.game_id, winner, end_reason)
+        else:
+            time_limit = config.turn_time_limit
+            if time_limit > 0:
+                await self._start_turn_timer(
+                    state.game_id, time_limit,
+                    turn_number=next_turn_number, current_turn=next_player,
+                )
 
-    async def _handle_resign(self, data):
+        logger.info(f"Move in game {self.game_id}: {from_coord}->{to_coord} by {self.username}")
+
+    @handles(messages.Resign)
+    async def _handle_resign(self, msg):
         """Handle a player resigning from an active game."""
         try:
             if not self.game_id or not self.username:
                 await send_error(self, 'NOT_IN_GAME', 'You are not in an active game')
                 return
 
-            state = await self._get_game_state(self.game_id)
-            if not state or state.is_finished:
-                await send_error(self, 'GAME_OVER', 'Game is not active')
-                return
-
-            winner = state.player_black if self.username == state.player_white else state.player_white
-
-            if await self._end_game_with_retry(self.game_id, winner, 'resign'):
-                await self._broadcast_game_over(self.game_id, winner, 'resign', resignedBy=self.username)
-                logger.info(f"Player {self.username} resigned in game {self.game_id}")
-            else:
-                await send_error(self, 'GAME_OVER', 'This game has already ended')
+            await live_games.run(self.game_id, self._resign)
         except Exception as e:
             logger.error(f"Error in _handle_resign: {e}", exc_info=True)
             await send_error(self, 'INTERNAL_ERROR', 'Failed to process resignation')
 
-    async def _handle_offer_draw(self, data):
+    async def _resign(self, state):
+        """Resign on behalf of this connection's player (a live_games.run
+        mutation)."""
+        if not state or state.is_finished:
+            await send_error(self, 'GAME_OVER', 'Game is not active')
+            return
+
+        winner = state.player_black if self.username == state.player_white else state.player_white
+
+        if await self._forfeit(state, winner, 'resign', resignedBy=self.username):
+            logger.info(f"Player {self.username} resigned in game {self.game_id}")
+        else:
+            await send_error(self, 'GAME_OVER', 'This game has already ended')
+
+    @handles(messages.OfferDraw)
+    async def _handle_offer_draw(self, msg):
         """Handle a draw offer from one player."""
         try:
             if not self.game_id or not self.username:
                 await send_error(self, 'NOT_IN_GAME', 'You are not in an active game')
                 return
 
-            state = await self._get_game_state(self.game_id)
-            if not state or state.is_finished:
-                await send_error(self, 'GAME_OVER', 'Game is not active')
-                return
+            await live_games.run(self.game_id, self._offer_draw)
+        except Exception as e:
+            logger.error(f"Error in _handle_offer_draw: {e}", exc_info=True)
+            await send_error(self, 'INTERNAL_ERROR', 'Failed to offer draw')
 
-            if state.draw_offered_by:
-                await send_error(self, 'DRAW_ALREADY_OFFERED', 'A draw offer is already pending')
-                return
+    async def _offer_draw(self, state):
+        """Record and announce a draw offer (a live_games.run mutation)."""
+        if not state or state.is_finished:
+            await send_error(self, 'GAME_OVER', 'Game is not active')
+            return
 
-            await self._set_draw_offer(self.game_id, self.username)
+        if state.draw_offered_by:
+            await send_error(self, 'DRAW_ALREADY_OFFERED', 'A draw offer is already pending')
+            return
 
-            await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                'type': 'draw_offered',
-                'offeredBy': self.username,
-            })
+        if not await self._set_draw_offer(self.game_id, self.username):
+            return
 
-            logger.info(f"Player {self.username} offered a draw in game {self.game_id}")
-        except Exception as e:
-            logger.error(f"Error in _handle_offer_draw: {e}", exc_info=True)
-            await send_error(self, 'INTERNAL_ERROR', 'Failed to offer draw')
+        await broadcast_to_group(self.channel_layer, self.room_group_name, {
+            'type': 'draw_offered',
+            'offeredBy': self.username,
+        })
+
+        logger.info(f"Player {self.username} offered a draw in game {self.game_id}")
 
-    async def _handle_respond_draw(self, data):
+    @handles(messages.RespondDraw)
+    async def _handle_respond_draw(self, msg):
         """Handle acceptance or rejection of a draw offer."""
         try:
-            validate_required_fields(data, ['accept'])
-
             if not self.game_id or not self.username:
                 await send_error(self, 'NOT_IN_GAME', 'You are not in an active game')
                 return
 
-            state = await self._get_game_state(self.game_id)
-            if not state or state.is_finished:
-                await send_error(self, 'GAME_OVER', 'Game is not active')
-                return
+            await live_games.run(self.game_id, self._respond_draw, msg.accept)
+        except Exception as e:
+            logger.error(f"Error in _handle_respond_draw: {e}", exc_info=True)
+            await send_error(self, 'INTERNAL_ERROR', 'Failed to process draw response')
 
-            if not state.draw_offered_by:
-                await send_error(self, 'NO_DRAW_OFFER', 'There is no pending draw offer')
-                return
+    async def _respond_draw(self, state, accept):
+        """Accept or decline the pending draw offer (a live_games.run
+        mutation)."""
+        if not state or state.is_finished:
+            await send_error(self, 'GAME_OVER', 'Game is not active')
+            return
 
-            if state.draw_offered_by == self.username:
-                await send_error(self, 'INVALID_REQUEST', 'You cannot respond to your own draw offer')
-                return
+        if not state.draw_offered_by:
+            await send_error(self, 'NO_DRAW_OFFER', 'There is no pending draw offer')
+            return
 
-            accepted = bool(data['accept'])
+        if state.draw_offered_by == self.username:
+            await send_error(self, 'INVALID_REQUEST', 'You cannot respond to your own draw offer')
+            return
 
-            if accepted:
-                # Retry guards against racing an opponent's move; the
-                # precondition ensures the offer wasn't invalidated by that
-                # same move (every state write clears draw_offered_by).
-                offer_still_pending = lambda s: s.draw_offered_by and s.draw_offered_by != self.username
-                if await self._end_game_with_retry(self.game_id, '', 'draw_agreed',
-                                                    precondition=offer_still_pending):
-                    await self._broadcast_game_over(self.game_id, '', 'draw_agreed')
-                    logger.info(f"Draw agreed in game {self.game_id}")
-                else:
-                    await send_error(self, 'NO_DRAW_OFFER', 'The draw offer is no longer valid')
+        if accept:
+            # A move queued before this answer has already run and cleared
+            # the offer (checked above), so there is nothing to retry.
+            if await self._end_game(state.game_id, state, '', 'draw_agreed'):
+                await self._broadcast_game_over(state.game_id, '', 'draw_agreed')
+                logger.info(f"Draw agreed in game {self.game_id}")
             else:
-                await self._set_draw_offer(self.game_id, '')  # clear the offer
-                await broadcast_to_group(self.channel_layer, self.room_group_name, {
-                    'type': 'draw_response',
-                    'accepted': False,
-                    'declinedBy': self.username,
-                })
-                logger.info(f"Draw declined by {self.username} in game {self.game_id}")
-        except ValidationError as e:
-            await send_error(self, e.code, e.message)
-        except Exception as e:
-            logger.error(f"Error in _handle_respond_draw: {e}", exc_info=True)
-            await send_error(self, 'INTERNAL_ERROR', 'Failed to process draw response')
+                await send_error(self, 'NO_DRAW_OFFER', 'The draw offer is no longer valid')
+        else:
+            if not await self._set_draw_offer(self.game_id, ''):  # clear the offer
+                return
+            await broadcast_to_group(self.channel_layer, self.room_group_name, {
+                'type': 'draw_response',
+                'accepted': False,
+                'declinedBy': self.username,
+            })
+            logger.info(f"Draw declined by {self.username} in game {self.game_id}")
 
-    async def _handle_request_game_state(self, data):
-        """Send the full current game state to the requesting player."""
+    @handles(messages.RequestGameState)
+    async def _handle_request_game_state(self, msg):
+        """Send the full current game state to the requesting player.
+
+        The config is included unless the client says (``configHash``) it
+        already holds the game's config; ``configHash`` is always sent, and
+        ``request_config`` fetches a config by hash.
+        """
         try:
             if not self.game_id or not self.username:
                 await send_error(self, 'NOT_IN_GAME', 'You are not in an active game')
@@ -1573,26 +1611,38 @@ class GameConsumer(AsyncWebsocketConsumer):
                 await send_error(self, 'GAME_NOT_STARTED', 'Game state not found')
                 return
 
-            await send_json_response(self, {
-                'type': 'game_state_update',
-                'gameId': self.game_id,
-                'boardState': state.board_state,
-                'currentTurn': state.current_turn,
-                'turnNumber': state.turn_number,
-                'moveHistory': state.move_history,
-                'playerWhite': state.player_white,
-                'playerBlack': state.player_black,
-                'winner': state.winner,
-                'endReason': state.end_reason,
-                'config': state.config_snapshot,
-                'turnStartedAt': (state.turn_started_at or timezone.now()).isoformat(),
-                'drawOfferedBy': state.draw_offered_by or '',
-            })
+            include_config = not state.config_hash or msg.config_hash != state.config_hash
+            await send_json_response(self, game_state_update(self.game_id, state, include_config))
         except Exception as e:
             logger.error(f"Error in _handle_request_game_state: {e}", exc_info=True)
             await send_error(self, 'INTERNAL_ERROR', 'Failed to retrieve game state')
 
-    async def _handle_heartbeat(self, data):
+    @handles(messages.RequestConfig)
+    async def _handle_request_config(self, msg):
+        """Send the game config stored under ``configHash`` to a player in a
+        game room."""
+        try:
+            if not self.game_id or not self.username:
+                await send_error(self, 'NOT_IN_GAME', 'You are not in an active game')
+                return
+
+            config_hash = msg.config_hash
+            cached = compiled_configs.get_by_fingerprint(config_hash)
+            config = cached.raw if cached is not None else await self._get_config_blob(config_hash)
+            if config is None:
+                await send_error(self, 'CONFIG_NOT_FOUND', 'No config with that hash')
+                return
+            await send_json_response(self, {
+                'type': 'game_config',
+                'configHash': config_hash,
+                'config': config,
+            })
+        except Exception as e:
+            logger.error(f"Error in _handle_request_config: {e}", exc_info=True)
+            await send_error(self, 'INTERNAL_ERROR', 'Failed to retrieve config')
+
+    @handles(messages.Heartbeat)
+    async def _handle_heartbeat(self, msg):
         """Handle client heartbeat/presence ping"""
         try:
             if self.username:
@@ -1753,7 +1803,8 @@ class GameConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def _set_custom_config(self, game_id, config):
         """Save a validated custom board/unit config for a game room."""
-        GameRoom.objects.filter(game_id=game_id).update(custom_config=config)  # type: ignore
+        blob = GameConfigBlob.intern(config)
+        GameRoom.objects.filter(game_id=game_id).update(custom_config_blob=blob)  # type: ignore
 
     @database_sync_to_async
     def _close_game_room(self, game_id, reason):
@@ -1810,80 +1861,114 @@ class GameConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def _create_game_state(self, game_id, board_state, current_turn, player_white, player_black,
-                            config_snapshot, turn_started_at=None):
-        """Create (or reset, on rematch) the GameState for a game that just started."""
-        game = GameRoom.objects.get(game_id=game_id)
-        state, _created = GameState.objects.update_or_create(
-            game=game,
-            defaults={
-                'board_state': board_state,
-                'current_turn': current_turn,
-                'turn_number': 1,
-                'move_history': [],
-                'player_white': player_white,
-                'player_black': player_black,
-                'winner': '',
-                'end_reason': '',
-                'config_snapshot': config_snapshot,
-                'draw_offered_by': '',
-                'turn_started_at': turn_started_at or timezone.now(),
-            },
-        )
-        return state
-
-    @database_sync_to_async
-    def _get_game_state(self, game_id):
-        """Retrieve the GameState for a game, or None."""
-        try:
-            return GameState.objects.get(game_id=game_id)  # type: ignore
-        except GameState.DoesNotExist:  # type: ignore
-            return None
+                            config, turn_started_at=None):
+        """Create (or reset, on rematch) the GameState for a game that just started.
 
-    @database_sync_to_async
-    def _update_game_state(self, game_id, board_state, current_turn, turn_number, move_history,
-                            winner='', end_reason='', expected_turn_number=None, turn_started_at=None):
-        """Update the mutable fields of a GameState after a move or game end.
-
-        If expected_turn_number is given, the write is conditional: it only
-        applies if the game is still unfinished (end_reason == '') and still
-        at exactly that turn_number. This is optimistic concurrency control -
-        it stops a stale write (e.g. a move that finishes processing after a
-        turn timer already ended the game, or vice versa) from silently
-        clobbering whichever result actually landed first.
-
-        Any pending draw offer is cleared by every state write: a move
-        invalidates an outstanding offer (matching the client, which already
-        clears it locally on move_made), and a finished game has no use for one.
-
-        Returns True if the write applied, False if a concurrent write won.
+        *config* (dict or compiled GameConfig) is stored once per distinct
+        config as a GameConfigBlob and referenced by fingerprint.
         """
-        qs = GameState.objects.filter(game_id=game_id)  # type: ignore
-        if expected_turn_number is not None:
-            qs = qs.filter(turn_number=expected_turn_number, end_reason='')
-        update_fields = {
-            'board_state': board_state,
-            'current_turn': current_turn,
-            'turn_number': turn_number,
-            'move_history': move_history,
-            'winner': winner,
-            'end_reason': end_reason,
-            'draw_offered_by': '',
-        }
-        if turn_started_at is not None:
-            update_fields['turn_started_at'] = turn_started_at
-        rows = qs.update(**update_fields)
-        return rows > 0
+        game = GameRoom.objects.get(game_id=game_id)
+        with transaction.atomic():  # type: ignore
+            # Interned in the same transaction that references it, so orphan
+            # cleanup can't remove the blob in between.
+            blob = GameConfigBlob.intern(config)
+            GameMove.objects.filter(game_id=game_id).delete()  # a rematch starts a fresh log
+            state, _created = GameState.objects.update_or_create(
+                game=game,
+                defaults={
+                    'board_state': board_state,
+                    'snapshot_turn': 1,
+                    'current_turn': current_turn,
+                    'turn_number': 1,
+                    'player_white': player_white,
+                    'player_black': player_black,
+                    'winner': '',
+                    'end_reason': '',
+                    'config_blob': blob,
+                    'draw_offered_by': '',
+                    'turn_started_at': turn_started_at or timezone.now(),
+                },
+            )
+        return state
 
     @database_sync_to_async
-    def _set_draw_offer(self, game_id, username):
-        """Set or clear the draw_offered_by field."""
-        GameState.objects.filter(game_id=game_id).update(draw_offered_by=username)  # type: ignore
+    def _get_config_blob(self, fingerprint):
+        """Return the config dict stored under *fingerprint*, or None."""
+        blob = GameConfigBlob.objects.filter(fingerprint=fingerprint).first()  # type: ignore
+        return blob.config if blob else None
+
+    async def _get_game_state(self, game_id):
+        """The game's LiveGame (see live_games.py), or None if it has no
+        GameState. Only the first access to a game reads the database."""
+        return await live_games.get(game_id)
+
+    async def _set_draw_offer(self, game_id, username) -> bool:
+        """Set or clear the live game's draw offer (see live_games.save).
+        False if there was no game in progress or the write lost - the
+        room is resynced in that case."""
+        live = await self._get_game_state(game_id)
+        if not live or live.is_finished:
+            return False
+        live.draw_offered_by = username
+        return await live_games.save(live)
     
     # ==================== Broadcast Handlers ====================
     
     async def broadcast_message(self, event):
-        """Generic broadcast message handler"""
-        await send_json_response(self, event['data'])
+        """Generic broadcast message handler - forwards the text frame
+        broadcast_to_group encoded once for the whole group"""
+        await send_frames(self, event['frames'])
+
+    async def send_move_made(self, event):
+        """Send move_made in the form this connection asked for.
+
+        By default it carries the whole ``boardState``. A client that joined
+        with ``boardDeltas: true`` gets ``changes`` instead: only the cells
+        the move touched, ``{"q,r": cell}`` or ``{"q,r": null}`` if emptied.
+        Both forms carry ``baseHash``/``boardHash``, the board's Zobrist hash
+        before and after the move. A delta client whose own hash or
+        ``turnNumber`` doesn't match ``baseHash``/``turnNumber - 1`` has
+        missed something and should resync with ``request_game_state``.
+
+        A client that joined with ``legalMoves: true`` also gets
+        ``legalMoves`` when it is to move next: its side's whole move map,
+        ``{"q,r": ["q,r", ...]}`` for every piece that can move, so it
+        needn't ask per piece. Only that connection pays for it.
+        """
+        frames = event['delta'] if self.board_deltas else event['full']
+        if frames is None:
+            # joined after the move was encoded; the other form still applies
+            frames = event['full'] or event['delta']
+        if self.legal_moves and event['current_turn'] == self.username:
+            legal = await live_games.run(event['game_id'], self._next_legal_moves, event['turn_number'])
+            if legal is not None:
+                message = decode_json(frames['text'])
+                message['legalMoves'] = legal
+                await send_json_response(self, message)
+                return
+        await send_frames(self, frames)
+
+    async def _next_legal_moves(self, state, turn_number):
+        """This player's move map for *turn_number* (a live_games.run
+        mutation, so the board can't change underneath it), or None if the
+        game has moved on since."""
+        if (not state or state.is_finished or state.turn_number != turn_number
+                or state.current_turn != self.username):
+            return None
+        color = 'white' if self.username == state.player_white else 'black'
+        # Generated on a worker thread, not the event loop; reading the board
+        # there is safe because nothing else runs on this game's actor until
+        # this returns.
+        return await sync_to_async(get_all_legal_move_keys, thread_sensitive=False)(
+            state.board, color, state.config)
+
+    async def resync_game_state(self, event):
+        """Send the client the game as the database has it, after this
+        process lost a write of it (see LiveGameRegistry.flush) - moves it
+        was shown since the previous write may not stand."""
+        state = await self._get_game_state(event['game_id'])
+        if state:
+            await send_json_response(self, game_state_update(event['game_id'], state))
     
     async def send_game_challenge(self, event):
         """Send game challenge to specific user"""
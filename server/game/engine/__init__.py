@@ -7,10 +7,26 @@ Fire-Emblem-style hex-grid tactical game using axial coordinates (q, r).
 """
 
 from .board import HexBoard
-from .config_loader import load_config, build_initial_board, DEFAULT_CONFIG
-from .move_validator import get_legal_moves, is_legal_move
+from .config_loader import (
+    load_config,
+    build_initial_board,
+    compile_config,
+    config_fingerprint,
+    get_compiled_config,
+    compiled_configs,
+    GameConfig,
+    InitialPosition,
+    UnitStats,
+    DEFAULT_CONFIG,
+)
+from .move_validator import get_legal_moves, get_all_legal_moves, is_legal_move
+from .move_cache import LegalMoveCache, legal_move_cache
+from .schema_validator import validate_config_schema
 from .game_logic import (
     resolve_combat,
+    make_move,
+    unmake_move,
+    keep_move,
     is_attacked,
     get_legal_moves_filtered,
     has_any_legal_move,
@@ -21,10 +37,24 @@ __all__ = [
     'HexBoard',
     'load_config',
     'build_initial_board',
+    'compile_config',
+    'config_fingerprint',
+    'get_compiled_config',
+    'compiled_configs',
+    'GameConfig',
+    'InitialPosition',
+    'UnitStats',
     'DEFAULT_CONFIG',
     'get_legal_moves',
+    'get_all_legal_moves',
     'is_legal_move',
+    'LegalMoveCache',
+    'legal_move_cache',
+    'validate_config_schema',
     'resolve_combat',
+    'make_move',
+    'unmake_move',
+    'keep_move',
     'is_attacked',
     'get_legal_moves_filtered',
     'has_any_legal_move',
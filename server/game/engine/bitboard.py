@@ -0,0 +1,154 @@
+"""
+Bitboard reachability - an alternative to the BFS in move_validator.
+
+The free hexes, the frontier and the reached set are each a single Python
+int used as a bit set, so one flood-fill step expands the whole frontier in
+all six directions with six shifts instead of visiting cells one by one.
+
+Bit layout: hex (q, r) lives at bit ``(r + R) * S + (q + R)`` of a padded
+grid with row stride ``S = 2R + 2`` - one spare bit per row beyond the
+``2R + 1`` hexes a row can hold. Every axial direction is then one
+constant shift (E = +1, SE = +S, NE = 1 - S, ...), and since a direction
+moves at most one column, a step off either end of a row lands on the
+spare bit, which is never free. Masking with the free set after the
+shifts is therefore all the edge handling needed. The dense cell indices of
+geometry.py are q-major with ragged columns, so a direction there is not a
+constant offset - hence the separate layout.
+
+A flood of *move* steps never leaves rows ``r +- move`` of its start, so
+``reachable_window`` works on just that band of the board, shifted down to
+bit 0, and ``decode`` reads the band back at its offset: on a large board
+the ints it shifts and scans are a few hundred bits rather than thousands.
+
+``free_mask`` is cached on the board itself (``HexBoard.cached_free_mask``,
+dropped whenever a hex fills or empties), so the per-piece calls of one
+position share a single snapshot.
+
+Results stay bitmasks until ``decode`` turns them into cell indices or
+coordinates on demand.
+"""
+
+from __future__ import annotations
+from itertools import compress
+from typing import Dict, List, Tuple
+
+from .board import HexBoard, Coord
+from .geometry import DIRECTION_OFFSETS, get_geometry
+
+
+class BitLayout:
+    """Per-radius bit tables (shared, read-only)."""
+
+    __slots__ = ('radius', 'stride', 'coords', 'unit', 'index_of_bit', 'valid',
+                 'left', 'right')
+
+    def __init__(self, radius: int):
+        geometry = get_geometry(radius)
+        stride = 2 * radius + 2
+        self.radius = radius
+        self.stride = stride
+        self.coords = geometry.coords
+        # cell index -> its single-bit mask
+        self.unit: Tuple[int, ...] = tuple(
+            1 << ((r + radius) * stride + (q + radius)) for q, r in geometry.coords
+        )
+        # bit position -> cell index (-1 = padding)
+        index_of_bit = [-1] * (stride * (2 * radius + 1))
+        for i, bit in enumerate(self.unit):
+            index_of_bit[bit.bit_length() - 1] = i
+        self.index_of_bit = index_of_bit
+        valid = 0
+        for bit in self.unit:
+            valid |= bit
+        self.valid = valid
+        # direction shifts, split by sign: left = towards higher bits
+        shifts = [dq + dr * stride for dq, dr in DIRECTION_OFFSETS]
+        self.left: Tuple[int, ...] = tuple(s for s in shifts if s > 0)
+        self.right: Tuple[int, ...] = tuple(-s for s in shifts if s < 0)
+
+    def __repr__(self) -> str:
+        return f"BitLayout(radius={self.radius}, stride={self.stride})"
+
+
+_LAYOUTS: Dict[int, BitLayout] = {}
+
+# binary digits -> compress() selectors
+_BIT_SELECTORS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def get_layout(radius: int) -> BitLayout:
+    """Return the shared BitLayout for *radius*, building it on first use."""
+    layout = _LAYOUTS.get(radius)
+    if layout is None:
+        layout = _LAYOUTS.setdefault(radius, BitLayout(radius))
+    return layout
+
+
+def occupancy_mask(board: HexBoard, layout: BitLayout) -> int:
+    """Bit set of every occupied hex on *board*."""
+    unit = layout.unit
+    occ = 0
+    for i in board.occupied_indices():
+        occ |= unit[i]
+    return occ
+
+
+def free_mask(board: HexBoard, layout: BitLayout) -> int:
+    """Bit set of every empty hex on *board*.
+
+    Kept on the board until its occupancy changes, so repeated queries
+    against one position reuse it.
+    """
+    free = board.cached_free_mask
+    if free is None:
+        free = board.cached_free_mask = layout.valid & ~occupancy_mask(board, layout)
+    return free
+
+
+def reachable_mask(layout: BitLayout, free: int, start: int, move_range: int) -> int:
+    """Bit set of empty hexes reachable from cell index *start* in at most
+    *move_range* steps through the hexes of *free* (the start excluded)."""
+    mask, base = reachable_window(layout, free, start, move_range)
+    return mask << base
+
+
+def reachable_window(layout: BitLayout, free: int, start: int, move_range: int) -> Tuple[int, int]:
+    """``reachable_mask`` as ``(mask, base)``: the bit set shifted down by
+    *base* bits, for ``decode(layout, mask, base)``."""
+    stride = layout.stride
+    row = (layout.unit[start].bit_length() - 1) // stride
+    base = max(0, row - move_range) * stride
+    width = (min(2 * layout.radius, row + move_range) + 1) * stride - base
+    free = (free >> base) & ((1 << width) - 1)
+
+    left, right = layout.left, layout.right
+    start_bit = layout.unit[start] >> base
+    frontier = start_bit
+    seen = 0
+    for _ in range(move_range):
+        spread = 0
+        for shift in left:
+            spread |= frontier << shift
+        for shift in right:
+            spread |= frontier >> shift
+        frontier = spread & free
+        if not frontier:
+            break
+        free ^= frontier
+        seen |= frontier
+    return seen, base
+
+
+def decode(layout: BitLayout, mask: int, base: int = 0) -> List[int]:
+    """Cell indices of the bits set in *mask* (bit 0 standing for bit
+    *base* of the board), in ascending bit order."""
+    # one C-level pass: the binary digits, bit 0 first, select from the
+    # bit -> cell table
+    selectors = format(mask, 'b').encode()[::-1].translate(_BIT_SELECTORS)
+    return list(compress(layout.index_of_bit[base:base + len(selectors)], selectors))
+
+
+def decode_coords(layout: BitLayout, mask: int) -> List[Coord]:
+    """Like ``decode`` but returns (q, r) coordinates."""
+    coords = layout.coords
+    return [coords[i] for i in decode(layout, mask)]
@@ -15,27 +15,39 @@ Cells are open-ended dicts - HP tracking adds "hp"/"max_hp", and higher
 layers may attach their own per-unit state. The board preserves whatever
 a cell carries across moves and (de)serialisation; it only requires that
 "unit_id" and "color" are present.
+
+Storage is dense: every valid hex of a given radius is numbered once with a
+flat integer *cell index*, and the board holds a plain list of cells in that
+order. The index tables and a flat neighbour table (six slots per cell, -1
+for off-board) live in the process-wide per-radius HexGeometry (see
+geometry.py) shared by every board of that size, so move generation can walk
+integers instead of allocating coordinate tuples and neighbour lists at
+every step.
+
+Mutations can be journalled and rolled back (``begin_undo``/``undo_to`` or
+the ``undoable()`` context manager): the journal records only what each
+step displaced - the previous occupant of a slot, or a unit's previous HP -
+so trying a move and reverting it costs a handful of list operations rather
+than a copy of the board.
+
+Every board also carries a 64-bit Zobrist hash of its position (see
+zobrist.py), kept current as pieces are placed, removed, moved or damaged,
+so a position can be identified without walking or serialising the board.
 """
 
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Tuple
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .geometry import Coord, DIRECTION_OFFSETS, HEX_DIRECTIONS, HexGeometry, get_geometry
+from .zobrist import mix64, piece_token
 
 
 # Type aliases
-Coord = Tuple[int, int]
 CellData = Dict[str, Any]       # {"unit_id": str, "color": str, "hp": int, "max_hp": int, ...}
 BoardDict = Dict[str, CellData]  # serialised "q,r" -> CellData
 
-# Six axial direction offsets (flat-top orientation)
-HEX_DIRECTIONS: Dict[str, Coord] = {
-    'E':  (+1,  0),
-    'W':  (-1,  0),
-    'NE': (+1, -1),
-    'NW': ( 0, -1),
-    'SE': ( 0, +1),
-    'SW': (-1, +1),
-}
-
 
 def coord_key(q: int, r: int) -> str:
     """Serialise an axial coordinate to the string key used in JSON / DB."""
@@ -66,11 +78,21 @@ def hex_distance(a: Coord, b: Coord) -> int:
     return max(abs(dq), abs(dr), abs(dq + dr))
 
 
+# Journal marker for "this cell had no hp key" (None is a legal hp value)
+_NO_HP = object()
+
+
 class HexBoard:
     """
     In-memory hex board.
 
-    Stores pieces in a dict keyed by (q, r) tuples for fast lookup.
+    Stores pieces in a flat list indexed by cell index (see the module
+    docstring), alongside the set of occupied indices so iteration and
+    serialisation only touch occupied hexes, and a per-colour index of
+    those same cells so counting or walking one side never scans the other.
+    Both indices and the Zobrist hash are maintained by ``_place``/``_clear``,
+    the only two places a slot changes (``deal_damage`` also re-hashes HP) -
+    a cell's "unit_id", "color" or "hp" must not be edited in place.
     Can serialise / deserialise to the JSON-friendly `BoardDict` format
     stored in ``GameState.board_state``.
     """
@@ -79,19 +101,33 @@ class HexBoard:
         if radius < 1:
             raise ValueError("Board radius must be >= 1")
         self.radius = radius
-        # Piece map: (q, r) -> CellData
-        self._cells: Dict[Coord, CellData] = {}
+        # Shared per-radius tables - never mutated after construction.
+        self.geometry: HexGeometry = get_geometry(radius)
+        self._coords = self.geometry.coords
+        self._index = self.geometry.index
+        self._neighbours = self.geometry.neighbours
+        # Piece slots: cell index -> CellData (None = empty hex)
+        self._cells: List[Optional[CellData]] = [None] * len(self._coords)
+        self._occupied: Set[int] = set()
+        # color -> cell indices holding that colour's pieces
+        self._by_color: Dict[str, Set[int]] = {}
+        self._zobrist_keys = self.geometry.zobrist
+        self._zobrist = 0
+        # Bit set of the empty hexes, built by engine.bitboard.free_mask -
+        # None until asked for, and again once a hex fills or empties
+        self.cached_free_mask: Optional[int] = None
+        # Undo journal - None unless a begin_undo() is outstanding
+        self._journal: Optional[List[tuple]] = None
+        self._undo_depth = 0
 
     # -- Valid hex enumeration -----------------------------------------
 
     def all_coords(self) -> List[Coord]:
-        """Return every valid hex coordinate on this board."""
-        coords: List[Coord] = []
-        for q in range(-self.radius, self.radius + 1):
-            for r in range(-self.radius, self.radius + 1):
-                if max(abs(q), abs(r), abs(q + r)) <= self.radius:
-                    coords.append((q, r))
-        return coords
+        """Return every valid hex coordinate on this board, in cell-index order.
+
+        A copy of the shared per-radius list - no square walk or filtering.
+        """
+        return list(self._coords)
 
     def is_valid(self, q: int, r: int) -> bool:
         """Return True if (q, r) is inside the board boundaries."""
@@ -102,11 +138,70 @@ class HexBoard:
         n = self.radius
         return 3 * n * n + 3 * n + 1
 
+    # -- Cell indices --------------------------------------------------
+
+    def index_of(self, q: int, r: int) -> int:
+        """Return the cell index of (q, r), or -1 if it is off-board."""
+        return self._index.get((q, r), -1)
+
+    def coord_of(self, index: int) -> Coord:
+        """Return the (q, r) coordinate of a cell index."""
+        return self._coords[index]
+
+    @property
+    def neighbour_table(self) -> array:
+        """Flat ``array('h')``: slot ``6 * index + d`` is the neighbour of
+        *index* in direction d of DIRECTION_OFFSETS, or -1 if off-board.
+
+        Shared by every board of this radius - read it, never write to it.
+        """
+        return self._neighbours
+
+    @property
+    def cell_slots(self) -> List[Optional[CellData]]:
+        """The dense cell list itself, indexed by cell index (None = empty).
+
+        Exposed for hot loops that would otherwise pay a method call per
+        lookup - treat it as read-only and mutate through the board's methods.
+        """
+        return self._cells
+
+    def get_at(self, index: int) -> Optional[CellData]:
+        """Get the piece at a cell index, or None if the hex is empty."""
+        return self._cells[index]
+
+    @property
+    def zobrist_hash(self) -> int:
+        """64-bit Zobrist hash of the position (cell, unit_id, colour, hp of
+        every piece). Equal positions hash equal however they were reached."""
+        return self._zobrist
+
+    def compute_zobrist_hash(self) -> int:
+        """Recompute the hash from scratch; always equals ``zobrist_hash``."""
+        h = 0
+        cells = self._cells
+        for i in self._occupied:
+            h ^= self._piece_hash(i, cells[i])  # type: ignore
+        return h
+
+    def _piece_hash(self, i: int, cell: CellData) -> int:
+        return mix64(self._zobrist_keys[i] ^ piece_token(cell['unit_id'], cell['color'], cell.get('hp')))
+
+    @property
+    def piece_count(self) -> int:
+        """Number of pieces on the board."""
+        return len(self._occupied)
+
+    def occupied_indices(self) -> Iterator[int]:
+        """Iterate over the cell indices that currently hold a piece."""
+        return iter(self._occupied)
+
     # -- Cell access ---------------------------------------------------
 
     def get(self, q: int, r: int) -> Optional[CellData]:
         """Get the piece at (q, r), or None if empty / off-board."""
-        return self._cells.get((q, r))
+        i = self._index.get((q, r))
+        return None if i is None else self._cells[i]
 
     def set(self, q: int, r: int, unit_id: str, color: str,
             hp: Optional[int] = None, max_hp: Optional[int] = None) -> None:
@@ -126,15 +221,52 @@ class HexBoard:
         fields, so routing a live cell through it silently drops anything
         else the cell carries (status effects, cooldowns, per-unit flags).
         """
-        if not self.is_valid(q, r):
+        i = self._index.get((q, r))
+        if i is None:
             raise ValueError(f"Coordinate ({q},{r}) is outside radius {self.radius}")
+        self.set_cell_at(i, cell)
+
+    def set_cell_at(self, index: int, cell: CellData) -> None:
+        """``set_cell()`` by cell index, for callers that already hold one."""
         if 'unit_id' not in cell or 'color' not in cell:
+            q, r = self._coords[index]
             raise ValueError(f"Cell at ({q},{r}) is missing unit_id/color: {cell!r}")
-        self._cells[(q, r)] = dict(cell)
+        self._place(index, dict(cell))
 
     def remove(self, q: int, r: int) -> Optional[CellData]:
         """Remove and return the piece at (q, r), or None if empty."""
-        return self._cells.pop((q, r), None)
+        i = self._index.get((q, r))
+        if i is None:
+            return None
+        return self._clear(i)
+
+    def _place(self, i: int, cell: CellData) -> None:
+        """Store *cell* (as-is, no copy) in slot i, replacing any occupant."""
+        self._clear(i)
+        if self._journal is not None:
+            self._journal.append((i, None))
+        self._cells[i] = cell
+        self._occupied.add(i)
+        self.cached_free_mask = None
+        self._zobrist ^= self._piece_hash(i, cell)
+        color = cell['color']
+        members = self._by_color.get(color)
+        if members is None:
+            members = self._by_color[color] = set()
+        members.add(i)
+
+    def _clear(self, i: int) -> Optional[CellData]:
+        """Empty slot i, returning whatever was there."""
+        cell = self._cells[i]
+        if cell is not None:
+            if self._journal is not None:
+                self._journal.append((i, cell))
+            self._cells[i] = None
+            self._occupied.discard(i)
+            self.cached_free_mask = None
+            self._by_color[cell['color']].discard(i)
+            self._zobrist ^= self._piece_hash(i, cell)
+        return cell
 
     def move(self, from_q: int, from_r: int, to_q: int, to_r: int) -> Optional[CellData]:
         """
@@ -143,12 +275,16 @@ class HexBoard:
         Returns the captured piece if one was present at (to), else None.
         Raises ValueError if source is empty.
         """
-        piece = self.get(from_q, from_r)
-        if piece is None:
+        src = self._index.get((from_q, from_r))
+        piece = None if src is None else self._cells[src]
+        if src is None or piece is None:
             raise ValueError(f"No piece at ({from_q},{from_r})")
-        captured = self.remove(to_q, to_r)
-        self.remove(from_q, from_r)
-        self.set_cell(to_q, to_r, piece)
+        dst = self._index.get((to_q, to_r))
+        if dst is None:
+            raise ValueError(f"Coordinate ({to_q},{to_r}) is outside radius {self.radius}")
+        captured = self._clear(dst)
+        self._clear(src)
+        self._place(dst, piece)
         return captured
 
     def deal_damage(self, q: int, r: int, damage: int) -> Optional[CellData]:
@@ -158,45 +294,176 @@ class HexBoard:
         Returns the unit's CellData if it was eliminated (hp <= 0),
         or None if it survived.
         """
-        cell = self.get(q, r)
+        i = self._index.get((q, r))
+        cell = None if i is None else self._cells[i]
         if cell is None:
             return None
+        if self._journal is not None:
+            self._journal.append((i, cell, cell.get('hp', _NO_HP)))
+        # HP feeds the position hash: toggle the old value out, the new one in
+        self._zobrist ^= self._piece_hash(i, cell)  # type: ignore
         cell['hp'] = max(0, cell.get('hp', 1) - damage)
+        self._zobrist ^= self._piece_hash(i, cell)  # type: ignore
         if cell['hp'] <= 0:
-            return self.remove(q, r)  # eliminated
+            return self._clear(i)  # type: ignore  # eliminated
         return None  # survived
 
+    # -- Undo journal --------------------------------------------------
+
+    def begin_undo(self) -> int:
+        """Start journalling mutations and return a mark for ``undo_to``.
+
+        Marks nest (a search can begin one per ply), but every mark must be
+        passed to ``undo_to`` or ``keep_undo`` exactly once, innermost first.
+        """
+        if self._journal is None:
+            self._journal = []
+        self._undo_depth += 1
+        return len(self._journal)
+
+    def undo_to(self, mark: int) -> None:
+        """Revert every mutation made since *mark* was taken.
+
+        Restores the original cell objects (with every field they carry),
+        the colour index and the Zobrist hash exactly.
+        """
+        journal = self._journal
+        if journal is None or not 0 <= mark <= len(journal):
+            raise ValueError(f"No undo frame at mark {mark}")
+        self._journal = None  # replaying must not journal itself
+        while len(journal) > mark:
+            entry = journal.pop()
+            if len(entry) == 2:
+                i, prev = entry
+                if prev is None:
+                    self._clear(i)
+                else:
+                    self._place(i, prev)
+            else:
+                i, cell, hp = entry
+                self._zobrist ^= self._piece_hash(i, cell)
+                if hp is _NO_HP:
+                    cell.pop('hp', None)
+                else:
+                    cell['hp'] = hp
+                self._zobrist ^= self._piece_hash(i, cell)
+        self._undo_depth -= 1
+        if self._undo_depth:
+            self._journal = journal
+
+    def keep_undo(self, mark: int) -> None:
+        """Close the frame *mark* keeping its mutations. An enclosing frame
+        can still revert them; with none left, journalling stops."""
+        journal = self._journal
+        if journal is None or not 0 <= mark <= len(journal):
+            raise ValueError(f"No undo frame at mark {mark}")
+        self._undo_depth -= 1
+        if not self._undo_depth:
+            self._journal = None
+
+    @contextmanager
+    def undoable(self) -> Iterator['HexBoard']:
+        """Context manager: mutate freely inside, everything is reverted on exit.
+
+        >>> with board.undoable():
+        ...     resolve_combat(board, src, dst, config)
+        ...     score = evaluate(board)
+        """
+        mark = self.begin_undo()
+        try:
+            yield self
+        finally:
+            self.undo_to(mark)
+
     def pieces_by_color(self, color: str) -> Dict[Coord, CellData]:
-        """Return all pieces belonging to the given color."""
-        return {c: d for c, d in self._cells.items() if d['color'] == color}
+        """Return all pieces belonging to the given color (a fresh dict)."""
+        cells = self._cells
+        coords = self._coords
+        return {coords[i]: cells[i] for i in self._by_color.get(color, ())}  # type: ignore
+
+    def count(self, color: str) -> int:
+        """Number of pieces of *color* on the board - O(1)."""
+        members = self._by_color.get(color)
+        return len(members) if members else 0
+
+    def color_indices(self, color: str) -> Iterator[int]:
+        """Iterate the cell indices of *color*'s pieces (live - don't mutate
+        the board while consuming it)."""
+        return iter(self._by_color.get(color, ()))
+
+    def iter_pieces(self, color: str) -> Iterator[Tuple[Coord, CellData]]:
+        """Iterate ``(coord, cell)`` over *color*'s pieces without copying.
+
+        Reads the live per-colour index, so the board must not be mutated
+        while the iterator is being consumed.
+        """
+        cells = self._cells
+        coords = self._coords
+        for i in self._by_color.get(color, ()):
+            yield coords[i], cells[i]  # type: ignore
 
     # -- Neighbour helpers ---------------------------------------------
 
     @staticmethod
     def neighbours(q: int, r: int) -> List[Coord]:
         """Return the six neighbouring coordinates (may be off-board)."""
-        return [(q + dq, r + dr) for dq, dr in HEX_DIRECTIONS.values()]
+        return [(q + dq, r + dr) for dq, dr in DIRECTION_OFFSETS]
 
     def valid_neighbours(self, q: int, r: int) -> List[Coord]:
         """Return only the neighbours that are inside the board."""
-        return [(nq, nr) for nq, nr in self.neighbours(q, r) if self.is_valid(nq, nr)]
+        i = self._index.get((q, r))
+        if i is None:
+            return [(nq, nr) for nq, nr in self.neighbours(q, r) if self.is_valid(nq, nr)]
+        coords = self._coords
+        return [coords[j] for j in self._neighbours[6 * i:6 * i + 6] if j >= 0]
 
     # -- Serialisation -------------------------------------------------
 
     def to_dict(self) -> BoardDict:
-        """Serialise to JSON-safe dict (for GameState.board_state)."""
-        return {coord_key(q, r): data for (q, r), data in self._cells.items()}
+        """Serialise to JSON-safe dict (for GameState.board_state).
+
+        Keys come from the geometry's precomputed key table, so this is a
+        lookup per piece rather than an f-string. The values are the board's
+        own cell dicts, not copies: serialise once per state change and
+        share the result (e.g. for both persistence and broadcast).
+        """
+        keys = self.geometry.keys
+        cells = self._cells
+        return {keys[i]: cells[i] for i in self._occupied}  # type: ignore
+
+    def clone(self) -> 'HexBoard':
+        """Independent copy of the position: fresh cell dicts, copied indexes
+        and hash, shared per-radius tables. O(pieces) - no coordinate parsing
+        or re-hashing. The undo journal is not copied."""
+        board = type(self)(self.radius)
+        src = self._cells
+        cells = board._cells
+        for i in self._occupied:
+            cells[i] = dict(src[i])  # type: ignore
+        board._occupied = set(self._occupied)
+        board._by_color = {color: set(members) for color, members in self._by_color.items()}
+        board._zobrist = self._zobrist
+        board.cached_free_mask = self.cached_free_mask
+        return board
 
     @classmethod
     def from_dict(cls, radius: int, data: BoardDict) -> 'HexBoard':
         """Reconstruct a board from a serialised dict."""
         board = cls(radius)
+        key_index = board.geometry.key_index
         for key, cell in data.items():
-            q, r = parse_coord(key)
-            board.set_cell(q, r, cell)
+            index = key_index.get(key)
+            if index is None:
+                # Not a canonical on-board key: a non-canonical spelling of a
+                # valid hex, an off-board coord, or garbage - parse_coord and
+                # set_cell raise the usual ValueErrors for the latter two.
+                q, r = parse_coord(key)
+                board.set_cell(q, r, cell)
+            else:
+                board.set_cell_at(index, cell)
         return board
 
     # -- Debug ---------------------------------------------------------
 
     def __repr__(self) -> str:
-        return f"HexBoard(radius={self.radius}, pieces={len(self._cells)})"
+        return f"HexBoard(radius={self.radius}, pieces={len(self._occupied)})"
@@ -2,6 +2,9 @@
 Config loader - parses a GameConfig dict (matching the shared JSON schema)
 and builds the initial HexBoard state.
 
+``load_config`` validates against shared/game-config.schema.json through
+the precompiled checker in schema_validator.py.
+
 The only fixed game fact is the board: a hexagon with 12 cells per edge
 (axial radius 11), rendered with an edge pointing up. Even that lives in
 DEFAULT_CONFIG rather than engine code, so it can change with the config.
@@ -9,14 +12,28 @@ DEFAULT_CONFIG rather than engine code, so it can change with the config.
 Everything about the units below is a PLACEHOLDER. The engine reads all
 movement/combat behaviour from this data - none of the unit ids mean
 anything to the code, and the real game's units will replace these.
+
+``compile_config`` turns a validated config dict into an immutable
+``GameConfig``: unit stats flattened into slotted ``UnitStats`` records
+(each with a small integer code), rules fields read once, and a SHA-256
+content fingerprint. Engine functions accept either form; the compiled one
+skips the nested dict walks on every move. ``compiled_configs`` is the
+process-wide cache of compiled configs keyed by fingerprint, so every game
+on the same rules shares one instance - including its ``initial_position``,
+so starting a game clones a prebuilt board instead of re-reading the setup.
 """
 
 from __future__ import annotations
 import copy
+import hashlib
+import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .board import HexBoard, coord_key, parse_coord
+from .schema_validator import validate_config_schema
 
 logger = logging.getLogger('game')
 
@@ -147,45 +164,162 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Compiled configs
+# ---------------------------------------------------------------------------
+
+class _Frozen:
+    """Base for slotted records that refuse mutation after __init__."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class UnitStats(_Frozen):
+    """One unit definition's engine-relevant stats."""
+
+    __slots__ = ('code', 'id', 'name', 'symbol', 'move', 'attack', 'hp', 'value')
+
+    def __init__(self, code: int, unit_id: str, unit_def: Dict[str, Any]):
+        init = object.__setattr__
+        init(self, 'code', code)
+        init(self, 'id', unit_id)
+        init(self, 'name', unit_def.get('name', unit_id))
+        init(self, 'symbol', unit_def.get('symbol', ''))
+        init(self, 'move', unit_def.get('move', 0))
+        init(self, 'attack', unit_def.get('attack', 1))
+        init(self, 'hp', unit_def.get('hp', 1))
+        init(self, 'value', unit_def.get('value', 0))
+
+    def __repr__(self) -> str:
+        return f"UnitStats({self.id!r}, move={self.move}, attack={self.attack}, hp={self.hp})"
+
+
+class GameConfig(_Frozen):
+    """
+    Immutable compiled form of a config dict (see ``compile_config``).
+
+      raw              the source dict - shared, never mutate it
+      fingerprint      SHA-256 hex of the canonical JSON (``config_fingerprint``)
+      radius           board radius
+      units            tuple of UnitStats, indexed by unit code
+      unit_by_id       unit id -> UnitStats
+      move_ranges      unit id -> move stat (the move validator's lookup)
+      max_turns        rules.maxTurns (0 = unlimited)
+      turn_time_limit  rules.turnTimeLimit in seconds (0 = none)
+      objective        rules.objective
+      initial_position the starting position (``InitialPosition``), built
+                       on first use and shared by every game on the config
+
+    ``get``/``[]`` read through to *raw*, so code written against the dict
+    form keeps working.
+    """
+
+    __slots__ = ('raw', 'fingerprint', 'radius', 'units', 'unit_by_id', 'move_ranges',
+                 'max_turns', 'turn_time_limit', 'objective', '_initial_position')
+
+    def __init__(self, raw: Dict[str, Any], fingerprint: Optional[str] = None):
+        init = object.__setattr__
+        init(self, 'raw', raw)
+        init(self, 'fingerprint', fingerprint or config_fingerprint(raw))
+        init(self, 'radius', raw.get('board', {}).get('radius', DEFAULT_CONFIG['board']['radius']))
+        units = tuple(
+            UnitStats(code, unit_id, unit_def or {})
+            for code, (unit_id, unit_def) in enumerate(raw.get('units', {}).items())
+        )
+        init(self, 'units', units)
+        init(self, 'unit_by_id', {u.id: u for u in units})
+        init(self, 'move_ranges', {u.id: u.move for u in units})
+        rules = raw.get('rules', {})
+        init(self, 'max_turns', rules.get('maxTurns', 0))
+        init(self, 'turn_time_limit', rules.get('turnTimeLimit', 0))
+        init(self, 'objective', rules.get('objective', 'elimination'))
+        init(self, '_initial_position', None)
+
+    @property
+    def initial_position(self) -> 'InitialPosition':
+        position = self._initial_position
+        if position is None:
+            # Racing builders produce equal templates; whichever lands last wins.
+            position = InitialPosition(_build_board(self.raw))
+            object.__setattr__(self, '_initial_position', position)
+        return position
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.raw.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.raw[key]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, GameConfig) and other.fingerprint == self.fingerprint
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
+
+    def __repr__(self) -> str:
+        return f"GameConfig(radius={self.radius}, units={len(self.units)}, fingerprint={self.fingerprint[:12]})"
+
+
+class InitialPosition(_Frozen):
+    """
+    A config's starting position, built once and cloned per game.
+
+      board        template HexBoard - never mutate it; ``new_board`` clones it
+      board_state  its serialised form (``HexBoard.to_dict``) over private
+                   copies of the cells, ready to persist and broadcast.
+                   Shared by every game on the config: never mutate it.
+    """
+
+    __slots__ = ('board', 'board_state')
+
+    def __init__(self, board: HexBoard):
+        init = object.__setattr__
+        init(self, 'board', board)
+        init(self, 'board_state', {key: dict(cell) for key, cell in board.to_dict().items()})
+
+    def new_board(self) -> HexBoard:
+        """A fresh, independently mutable board in the starting position."""
+        return self.board.clone()
+
+    def __repr__(self) -> str:
+        return f"InitialPosition(radius={self.board.radius}, pieces={self.board.piece_count})"
+
+
+# Anything the engine functions accept as a config
+ConfigLike = Union[Dict[str, Any], GameConfig]
+
+
+def raw_config(config: ConfigLike) -> Dict[str, Any]:
+    """The plain dict behind *config* (for JSON persistence / broadcasts)."""
+    return config.raw if isinstance(config, GameConfig) else config
+
+
 # ---------------------------------------------------------------------------
 # Validation helpers
 # ---------------------------------------------------------------------------
 
 def _validate_config(config: Dict[str, Any]) -> List[str]:
     """
-    Light validation of a config dict.
+    Validate a config dict against the shared JSON schema (see
+    schema_validator.py), then check what the schema can't express: every
+    unit placed in setup must be defined in units.
     Returns a list of error strings (empty = valid).
     """
-    errors: List[str] = []
-
-    if 'version' not in config:
-        errors.append("Missing 'version'")
-    if 'board' not in config or 'radius' not in config.get('board', {}):
-        errors.append("Missing 'board.radius'")
-    else:
-        r = config['board']['radius']
-        if not isinstance(r, int) or r < 1 or r > 50:
-            errors.append(f"board.radius must be an integer 1-50, got {r}")
-
-    if 'units' not in config or not isinstance(config.get('units'), dict):
-        errors.append("Missing or invalid 'units'")
-
-    if 'setup' not in config:
-        errors.append("Missing 'setup'")
-    else:
-        for side in ('white', 'black'):
-            placement = config['setup'].get(side, {})
-            if not isinstance(placement, dict):
-                errors.append(f"setup.{side} must be a dict")
-                continue
-            for coord_str, unit_id in placement.items():
-                try:
-                    parse_coord(coord_str)
-                except ValueError:
-                    errors.append(f"Invalid coordinate '{coord_str}' in setup.{side}")
-                if unit_id not in config.get('units', {}):
-                    errors.append(f"Unknown unit '{unit_id}' at {coord_str} in setup.{side}")
+    errors = validate_config_schema(config)
+    if errors:
+        return errors
 
+    units = config['units']
+    for side in ('white', 'black'):
+        for coord_str, unit_id in config['setup'][side].items():
+            if unit_id not in units:
+                errors.append(f"Unknown unit '{unit_id}' at {coord_str} in setup.{side}")
     return errors
 
 
@@ -210,30 +344,195 @@ def load_config(raw: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     return config
 
 
-def build_initial_board(config: Dict[str, Any]) -> HexBoard:
+def config_fingerprint(config: ConfigLike) -> str:
+    """
+    Stable content hash of a config (SHA-256 hex of its canonical JSON).
+
+    Two configs with the same content fingerprint equal regardless of key
+    order or which process built them, so it can key caches of anything
+    derived from the rules.
+    """
+    if isinstance(config, GameConfig):
+        return config.fingerprint
+    return hashlib.sha256(_canonical_json(config)).hexdigest()
+
+
+def _canonical_json(config: Dict[str, Any]) -> bytes:
+    return json.dumps(config, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def unit_move_ranges(config: ConfigLike) -> Dict[str, int]:
+    """unit id -> ``move`` stat; precomputed on a compiled config."""
+    if isinstance(config, GameConfig):
+        return config.move_ranges
+    return {unit_id: (unit_def or {}).get('move', 0) for unit_id, unit_def in config.get('units', {}).items()}
+
+
+def unit_attack(config: ConfigLike, unit_id: str) -> int:
+    """The unit's ``attack`` stat (1 for unknown units)."""
+    if isinstance(config, GameConfig):
+        unit = config.unit_by_id.get(unit_id)
+        return unit.attack if unit is not None else 1
+    return config.get('units', {}).get(unit_id, {}).get('attack', 1)
+
+
+def compile_config(config: ConfigLike) -> GameConfig:
+    """Compile a (validated) config dict into an immutable GameConfig.
+
+    The dict is kept by reference as ``GameConfig.raw``; don't mutate it
+    afterwards. Already-compiled configs are returned unchanged.
+    """
+    if isinstance(config, GameConfig):
+        return config
+    return GameConfig(config)
+
+
+def build_initial_board(config: ConfigLike) -> HexBoard:
     """
     Create a HexBoard populated with the starting pieces described in *config*.
 
     Each piece is placed with its max HP from the unit definition.
-    Returns the ready-to-play board instance.
+    Returns the ready-to-play board instance. A compiled GameConfig clones
+    its cached ``initial_position`` instead of re-reading the setup.
     """
+    if isinstance(config, GameConfig):
+        return config.initial_position.new_board()
+    return _build_board(config)
+
+
+def _build_board(config: Dict[str, Any]) -> HexBoard:
     radius: int = config['board']['radius']
     board = HexBoard(radius)
+    key_index = board.geometry.key_index
     units = config.get('units', {})
 
     for color in ('white', 'black'):
         placement = config.get('setup', {}).get(color, {})
         for coord_str, unit_id in placement.items():
-            q, r = parse_coord(coord_str)
-            if not board.is_valid(q, r):
-                logger.warning(
-                    f"Skipping out-of-bounds placement: {unit_id} at ({q},{r}) "
-                    f"for {color} (radius={radius})"
-                )
-                continue
+            # Canonical "q,r" keys resolve straight from the geometry table;
+            # only unusual spellings (or off-board coords) pay for a parse.
+            index = key_index.get(coord_str)
+            if index is None:
+                q, r = parse_coord(coord_str)
+                index = board.index_of(q, r)
+                if index < 0:
+                    logger.warning(
+                        f"Skipping out-of-bounds placement: {unit_id} at ({q},{r}) "
+                        f"for {color} (radius={radius})"
+                    )
+                    continue
             unit_def = units.get(unit_id, {})
             hp = unit_def.get('hp', 1)
-            board.set(q, r, unit_id, color, hp=hp, max_hp=hp)
+            board.set_cell_at(index, {'unit_id': unit_id, 'color': color, 'hp': hp, 'max_hp': hp})
 
-    logger.info(f"Built initial board: radius={radius}, pieces={len(board.to_dict())}")
+    logger.info(f"Built initial board: radius={radius}, pieces={board.piece_count}")
     return board
+
+
+# ---------------------------------------------------------------------------
+# Process-wide compiled-config cache
+# ---------------------------------------------------------------------------
+
+class CompiledConfigCache:
+    """
+    Bounded LRU of fingerprint -> GameConfig.
+
+    Every game on the same rules (all default-mode games, rematches of a
+    custom setup) resolves to one shared, immutable GameConfig instead of
+    its own dict copy. ``nbytes`` tracks the canonical-JSON size of the
+    cached configs as a footprint estimate for sizing ``maxsize``.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[str, Tuple[GameConfig, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._default_fingerprint: Optional[str] = None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, raw: Optional[Dict[str, Any]] = None, validate: bool = True,
+            fingerprint: Optional[str] = None) -> GameConfig:
+        """
+        Return the shared GameConfig for *raw* (None/empty = DEFAULT_CONFIG).
+
+        On a miss the config is validated like ``load_config`` (unless
+        *validate* is False, for configs that were validated before being
+        persisted) and deep-copied, so the cached instance never aliases the
+        caller's dict. Raises ValueError for invalid configs.
+
+        Pass *fingerprint* when it is already known (e.g. stored alongside
+        the config) to skip hashing *raw*.
+        """
+        canonical: Optional[bytes] = None
+        if not raw:
+            raw = DEFAULT_CONFIG
+            fingerprint = self._default_fingerprint
+            if fingerprint is None:
+                canonical = _canonical_json(raw)
+                fingerprint = self._default_fingerprint = hashlib.sha256(canonical).hexdigest()
+        elif not fingerprint:
+            canonical = _canonical_json(raw)
+            fingerprint = hashlib.sha256(canonical).hexdigest()
+        return self.get_by_fingerprint(fingerprint) or self._compile(raw, fingerprint, canonical, validate)
+
+    def get_by_fingerprint(self, fingerprint: str) -> Optional[GameConfig]:
+        """The cached GameConfig for *fingerprint*, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry[0]
+
+    def _compile(self, raw: Dict[str, Any], fingerprint: str,
+                 canonical: Optional[bytes], validate: bool) -> GameConfig:
+        config = GameConfig(load_config(raw) if validate else copy.deepcopy(raw), fingerprint)
+        size = len(canonical if canonical is not None else _canonical_json(raw))
+        with self._lock:
+            existing = self._entries.get(fingerprint)
+            if existing is not None:  # another thread compiled it meanwhile
+                return existing[0]
+            self._entries[fingerprint] = (config, size)
+            self.nbytes += size
+            while len(self._entries) > self.maxsize:
+                _fp, (_config, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+        return config
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the counters, entry count and footprint estimate."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'nbytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+compiled_configs = CompiledConfigCache()
+
+
+def get_compiled_config(raw: Optional[Dict[str, Any]] = None, validate: bool = True,
+                        fingerprint: Optional[str] = None) -> GameConfig:
+    """Shared compiled config for *raw* via the process-wide cache."""
+    return compiled_configs.get(raw, validate, fingerprint)
@@ -9,14 +9,18 @@ Key differences from chess:
   * No check/checkmate/stalemate concepts.
   * The game ends when ALL units of one side are eliminated ("elimination").
 
-All functions are pure (no DB access) and operate on a HexBoard + config.
+All functions are pure (no DB access) and operate on a HexBoard + config
+(a config dict or a compiled ``GameConfig``).
+``make_move``/``unmake_move`` wrap ``resolve_combat`` in the board's undo
+journal so search and what-if analysis can try moves without copying.
 """
 
 from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 
 from .board import HexBoard, CellData, Coord
-from .move_validator import get_legal_moves
+from .config_loader import ConfigLike, unit_attack, unit_move_ranges
+from .move_validator import get_all_legal_moves, get_legal_moves, piece_move_range
 
 
 # ---------------------------------------------------------------------------
@@ -27,7 +31,7 @@ def resolve_combat(
     board: HexBoard,
     from_coord: Coord,
     to_coord: Coord,
-    config: Dict[str, Any],
+    config: ConfigLike,
 ) -> Dict[str, Any]:
     """
     Resolve a move from *from_coord* to *to_coord*.
@@ -63,8 +67,7 @@ def resolve_combat(
         }
 
     # -- Occupied by enemy -> combat --------------------------------
-    unit_def = config.get('units', {}).get(attacker['unit_id'], {})
-    atk_damage = unit_def.get('attack', 1)
+    atk_damage = unit_attack(config, attacker['unit_id'])
 
     eliminated = board.deal_damage(*to_coord, atk_damage)
 
@@ -89,6 +92,39 @@ def resolve_combat(
     return result
 
 
+def make_move(
+    board: HexBoard,
+    from_coord: Coord,
+    to_coord: Coord,
+    config: ConfigLike,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    ``resolve_combat`` that can be taken back.
+
+    Returns ``(result, undo_mark)``; pass the mark to ``unmake_move`` to
+    restore the board exactly - moved attacker, defender HP, eliminated
+    unit and every extra field they carry. Moves nest like a search stack:
+    unmake them in reverse order.
+    """
+    mark = board.begin_undo()
+    try:
+        result = resolve_combat(board, from_coord, to_coord, config)
+    except Exception:
+        board.undo_to(mark)
+        raise
+    return result, mark
+
+
+def unmake_move(board: HexBoard, undo_mark: int) -> None:
+    """Revert the ``make_move`` that returned *undo_mark*."""
+    board.undo_to(undo_mark)
+
+
+def keep_move(board: HexBoard, undo_mark: int) -> None:
+    """Let the ``make_move`` that returned *undo_mark* stand."""
+    board.keep_undo(undo_mark)
+
+
 # ---------------------------------------------------------------------------
 # Legal-move helpers
 # ---------------------------------------------------------------------------
@@ -96,19 +132,30 @@ def resolve_combat(
 def has_any_legal_move(
     board: HexBoard,
     color: str,
-    config: Dict[str, Any],
+    config: ConfigLike,
 ) -> bool:
-    """Return True if *color* has at least one legal move."""
-    for coord in list(board.pieces_by_color(color).keys()):
-        if get_legal_moves(board, coord, config, color):
-            return True
+    """Return True if *color* has at least one legal move.
+
+    A unit that can move at all can always take one step, so this only
+    needs to find one mobile piece with an empty adjacent hex - no flood
+    fill.
+    """
+    move_ranges = unit_move_ranges(config)
+    cells = board.cell_slots
+    neighbours = board.neighbour_table
+    for i in board.color_indices(color):
+        if piece_move_range(cells[i], move_ranges, color) <= 0:
+            continue
+        for j in neighbours[6 * i:6 * i + 6]:
+            if j >= 0 and cells[j] is None:
+                return True
     return False
 
 
 def get_legal_moves_filtered(
     board: HexBoard,
     coord: Coord,
-    config: Dict[str, Any],
+    config: ConfigLike,
     color: str,
 ) -> List[Coord]:
     """
@@ -127,7 +174,7 @@ def get_legal_moves_filtered(
 def detect_outcome(
     board: HexBoard,
     color_to_move: str,
-    config: Dict[str, Any],
+    config: ConfigLike,
 ) -> Optional[str]:
     """
     After a move has been made, call this to check if the game is over.
@@ -138,11 +185,10 @@ def detect_outcome(
 
     No stalemate: if a player has pieces but no moves, the turn simply
     passes (or the game continues until elimination).
-    """
-    white_count = len(board.pieces_by_color('white'))
-    black_count = len(board.pieces_by_color('black'))
 
-    if white_count == 0 or black_count == 0:
+    Constant-time: reads the board's incrementally maintained piece counts.
+    """
+    if board.count('white') == 0 or board.count('black') == 0:
         return 'elimination'
     return None
 
@@ -151,10 +197,7 @@ def is_attacked(
     board: HexBoard,
     target: Coord,
     by_color: str,
-    config: Dict[str, Any],
+    config: ConfigLike,
 ) -> bool:
     """Return True if any piece of *by_color* can reach *target*."""
-    for coord in list(board.pieces_by_color(by_color).keys()):
-        if target in get_legal_moves(board, coord, config, by_color):
-            return True
-    return False
+    return any(target in moves for moves in get_all_legal_moves(board, by_color, config).values())
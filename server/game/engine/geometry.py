@@ -0,0 +1,104 @@
+"""
+Process-wide hex geometry tables, built lazily once per board radius.
+
+Nothing about a board's shape depends on what stands on it, and every live
+game on the default config shares radius 11, so all the coordinate
+bookkeeping is computed once per radius and shared read-only by every
+HexBoard, build_initial_board and the move validator:
+
+  coords      cell index -> (q, r), in q-major order
+  index       (q, r) -> cell index
+  keys        cell index -> "q,r" string (the JSON / DB key)
+  key_index   "q,r" string -> cell index
+  neighbours  flat array('h'), slot 6*i + d = neighbour of i in direction d
+              of DIRECTION_OFFSETS, or -1 if off-board
+  ring        array('B'), cell index -> hex distance from the centre
+  rings       rings[d] = tuple of cell indices exactly d steps from the centre
+  zobrist     array('Q'), cell index -> deterministic 64-bit Zobrist key
+              (see zobrist.py)
+
+Treat every table as immutable - they are shared across boards and games.
+"""
+
+from __future__ import annotations
+from array import array
+from typing import Dict, Tuple
+
+from .zobrist import cell_keys
+
+# Type alias (mirrors board.Coord; board.py imports from here, not vice versa)
+Coord = Tuple[int, int]
+
+# Six axial direction offsets (flat-top orientation)
+HEX_DIRECTIONS: Dict[str, Coord] = {
+    'E':  (+1,  0),
+    'W':  (-1,  0),
+    'NE': (+1, -1),
+    'NW': ( 0, -1),
+    'SE': ( 0, +1),
+    'SW': (-1, +1),
+}
+
+# Neighbour-table slot order: slot d of a cell holds the cell one step in
+# the d-th direction of HEX_DIRECTIONS (E, W, NE, NW, SE, SW).
+DIRECTION_OFFSETS: Tuple[Coord, ...] = tuple(HEX_DIRECTIONS.values())
+
+
+class HexGeometry:
+    """Precomputed coordinate tables for one board radius (see module docstring)."""
+
+    __slots__ = ('radius', 'size', 'coords', 'index', 'keys', 'key_index',
+                 'neighbours', 'ring', 'rings', 'zobrist')
+
+    def __init__(self, radius: int):
+        if radius < 1:
+            raise ValueError("Board radius must be >= 1")
+        self.radius = radius
+        self.coords: Tuple[Coord, ...] = tuple(
+            (q, r)
+            for q in range(-radius, radius + 1)
+            for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1)
+        )
+        self.size = len(self.coords)
+        self.index: Dict[Coord, int] = {c: i for i, c in enumerate(self.coords)}
+        self.keys: Tuple[str, ...] = tuple(f"{q},{r}" for q, r in self.coords)
+        self.key_index: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+
+        neighbours = array('h', [-1]) * (6 * self.size)
+        for i, (q, r) in enumerate(self.coords):
+            base = 6 * i
+            for d, (dq, dr) in enumerate(DIRECTION_OFFSETS):
+                j = self.index.get((q + dq, r + dr))
+                if j is not None:
+                    neighbours[base + d] = j
+        self.neighbours = neighbours
+
+        self.ring = array('B', (max(abs(q), abs(r), abs(q + r)) for q, r in self.coords))
+        by_ring: list = [[] for _ in range(radius + 1)]
+        for i, d in enumerate(self.ring):
+            by_ring[d].append(i)
+        self.rings: Tuple[Tuple[int, ...], ...] = tuple(tuple(r) for r in by_ring)
+
+        self.zobrist = cell_keys(radius, self.size)
+
+    def distance(self, a: int, b: int) -> int:
+        """Hex distance between two cell indices."""
+        aq, ar = self.coords[a]
+        bq, br = self.coords[b]
+        dq = aq - bq
+        dr = ar - br
+        return max(abs(dq), abs(dr), abs(dq + dr))
+
+    def __repr__(self) -> str:
+        return f"HexGeometry(radius={self.radius}, cells={self.size})"
+
+
+_GEOMETRIES: Dict[int, HexGeometry] = {}
+
+
+def get_geometry(radius: int) -> HexGeometry:
+    """Return the shared HexGeometry for *radius*, building it on first use."""
+    geometry = _GEOMETRIES.get(radius)
+    if geometry is None:
+        geometry = _GEOMETRIES.setdefault(radius, HexGeometry(radius))
+    return geometry
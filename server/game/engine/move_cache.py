@@ -0,0 +1,103 @@
+"""
+Legal-move cache.
+
+The board does not change between two moves, yet the same destination set
+is asked for repeatedly: client previews, retried submissions, and the
+server's own validation of the move finally played. ``LegalMoveCache``
+keeps the answers in a bounded LRU keyed by
+
+  (board radius, Zobrist hash of the position, config fingerprint,
+   source coord, colour)
+
+Any mutation of the board changes its Zobrist hash, so stale entries are
+never served - they just age out of the LRU. Counters for hits, misses and
+evictions are kept for monitoring.
+"""
+
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .board import HexBoard, Coord
+from .config_loader import ConfigLike, config_fingerprint
+from .move_validator import get_legal_moves
+
+CacheKey = Tuple[int, int, str, Coord, str]
+
+DEFAULT_MAXSIZE = 4096
+
+
+class LegalMoveCache:
+    """Bounded LRU of legal-move sets (see module docstring)."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[CacheKey, Tuple[Coord, ...]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_legal_moves(
+        self,
+        board: HexBoard,
+        coord: Coord,
+        config: ConfigLike,
+        color: str,
+        fingerprint: Optional[str] = None,
+    ) -> List[Coord]:
+        """``move_validator.get_legal_moves`` served from the cache when possible.
+
+        A compiled ``GameConfig`` carries its fingerprint; for a plain dict
+        pass *fingerprint* if the caller already has it, to skip rehashing.
+        """
+        key: CacheKey = (
+            board.radius,
+            board.zobrist_hash,
+            fingerprint or config_fingerprint(config),
+            coord,
+            color,
+        )
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(moves)
+            self.misses += 1
+
+        moves = tuple(get_legal_moves(board, coord, config, color))
+        with self._lock:
+            self._entries[key] = moves
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return list(moves)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the counters and current size."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide instance used by the consumer
+legal_move_cache = LegalMoveCache()
@@ -12,22 +12,126 @@ onto an occupied hex - own and enemy pieces both block equally, so a blocked
 path must be routed around rather than jumped. There is no separate
 capture-by-moving here: attack is a different action from movement.
 
+Three interchangeable reachability engines implement the flood fill (see
+``MOVE_ENGINES``), selected process-wide with ``set_move_engine``:
+
+  'bitboard'  (default) expands the whole frontier at once with big-integer
+              shifts over one cached occupancy snapshot (see bitboard.py)
+  'bfs'       walks flat cell indices and the shared per-radius neighbour
+              table (see geometry.py) - integer lookups only, no coordinate
+              tuples or neighbour lists built per step
+  'numpy'     flood-fills every source of a batch together with vectorised
+              gathers (see numpy_engine.py); optional - falls back to 'bfs'
+              when NumPy is not installed
+
+All return the same destination set; only the order of the list differs.
+Engines take a batch of sources, so ``get_all_legal_moves`` answers a whole
+side in one call that shares the tables and a single occupancy snapshot;
+``get_all_legal_move_keys`` gives the same map in its "q,r" wire form,
+read from the geometry's precomputed keys.
+
 Hex geometry reference: https://www.redblobgames.com/grids/hexagons/
 """
 
 from __future__ import annotations
-from typing import Any, Dict, List, Set
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+from . import numpy_engine
+from .bitboard import decode, free_mask, get_layout, reachable_window
 from .board import HexBoard, Coord
+from .config_loader import ConfigLike, unit_move_ranges
+
+# ---------------------------------------------------------------------------
+# Reachability engines:
+#   (board, [(start cell index, move range), ...]) -> [cell indices, ...]
+# ---------------------------------------------------------------------------
+
+Sources = Sequence[Tuple[int, int]]
+
+
+def _bfs_reachable(board: HexBoard, sources: Sources) -> List[List[int]]:
+    neighbours = board.neighbour_table
+    cells = board.cell_slots
+    size = len(cells)
+    results: List[List[int]] = []
+
+    for start, move_range in sources:
+        visited = bytearray(size)
+        visited[start] = 1
+        frontier: List[int] = [start]
+        reached: List[int] = []
+
+        for _ in range(move_range):
+            next_frontier: List[int] = []
+            for i in frontier:
+                base = 6 * i
+                for j in neighbours[base:base + 6]:
+                    if j < 0 or visited[j]:
+                        continue
+                    visited[j] = 1
+                    if cells[j] is not None:
+                        continue  # occupied - blocks entry and further passage
+                    next_frontier.append(j)
+            if not next_frontier:
+                break
+            reached.extend(next_frontier)
+            frontier = next_frontier
+
+        results.append(reached)
+    return results
+
+
+def _bitboard_reachable(board: HexBoard, sources: Sources) -> List[List[int]]:
+    layout = get_layout(board.radius)
+    free = free_mask(board, layout)
+    return [
+        decode(layout, *reachable_window(layout, free, start, move_range))
+        for start, move_range in sources
+    ]
+
+
+MOVE_ENGINES: Dict[str, Callable[[HexBoard, Sources], List[List[int]]]] = {
+    'bfs': _bfs_reachable,
+    'bitboard': _bitboard_reachable,
+    'numpy': numpy_engine.reachable if numpy_engine.AVAILABLE else _bfs_reachable,
+}
+
+_engine_name = 'bitboard'
+_reachable = MOVE_ENGINES[_engine_name]
+
+
+def set_move_engine(name: str) -> None:
+    """Select the reachability engine used by ``get_legal_moves``."""
+    global _engine_name, _reachable
+    if name not in MOVE_ENGINES:
+        raise ValueError(f"Unknown move engine {name!r}; choose from {sorted(MOVE_ENGINES)}")
+    _engine_name = name
+    _reachable = MOVE_ENGINES[name]
+
+
+def get_move_engine() -> str:
+    """Name of the currently selected reachability engine."""
+    return _engine_name
+
 
 # ---------------------------------------------------------------------------
 # Core validation
 # ---------------------------------------------------------------------------
 
+def piece_move_range(piece: Optional[Dict[str, Any]], move_ranges: Dict[str, int], color: str) -> int:
+    """The piece's ``move`` stat, or 0 if it cannot move for *color*.
+
+    *move_ranges* is ``config_loader.unit_move_ranges(config)``.
+    """
+    if not piece or piece['color'] != color:
+        return 0
+    return move_ranges.get(piece['unit_id'], 0)
+
+
 def get_legal_moves(
     board: HexBoard,
     coord: Coord,
-    config: Dict[str, Any],
+    config: ConfigLike,
     color: str,
 ) -> List[Coord]:
     """
@@ -37,45 +141,70 @@ def get_legal_moves(
     returns an empty list. Movement comes purely from the unit's ``move``
     stat - there is no per-unit engine logic.
     """
-    piece = board.get(*coord)
-    if not piece or piece['color'] != color:
+    move_range = piece_move_range(board.get(*coord), unit_move_ranges(config), color)
+    if move_range <= 0:
         return []
 
-    unit_def = config.get('units', {}).get(piece['unit_id'])
-    if not unit_def:
-        return []
+    coords = board.geometry.coords
+    reached, = _reachable(board, [(board.geometry.index[coord], move_range)])
+    return [coords[i] for i in reached]
 
-    move_range = unit_def.get('move', 0)
-    if move_range <= 0:
-        return []
 
-    visited: Set[Coord] = {coord}
-    frontier: List[Coord] = [coord]
-    moves: List[Coord] = []
+def get_all_legal_moves(
+    board: HexBoard,
+    color: str,
+    config: ConfigLike,
+) -> Dict[Coord, List[Coord]]:
+    """
+    Legal destinations for every piece of *color*, in one engine call.
+
+    Equivalent to ``get_legal_moves`` per piece but shares the lookups and
+    occupancy snapshot across the whole side. Pieces with no legal move
+    are omitted.
+    """
+    coords = board.geometry.coords
+    return {
+        coords[start]: [coords[j] for j in reached]
+        for start, reached in _side_reachable(board, color, config)
+    }
+
+
+def get_all_legal_move_keys(
+    board: HexBoard,
+    color: str,
+    config: ConfigLike,
+) -> Dict[str, List[str]]:
+    """``get_all_legal_moves`` with "q,r" keys - the form sent to clients."""
+    keys = board.geometry.keys
+    return {
+        keys[start]: [keys[j] for j in reached]
+        for start, reached in _side_reachable(board, color, config)
+    }
+
 
-    for _ in range(move_range):
-        next_frontier: List[Coord] = []
-        for cq, cr in frontier:
-            for nq, nr in board.valid_neighbours(cq, cr):
-                if (nq, nr) in visited:
-                    continue
-                visited.add((nq, nr))
-                if board.get(nq, nr) is not None:
-                    continue  # occupied - blocks entry and further passage
-                moves.append((nq, nr))
-                next_frontier.append((nq, nr))
-        if not next_frontier:
-            break
-        frontier = next_frontier
+def _side_reachable(board: HexBoard, color: str, config: ConfigLike) -> Iterator[Tuple[int, List[int]]]:
+    """(cell index, reachable cell indices) of every piece of *color* that
+    can move somewhere, from one engine call."""
+    move_ranges = unit_move_ranges(config)
+    cells = board.cell_slots
+    starts: List[int] = []
+    sources: List[Tuple[int, int]] = []
+    for i in board.color_indices(color):
+        move_range = piece_move_range(cells[i], move_ranges, color)
+        if move_range > 0:
+            starts.append(i)
+            sources.append((i, move_range))
 
-    return moves
+    for start, reached in zip(starts, _reachable(board, sources)):
+        if reached:
+            yield start, reached
 
 
 def is_legal_move(
     board: HexBoard,
     from_coord: Coord,
     to_coord: Coord,
-    config: Dict[str, Any],
+    config: ConfigLike,
     color: str,
 ) -> bool:
     """Quick check: is the move from -> to in the legal set?"""
@@ -0,0 +1,224 @@
+"""
+Config schema validator - shared/game-config.schema.json compiled to Python.
+
+The JSON schema is the single source of truth for the config shape (the
+client validates against the same file). Rather than walking the schema on
+every call like a generic JSON-schema library would, ``compile_schema``
+walks it ONCE and returns a tree of closures specialised to it: each node
+has its keywords, required names, property validators and compiled regexes
+bound up front, so validating a config is plain isinstance checks, dict
+lookups and comparisons.
+
+Only the draft-07 keywords the schema actually uses are supported (type,
+required, properties, additionalProperties, propertyNames, pattern, enum,
+minimum, maximum, maxLength); any other keyword raises at compile time so a
+schema edit can't be silently ignored. Annotations (title, description,
+$schema) are skipped.
+
+Errors are strings of the form ``"units.pawn.hp: must be >= 1"``, collected
+rather than raised so a caller can report several at once; collection stops
+after ``MAX_ERRORS`` so a hostile 32 KB payload can't produce a megabyte of
+messages.
+"""
+
+from __future__ import annotations
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCHEMA_PATH = Path(__file__).resolve().parents[3] / 'shared' / 'game-config.schema.json'
+
+MAX_ERRORS = 20
+
+# (value, path, errors) -> None; appends to errors
+Check = Callable[[Any, str, List[str]], None]
+# value -> valid?
+Predicate = Callable[[Any], bool]
+
+_ANNOTATIONS = frozenset({'$schema', 'title', 'description'})
+_SUPPORTED = frozenset({
+    'type', 'required', 'properties', 'additionalProperties', 'propertyNames',
+    'pattern', 'enum', 'minimum', 'maximum', 'maxLength',
+})
+_LEAF_KEYWORDS = frozenset({'type', 'pattern', 'enum', 'minimum', 'maximum', 'maxLength'}) | _ANNOTATIONS
+
+
+class _TooManyErrors(Exception):
+    pass
+
+
+def _fail(errors: List[str], path: str, message: str) -> None:
+    errors.append(f"{path or 'config'}: {message}")
+    if len(errors) >= MAX_ERRORS:
+        raise _TooManyErrors
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def _type_check(name: str) -> Callable[[Any], bool]:
+    if name == 'object':
+        return lambda v: isinstance(v, dict)
+    if name == 'string':
+        return lambda v: isinstance(v, str)
+    if name == 'integer':
+        return lambda v: isinstance(v, int) and not isinstance(v, bool)
+    if name == 'number':
+        return lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    if name == 'boolean':
+        return lambda v: isinstance(v, bool)
+    if name == 'array':
+        return lambda v: isinstance(v, list)
+    raise ValueError(f"Unsupported schema type {name!r}")
+
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """Compile a (sub)schema into a validator closure."""
+    return _compile(schema)[0]
+
+
+def _all_of(preds: List[Predicate]) -> Predicate:
+    if len(preds) == 1:
+        return preds[0]
+
+    def fast(value: Any) -> bool:
+        for pred in preds:
+            if not pred(value):
+                return False
+        return True
+    return fast
+
+
+def _compile(schema: Dict[str, Any]) -> Tuple[Check, Optional[Predicate]]:
+    """Return (check, fast) for *schema*. *fast* is a plain valid/invalid
+    predicate, built only for leaf (non-object) schemas: the object loop
+    calls it per value and falls back to *check* just to word the error."""
+    unknown = set(schema) - _SUPPORTED - _ANNOTATIONS
+    if unknown:
+        raise ValueError(f"Unsupported schema keyword(s): {sorted(unknown)}")
+
+    checks: List[Check] = []
+    preds: List[Predicate] = []
+
+    type_name = schema.get('type')
+    if type_name is not None:
+        is_type = _type_check(type_name)
+        type_message = f"must be {'an' if type_name[0] in 'aeiou' else 'a'} {type_name}"
+        preds.append(is_type)
+    else:
+        is_type = None
+
+    if 'enum' in schema:
+        allowed = tuple(schema['enum'])
+        enum_message = f"must be one of {list(allowed)}"
+
+        def check_enum(value: Any, path: str, errors: List[str]) -> None:
+            if value not in allowed:
+                _fail(errors, path, enum_message)
+        checks.append(check_enum)
+        preds.append(lambda v: v in allowed)
+
+    if 'minimum' in schema or 'maximum' in schema:
+        lo = schema.get('minimum')
+        hi = schema.get('maximum')
+
+        def check_range(value: Any, path: str, errors: List[str]) -> None:
+            if lo is not None and value < lo:
+                _fail(errors, path, f"must be >= {lo}, got {value}")
+            elif hi is not None and value > hi:
+                _fail(errors, path, f"must be <= {hi}, got {value}")
+        checks.append(check_range)
+        preds.append(lambda v: (lo is None or v >= lo) and (hi is None or v <= hi))
+
+    if 'maxLength' in schema:
+        max_length = schema['maxLength']
+
+        def check_length(value: Any, path: str, errors: List[str]) -> None:
+            if len(value) > max_length:
+                _fail(errors, path, f"must be at most {max_length} characters")
+        checks.append(check_length)
+        preds.append(lambda v: len(v) <= max_length)
+
+    if 'pattern' in schema:
+        match = re.compile(schema['pattern']).search
+        pattern_message = f"must match {schema['pattern']!r}"
+
+        def check_pattern(value: Any, path: str, errors: List[str]) -> None:
+            if match(value) is None:
+                _fail(errors, path, pattern_message)
+        checks.append(check_pattern)
+        preds.append(lambda v: match(v) is not None)
+
+    is_object = type_name == 'object' or not _LEAF_KEYWORDS.issuperset(schema)
+    if is_object:
+        checks.append(_compile_object(schema))
+
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        if is_type is not None and not is_type(value):
+            _fail(errors, path, type_message)
+            return
+        for fn in checks:
+            fn(value, path, errors)
+
+    return check, (None if is_object or not preds else _all_of(preds))
+
+
+def _compile_object(schema: Dict[str, Any]) -> Check:
+    required = tuple(schema.get('required', ()))
+    properties = {name: _compile(sub) for name, sub in schema.get('properties', {}).items()}
+    additional = schema.get('additionalProperties', True)
+    extra = _compile(additional) if isinstance(additional, dict) else None
+    forbid_extra = additional is False
+    names = _compile(schema['propertyNames']) if 'propertyNames' in schema else None
+
+    def check_object(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, dict):
+            return  # no 'type' keyword; object keywords only apply to objects
+        for name in required:
+            if name not in value:
+                _fail(errors, path, f"missing required property '{name}'")
+        for key, item in value.items():
+            if names is not None:
+                if not isinstance(key, str):
+                    _fail(errors, path, f"property name {key!r} must be a string")
+                    continue
+                check, fast = names
+                if fast is None or not fast(key):
+                    check(key, f"{_join(path, key)} (name)", errors)
+            sub = properties.get(key, extra)
+            if sub is not None:
+                check, fast = sub
+                if fast is None or not fast(item):
+                    check(item, _join(path, key), errors)
+            elif forbid_extra:
+                _fail(errors, path, f"unexpected property '{key}'")
+
+    return check_object
+
+
+_validator: Optional[Check] = None
+_lock = threading.Lock()
+
+
+def get_config_validator() -> Check:
+    """The compiled validator for the shared config schema (built on first use)."""
+    global _validator
+    if _validator is None:
+        with _lock:
+            if _validator is None:
+                with open(SCHEMA_PATH, encoding='utf-8') as f:
+                    _validator = compile_schema(json.load(f))
+    return _validator
+
+
+def validate_config_schema(config: Any) -> List[str]:
+    """Validate *config* against the shared schema; returns error strings (empty = valid)."""
+    errors: List[str] = []
+    try:
+        get_config_validator()(config, '', errors)
+    except _TooManyErrors:
+        errors.append(f"... stopped after {MAX_ERRORS} errors")
+    return errors
@@ -0,0 +1,46 @@
+"""
+Zobrist hashing of board positions.
+
+A position hash is the XOR, over every occupied hex, of a 64-bit value
+derived from (cell index, unit_id, colour, hp). XOR makes it incremental:
+placing or removing a piece toggles that piece's value in or out, so
+HexBoard keeps its hash current in O(1) per mutation and never has to walk
+or serialise the board to identify a position.
+
+Everything here is deterministic across processes and restarts - per-cell
+keys come from a seeded PRNG and piece tokens from BLAKE2b - so hashes can
+be stored or compared between workers (analytics dedup, persisted caches),
+not just within one process.
+
+Only those four fields are hashed. Other per-unit state (max_hp, statuses,
+cooldowns) does not feed the hash, and neither does the side to move.
+"""
+
+from __future__ import annotations
+import hashlib
+import random
+from array import array
+from functools import lru_cache
+from typing import Any, Optional
+
+MASK64 = (1 << 64) - 1
+
+
+def cell_keys(radius: int, size: int) -> array:
+    """Return *size* deterministic random 64-bit keys for a board of *radius*."""
+    rng = random.Random(f"chesspp-zobrist-r{radius}")
+    return array('Q', (rng.getrandbits(64) for _ in range(size)))
+
+
+@lru_cache(maxsize=4096)
+def piece_token(unit_id: str, color: str, hp: Optional[Any]) -> int:
+    """Stable 64-bit token for a piece's hashed attributes."""
+    digest = hashlib.blake2b(f"{unit_id}\x1f{color}\x1f{hp}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def mix64(z: int) -> int:
+    """SplitMix64 finaliser - a cheap 64-bit bijection with good avalanche."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
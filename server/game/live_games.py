@@ -0,0 +1,533 @@
+"""
+Live-game registry - the authoritative in-memory state of games in progress.
+
+Every move used to load the whole GameState row (board, history and config
+JSON), rebuild a HexBoard from it and rewrite every JSON field. Instead, a
+started game is kept resident as a ``LiveGame``: the HexBoard, the shared
+compiled config and the turn metadata. Moves, draw offers and game endings
+are validated and applied against that object, and the registry persists it
+behind the scenes:
+
+  * ordinary changes (a move, a draw offer) mark the game dirty and schedule
+    one write ``GAME_STATE_FLUSH_DELAY`` seconds later - everything that
+    happens inside that window is coalesced into a single UPDATE;
+  * that UPDATE only carries the turn metadata: each move's GameMove row
+    records the cells it changed, and the full board is rewritten only every
+    ``GAME_STATE_SNAPSHOT_INTERVAL`` turns and when the game ends.
+    ``GameState.current_board_state`` rebuilds the board from the last
+    snapshot plus the deltas of later moves;
+  * a game ending is flushed immediately and awaited before anyone is told
+    the result, and a player dropping out of a game flushes it too, so the
+    window a crash can lose is at most the flush delay of an ongoing game.
+
+Everything that changes a game - a move, a turn timer running out, a
+resignation, a draw offer or answer, a forfeit - runs on that game's
+``GameActor`` (``live_games.run``): one task drains a queue of mutations
+and awaits each to completion, writes and broadcasts included, before
+starting the next. Two of them can't interleave, so a resign racing a move
+simply sees the board after it instead of failing a conditional write and
+re-reading the game.
+
+Each write keeps an optimistic-concurrency guard (``write_game_state``) -
+the safety net for anything the actor can't see, such as another process:
+it only applies while the row is still unfinished and at the turn number
+this process last persisted. If that fails somebody else changed the row,
+so the resident copy is reloaded from the database and everyone in the
+game's room is sent that version (``GameConsumer.resync_game_state``) in
+place of whatever they were told since the last write.
+
+The registry is per process. With the in-memory channel layer this project
+runs by default, every connection of a game is served by one process. With
+a shared layer (REDIS_URL, see CHANNEL_LAYERS in settings.py) the two
+players may be on different processes, so the registry runs ``shared``:
+a game stays resident only while its actor is working, every change is
+written before it is broadcast, and the next mutation reads the row again.
+
+A game's unsaved changes are also written when one of its players drops
+out (``flush_or_retry``), and every game's when daphne shuts down
+(``flush_all_on_shutdown``).
+"""
+
+from __future__ import annotations
+import asyncio
+import functools
+import logging
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+from .engine.board import BoardDict, HexBoard, coord_key, parse_coord
+from .engine.config_loader import GameConfig, get_compiled_config
+from .models import GameMove, GameState
+from .utils import get_room_group_name, group_send_event
+
+logger = logging.getLogger('game')
+
+DEFAULT_FLUSH_DELAY = 0.5  # seconds
+DEFAULT_SNAPSHOT_INTERVAL = 20  # turns
+
+
+def write_game_state(game_id: str, fields: Dict[str, Any],
+                     expected_turn_number: Optional[int] = None,
+                     new_moves: Sequence[GameMove] = ()) -> bool:
+    """UPDATE the GameState row of *game_id* with *fields* and append
+    *new_moves* (unsaved GameMove rows) to its move log, atomically.
+
+    With *expected_turn_number* the write only applies while the row is
+    unfinished and at exactly that turn. Returns True if it applied.
+    """
+    qs = GameState.objects.filter(game_id=game_id)  # type: ignore
+    if expected_turn_number is not None:
+        qs = qs.filter(turn_number=expected_turn_number, end_reason='')
+    with transaction.atomic():  # type: ignore
+        if not qs.update(**fields):
+            return False
+        if new_moves:
+            GameMove.objects.bulk_create(new_moves)
+    return True
+
+
+@database_sync_to_async
+def _load_state(game_id: str) -> Optional[GameState]:
+    try:
+        return GameState.objects.prefetch_related('moves').get(game_id=game_id)  # type: ignore
+    except GameState.DoesNotExist:  # type: ignore
+        return None
+
+
+_write_state = database_sync_to_async(write_game_state)
+
+
+class LiveGame:
+    """
+    Resident state of one game. Attribute names match GameState, so
+    handlers read either the same way.
+
+    The board is mutated in place by moves; ``board_state`` serialises it on
+    demand.
+    """
+
+    __slots__ = ('game_id', 'config', 'board', 'current_turn', 'turn_number', 'move_history',
+                 'player_white', 'player_black', 'winner', 'end_reason', 'draw_offered_by',
+                 'turn_started_at', 'unsaved_moves', 'persisted_turn', 'snapshot_turn', 'dirty',
+                 'lock', 'flush_task')
+
+    # *state* is a GameState row; typed Any because its model fields read
+    # as Field objects to static analysis, not as the values they hold.
+    def __init__(self, game_id: str, config: GameConfig, board: HexBoard, state: Any,
+                 move_history: List[Dict[str, Any]]):
+        self.game_id = game_id
+        self.config = config
+        self.board = board
+        self.current_turn: str = state.current_turn
+        self.turn_number: int = state.turn_number
+        self.move_history = move_history
+        self.player_white: str = state.player_white
+        self.player_black: str = state.player_black
+        self.winner: str = state.winner
+        self.end_reason: str = state.end_reason
+        self.draw_offered_by: str = state.draw_offered_by
+        self.turn_started_at = state.turn_started_at
+        # GameMove rows played since the last write
+        self.unsaved_moves: List[GameMove] = []
+        # Turn number of the row as this process last wrote/read it - the
+        # optimistic-concurrency guard for the next write.
+        self.persisted_turn: int = state.turn_number
+        # Turn at whose start the persisted board snapshot was taken
+        self.snapshot_turn: int = state.snapshot_turn
+        self.dirty = False
+        self.lock = asyncio.Lock()  # serialises this game's writes
+        self.flush_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_state(cls, state: GameState) -> 'LiveGame':
+        """Rebuild a game from its database row."""
+        # Validated before it was persisted, and stored under its
+        # fingerprint - just resolve the shared instance.
+        config = get_compiled_config(state.config_snapshot, validate=False, fingerprint=state.config_hash)
+        # moves are prefetched
+        board = HexBoard.from_dict(config.radius, state.current_board_state())
+        return cls(str(state.pk), config, board, state, state.move_history)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.end_reason != ''
+
+    @property
+    def config_hash(self) -> str:
+        return self.config.fingerprint
+
+    @property
+    def config_snapshot(self) -> Dict[str, Any]:
+        return self.config.raw
+
+    @property
+    def board_state(self) -> BoardDict:
+        """The board serialised now (values are the live cell dicts)."""
+        return self.board.to_dict()
+
+    def advance(self, move_record: Dict[str, Any], current_turn: str, turn_number: int,
+                winner: str, end_reason: str, turn_started_at: Any,
+                expected_turn_number: int,
+                changes: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a move that has been applied to ``board``.
+
+        Conditional like ``write_game_state``: only while the game is
+        unfinished and still at *expected_turn_number*. Clears any pending
+        draw offer. Returns True if it applied. *changes* is
+        ``cells_changed(move_record)`` if the caller already has it.
+        """
+        if self.is_finished or self.turn_number != expected_turn_number:
+            return False
+        self.move_history.append(move_record)
+        self.unsaved_moves.append(GameMove.from_record(
+            self.game_id, move_record, turn_started_at,
+            delta=changes if changes is not None else self.cells_changed(move_record)))
+        self.current_turn = current_turn
+        self.turn_number = turn_number
+        self.winner = winner
+        self.end_reason = end_reason
+        self.turn_started_at = turn_started_at
+        self.draw_offered_by = ''
+        self.dirty = True
+        return True
+
+    def take_back(self, move_record: Dict[str, Any], before: Dict[str, Any]) -> None:
+        """Undo the ``advance`` that recorded *move_record*, for a move whose
+        write failed before anyone was told of it. *before* is ``snapshot()``
+        as it was ahead of the advance; the board is the caller's to restore.
+        """
+        if self.move_history and self.move_history[-1] is move_record:
+            self.move_history.pop()
+        self.unsaved_moves = [m for m in self.unsaved_moves if m.ply != move_record['turn']]
+        for name, value in before.items():
+            setattr(self, name, value)
+
+    def finish(self, winner: str, end_reason: str, expected_turn_number: int) -> bool:
+        """End the game with the board untouched (resign/timeout/draw/...).
+        Same condition and return value as ``advance``."""
+        if self.is_finished or self.turn_number != expected_turn_number:
+            return False
+        self.winner = winner
+        self.end_reason = end_reason
+        self.draw_offered_by = ''
+        self.dirty = True
+        return True
+
+    def cells_changed(self, move_record: Dict[str, Any]) -> Dict[str, Any]:
+        """The from/to cells of an applied move as they are now (None if
+        empty) - a move never touches any other cell."""
+        delta: Dict[str, Any] = {}
+        for key in (move_record['from'], move_record['to']):
+            q, r = parse_coord(key)
+            cell = self.board.get(q, r)
+            delta[coord_key(q, r)] = dict(cell) if cell is not None else None
+        return delta
+
+    def snapshot(self, with_board: bool = False) -> Dict[str, Any]:
+        """The persistent fields, copied so later moves can't change them
+        while a write is in flight. *with_board* adds a full board snapshot
+        taken at the current turn."""
+        fields: Dict[str, Any] = {
+            'current_turn': self.current_turn,
+            'turn_number': self.turn_number,
+            'winner': self.winner,
+            'end_reason': self.end_reason,
+            'draw_offered_by': self.draw_offered_by,
+            'turn_started_at': self.turn_started_at,
+        }
+        if with_board:
+            fields['board_state'] = {key: dict(cell) for key, cell in self.board.to_dict().items()}
+            fields['snapshot_turn'] = self.turn_number
+        return fields
+
+    def __repr__(self) -> str:
+        status = self.end_reason or f"turn {self.turn_number}"
+        return f"LiveGame({self.game_id}, {status}, dirty={self.dirty})"
+
+
+# (LiveGame or None, *args) -> result
+Mutation = Callable[..., Awaitable[Any]]
+
+
+class GameActor:
+    """
+    Runs one game's mutations one at a time, in the order they were
+    submitted.
+
+    The task draining the queue exits once it is empty and the next
+    ``submit`` starts another, so an idle game holds no task. A mutation
+    whose submitter stopped waiting (a cancelled turn timer) before its turn
+    came is skipped; one already running always runs to completion.
+    """
+
+    __slots__ = ('game_id', 'registry', 'loop', 'queue', 'task')
+
+    def __init__(self, game_id: str, registry: 'LiveGameRegistry'):
+        self.game_id = game_id
+        self.registry = registry
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[Tuple[Mutation, tuple, asyncio.Future]] = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    def submit(self, mutation: Mutation, args: tuple) -> asyncio.Future:
+        future = self.loop.create_future()
+        self.queue.put_nowait((mutation, args, future))
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._drain())
+        return future
+
+    async def _drain(self) -> None:
+        try:
+            while not self.queue.empty():
+                mutation, args, future = self.queue.get_nowait()
+                if future.cancelled():
+                    continue
+                try:
+                    # Fetched per mutation: the previous one may have ended
+                    # the game or lost a write and dropped the live copy.
+                    result = await mutation(await self.registry.get(self.game_id), *args)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    if future.cancelled():
+                        logger.error(f"Mutation of game {self.game_id} failed: {e}", exc_info=True)
+                    else:
+                        future.set_exception(e)
+                else:
+                    if not future.cancelled():
+                        future.set_result(result)
+        finally:
+            while not self.queue.empty():  # only if this task was cancelled
+                self.queue.get_nowait()[2].cancel()
+            if self.registry._actors.get(self.game_id) is self:
+                del self.registry._actors[self.game_id]
+                if self.registry.shared:
+                    self.registry.discard(self.game_id)  # reread by the next mutation
+
+
+class LiveGameRegistry:
+    """game_id -> LiveGame for the unfinished games this process serves."""
+
+    def __init__(self):
+        self._games: Dict[str, LiveGame] = {}
+        self._actors: Dict[str, GameActor] = {}
+
+    @property
+    def flush_delay(self) -> float:
+        return getattr(settings, 'GAME_STATE_FLUSH_DELAY', DEFAULT_FLUSH_DELAY)
+
+    @property
+    def snapshot_interval(self) -> int:
+        return getattr(settings, 'GAME_STATE_SNAPSHOT_INTERVAL', DEFAULT_SNAPSHOT_INTERVAL)
+
+    @property
+    def shared(self) -> bool:
+        """True when the channel layer spans processes, so another process
+        may be serving the same game (see module docstring)."""
+        layer = getattr(settings, 'CHANNEL_LAYERS', {}).get('default', {})
+        return not layer.get('BACKEND', '').endswith('.InMemoryChannelLayer')
+
+    def __contains__(self, game_id: str) -> bool:
+        return str(game_id) in self._games
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    async def get(self, game_id: str) -> Optional[LiveGame]:
+        """The game's live state, loaded from the database on first use.
+
+        Finished games are returned but not kept resident. None if the game
+        has no GameState.
+        """
+        game_id = str(game_id)
+        live = self._games.get(game_id)
+        if live is not None:
+            return live
+        state = await _load_state(game_id)
+        if state is None:
+            return None
+        live = self._games.get(game_id)  # loaded by someone else meanwhile
+        if live is not None:
+            return live
+        live = LiveGame.from_state(state)
+        if not live.is_finished and (not self.shared or game_id in self._actors):
+            self._games[game_id] = live
+        return live
+
+    async def run(self, game_id: str, mutation: Mutation, *args: Any, **kwargs: Any) -> Any:
+        """Await ``mutation(live, *args, **kwargs)`` on the game's actor,
+        after every mutation submitted before it. *live* is the game's
+        LiveGame as it is then (None if it has no GameState). Returns the
+        mutation's result or raises its exception.
+
+        Called from a mutation already running on this game's actor it runs
+        inline, since waiting for the queue would wait for itself.
+        """
+        game_id = str(game_id)
+        actor = self._actors.get(game_id)
+        if actor is not None and actor.task is asyncio.current_task():
+            return await mutation(await self.get(game_id), *args, **kwargs)
+        if actor is None or actor.loop is not asyncio.get_running_loop():
+            actor = self._actors[game_id] = GameActor(game_id, self)
+        if kwargs:
+            mutation = functools.partial(mutation, **kwargs)
+        return await actor.submit(mutation, args)
+
+    def start(self, state: GameState, config: GameConfig) -> LiveGame:
+        """Register a game that was just (re)started and persisted."""
+        live = LiveGame(str(state.pk), config, config.initial_position.new_board(), state, [])
+        if self.shared:
+            self.discard(live.game_id)
+        else:
+            self._replace(live)
+        return live
+
+    async def save(self, live: LiveGame) -> bool:
+        """Persist a change to *live* before it is announced.
+
+        Normally that is ``mark_dirty`` - a coalesced write behind - and
+        this returns True. When ``shared``, another process may be about to
+        change the same row, so the write happens now and this returns
+        ``flush``'s result.
+        """
+        if not self.shared:
+            self.mark_dirty(live)
+            return True
+        live.dirty = True
+        return await self.flush(live)
+
+    def mark_dirty(self, live: LiveGame) -> None:
+        """Schedule a coalesced write of *live*."""
+        live.dirty = True
+        if live.flush_task is None or live.flush_task.done():
+            live.flush_task = asyncio.create_task(self._flush_later(live))
+
+    async def _flush_later(self, live: LiveGame) -> None:
+        try:
+            await asyncio.sleep(self.flush_delay)
+            live.flush_task = None  # changes made during the write schedule a new one
+            await self.flush(live)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Write-behind flush failed for game {live.game_id}: {e} - retrying",
+                         exc_info=True)
+            self.retry(live)
+
+    def retry(self, live: LiveGame) -> None:
+        """Reschedule the write of a game whose flush raised (the flush put
+        its changes back), unless it has left the registry meanwhile."""
+        if live.dirty and self._games.get(live.game_id) is live:
+            self.mark_dirty(live)
+
+    async def flush(self, game: Any) -> bool:
+        """Write *game* (a LiveGame or game id) now if it has unsaved changes.
+
+        Returns False only if the conditional write lost to a change made
+        elsewhere; the game is then reloaded and its room resynced (see
+        ``_resync``). Finished games leave the registry once written.
+        """
+        live = game if isinstance(game, LiveGame) else self._games.get(str(game))
+        if live is None:
+            return True
+        task = live.flush_task
+        if task is not None and task is not asyncio.current_task():
+            live.flush_task = None
+            task.cancel()
+        async with live.lock:
+            applied = True
+            if live.dirty:
+                with_board = (live.is_finished
+                              or live.turn_number - live.snapshot_turn >= self.snapshot_interval)
+                fields = live.snapshot(with_board)
+                new_moves, live.unsaved_moves = live.unsaved_moves, []
+                live.dirty = False
+                try:
+                    applied = await _write_state(live.game_id, fields, live.persisted_turn, new_moves)
+                except Exception:
+                    live.unsaved_moves[:0] = new_moves
+                    live.dirty = True
+                    raise
+                if applied:
+                    live.persisted_turn = fields['turn_number']
+                    live.snapshot_turn = fields.get('snapshot_turn', live.snapshot_turn)
+                else:
+                    logger.warning(
+                        f"Game {live.game_id} changed in the database behind the live copy "
+                        f"(expected turn {live.persisted_turn}) - reloading it"
+                    )
+            if not applied or (live.is_finished and not live.dirty):
+                self.discard(live)
+        if not applied:
+            await self._resync(live.game_id)
+        return applied
+
+    async def _resync(self, game_id: str) -> None:
+        """Reload a game whose write lost and have every connection in its
+        room send its client the database's version - the moves broadcast
+        since the last write may never have happened as far as it knows."""
+        await self.get(game_id)
+        await group_send_event(get_channel_layer(), get_room_group_name(game_id), {
+            'type': 'resync_game_state',
+            'game_id': game_id,
+        })
+
+    async def flush_or_retry(self, game: Any) -> None:
+        """``flush`` *game* (a LiveGame or game id), logging and
+        rescheduling a write that raises instead of raising."""
+        live = game if isinstance(game, LiveGame) else self._games.get(str(game))
+        if live is None:
+            return
+        try:
+            await self.flush(live)
+        except Exception as e:
+            logger.error(f"Flush failed for game {live.game_id}: {e} - retrying", exc_info=True)
+            self.retry(live)
+
+    async def flush_all(self) -> None:
+        """Write every game with unsaved changes. A failed write is logged
+        and rescheduled rather than stopping the rest."""
+        for live in list(self._games.values()):
+            await self.flush_or_retry(live)
+
+    def discard(self, game: Any) -> None:
+        """Forget a game (its pending write, if any, is cancelled)."""
+        game_id = game.game_id if isinstance(game, LiveGame) else str(game)
+        live = self._games.get(game_id)
+        if live is None or (isinstance(game, LiveGame) and live is not game):
+            return
+        del self._games[game_id]
+        if live.flush_task is not None and live.flush_task is not asyncio.current_task():
+            live.flush_task.cancel()
+
+    def _replace(self, live: LiveGame) -> None:
+        self.discard(live.game_id)
+        self._games[live.game_id] = live
+
+
+live_games = LiveGameRegistry()
+
+
+def flush_all_on_shutdown() -> None:
+    """Have daphne write every live game before it exits.
+
+    daphne cancels the open connections on shutdown without running their
+    disconnect handlers, so this hooks ``live_games.flush_all`` into its
+    Twisted reactor's shutdown instead. Does nothing unless the reactor is
+    already installed - importing it here would install the wrong one.
+    """
+    if 'twisted.internet.reactor' not in sys.modules:
+        return
+    from twisted.internet import reactor
+    from twisted.internet.defer import Deferred
+
+    def flush() -> Deferred:
+        return Deferred.fromFuture(asyncio.ensure_future(live_games.flush_all()))
+
+    reactor.addSystemEventTrigger('before', 'shutdown', flush)  # type: ignore[attr-defined]
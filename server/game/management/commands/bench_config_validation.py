@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+import copy
+import json
+import time
+
+from game.consumers import MAX_MESSAGE_BYTES
+from game.engine.config_loader import DEFAULT_CONFIG, load_config
+from game.engine.geometry import get_geometry
+from game.engine import schema_validator
+
+
+class Command(BaseCommand):
+    help = ('Benchmark custom-config validation on a maximal radius-50 config '
+            'sized just under the WebSocket message cap.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=200,
+                            help='Validations per timed repetition')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed repetitions (best is reported)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        schema_validator._validator = None
+        schema_validator.get_config_validator()
+        self.stdout.write(f'schema compiled once in {(time.perf_counter() - start) * 1e3:.2f} ms')
+
+        config = self._maximal_config()
+        message = json.dumps({'type': 'set_custom_config', 'config': config})
+        units = len(config['units'])
+        placed = sum(len(side) for side in config['setup'].values())
+        self.stdout.write(
+            f'radius={config["board"]["radius"]} units={units} placed pieces={placed} '
+            f'message={len(message)} bytes (cap {MAX_MESSAGE_BYTES})'
+        )
+        assert not schema_validator.validate_config_schema(config)
+
+        number = max(1, options['number'])
+        repeat = max(1, options['repeat'])
+        for label, fn in (
+            ('json.loads (reference)', lambda: json.loads(message)),
+            ('schema check', lambda: schema_validator.validate_config_schema(config)),
+            ('load_config', lambda: load_config(config)),
+        ):
+            per_call = self._best(repeat, number, fn)
+            self.stdout.write(f'  {label:<24} {per_call * 1e6:9.1f} us/config')
+
+    @staticmethod
+    def _maximal_config():
+        """Radius 50, a dozen unit types, and as many placed pieces as fit
+        under MAX_MESSAGE_BYTES."""
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['board']['radius'] = 50
+        template = config['units']['pawn']
+        for n in range(12 - len(config['units'])):
+            unit_id = f'unit{n}'
+            config['units'][unit_id] = dict(template, id=unit_id, name=f'Unit {n}', symbol=f'U{n}')
+        unit_ids = list(config['units'])
+        config['setup'] = {'white': {}, 'black': {}}
+
+        budget = MAX_MESSAGE_BYTES - 256  # room for the envelope
+        size = len(json.dumps({'type': 'set_custom_config', 'config': config}))
+        for n, (q, r) in enumerate(get_geometry(50).coords):
+            side = 'white' if r > 0 else 'black' if r < 0 else None
+            if side is None:
+                continue
+            key = f'{q},{r}'
+            unit_id = unit_ids[n % len(unit_ids)]
+            entry = len(json.dumps({key: unit_id}))  # '"q,r": "unit"' plus ', '
+            if size + entry > budget:
+                break
+            config['setup'][side][key] = unit_id
+            size += entry
+        return config
+
+    @staticmethod
+    def _best(repeat, number, fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+import random
+import time
+
+from game import utils, wire
+from game.consumers import game_state_update
+from game.engine.board import coord_key
+from game.engine.config_loader import get_compiled_config
+from game.engine.game_logic import resolve_combat
+from game.engine.move_validator import get_all_legal_moves
+from game.live_games import LiveGame
+from game.models import GameState
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the installed JSON codecs (and the MessagePack wire format) '
+            'on game_state_update payloads of a game played out in memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--moves', type=int, default=80,
+                            help='Random legal moves played before the snapshot')
+        parser.add_argument('--number', type=int, default=500,
+                            help='Encodes/decodes per timed repetition')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed repetitions (best is reported)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        live = self._play(options['moves'], random.Random(options['seed']))
+        number = max(1, options['number'])
+        repeat = max(1, options['repeat'])
+        self.stdout.write(f'codecs installed: {", ".join(utils.JSON_CODECS)} '
+                          f'(selected: {utils.get_json_codec()})')
+
+        for label, include_config in (('with config', True), ('config cached (configHash)', False)):
+            message = game_state_update(live.game_id, live, include_config)
+            self.stdout.write(
+                f'game_state_update {label}: {len(live.move_history)} moves, '
+                f'{live.board.piece_count} pieces'
+            )
+            for codec in utils.JSON_CODECS.values():
+                text = codec.dumps(message, None)
+                encode = self._best(repeat, number, lambda: codec.dumps(message, None))
+                decode = self._best(repeat, number, lambda: codec.loads(text))
+                self._row(codec.name, len(text.encode()), encode, decode)
+            frame = wire.pack_message(message)
+            encode = self._best(repeat, number, lambda: wire.pack_message(message))
+            decode = self._best(repeat, number, lambda: wire.unpack_message(frame))
+            self._row('msgpack wire', len(frame), encode, decode)
+
+    def _row(self, name, size, encode, decode):
+        self.stdout.write(
+            f'  {name:<13} {size:7d} bytes   encode {encode * 1e6:8.1f} us   decode {decode * 1e6:8.1f} us'
+        )
+
+    @staticmethod
+    def _play(moves, rng):
+        """A default-config game with *moves* random legal moves applied."""
+        config = get_compiled_config(None)
+        state = GameState(current_turn='white-player', turn_number=1, player_white='white-player',
+                          player_black='black-player', turn_started_at=timezone.now())
+        live = LiveGame('bench', config, config.initial_position.new_board(), state, [])
+        color = 'white'
+        for _ in range(moves):
+            legal = get_all_legal_moves(live.board, color, config)
+            if not legal:
+                break
+            src = rng.choice(sorted(legal))
+            dst = rng.choice(legal[src])
+            piece = live.board.pieces_by_color(color)[src]
+            combat = resolve_combat(live.board, src, dst, config)
+            record = {
+                'from': coord_key(*src), 'to': coord_key(*dst), 'unit_id': piece['unit_id'],
+                'color': color, 'turn': live.turn_number, 'captured': None,
+                'attacked': combat['attacked'], 'damage_dealt': combat['damage_dealt'],
+                'defender_eliminated': combat['defender_eliminated'], 'moved': combat['moved'],
+            }
+            live.advance(record, current_turn=live.player_black if color == 'white' else live.player_white,
+                         turn_number=live.turn_number + 1, winner='', end_reason='',
+                         turn_started_at=timezone.now(), expected_turn_number=live.turn_number)
+            color = 'black' if color == 'white' else 'white'
+        return live
+
+    @staticmethod
+    def _best(repeat, number, fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+import random
+import time
+
+from game.engine.board import HexBoard
+from game.engine.move_validator import (
+    MOVE_ENGINES, get_all_legal_moves, get_legal_moves, get_move_engine, set_move_engine,
+)
+from game.engine import numpy_engine
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the legal-move reachability engines on random boards of several radii.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--radius', type=int, nargs='+', default=[11, 25, 50],
+                            help='Board radii to benchmark')
+        parser.add_argument('--density', type=float, default=0.1,
+                            help='Fraction of hexes occupied (half of them by the measured side)')
+        parser.add_argument('--move', type=int, default=6,
+                            help='move stat of every unit')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed repetitions per measurement (best is reported)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        config = {'units': {'unit': {'move': options['move']}}}
+        repeat = max(1, options['repeat'])
+        previous = get_move_engine()
+        if not numpy_engine.AVAILABLE:
+            self.stdout.write("numpy is not installed - 'numpy' runs the BFS fallback")
+        try:
+            for radius in options['radius']:
+                board = HexBoard(radius)
+                coords = board.all_coords()
+                rng.shuffle(coords)
+                for n, coord in enumerate(coords[:int(len(coords) * options['density'])]):
+                    board.set(*coord, 'unit', 'white' if n % 2 == 0 else 'black')
+                pieces = [c for c, _cell in board.iter_pieces('white')]
+                self.stdout.write(
+                    f'radius={radius} hexes={board.total_hexes} white pieces={len(pieces)} move={options["move"]}'
+                )
+                for name in MOVE_ENGINES:
+                    set_move_engine(name)
+                    per_piece = self._best(repeat, lambda: [get_legal_moves(board, c, config, 'white') for c in pieces])
+                    batched = self._best(repeat, lambda: get_all_legal_moves(board, 'white', config))
+                    self.stdout.write(
+                        f'  {name:<9} per-piece {per_piece * 1e3:9.2f} ms   whole side {batched * 1e3:9.2f} ms'
+                    )
+        finally:
+            set_move_engine(previous)
+
+    @staticmethod
+    def _best(repeat, fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
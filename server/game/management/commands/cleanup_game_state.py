@@ -10,7 +10,8 @@ logger = logging.getLogger('game')
 
 
 class Command(BaseCommand):
-    help = 'Clean up expired challenges, stale player connections, and old closed game rooms.'
+    help = ('Clean up expired challenges, stale player connections, old closed game rooms '
+            'and config blobs no game references any more.')
 
     def add_arguments(self, parser):
         parser.add_argument('--stale-minutes', type=int, default=10,
@@ -31,6 +32,7 @@ class Command(BaseCommand):
             GameChallenge: Any = apps.get_model('game', 'GameChallenge')
             PlayerConnection: Any = apps.get_model('game', 'PlayerConnection')
             GameRoom: Any = apps.get_model('game', 'GameRoom')
+            GameConfigBlob: Any = apps.get_model('game', 'GameConfigBlob')
 
             # Expire pending challenges
             expired_qs = GameChallenge.objects.filter(status='pending', expires_at__lt=now)
@@ -54,6 +56,13 @@ class Command(BaseCommand):
             self.stdout.write(f'Deleted {closed_count} old closed game rooms')
             logger.info(f'Deleted {closed_count} old closed game rooms')
 
+            # Shared config blobs are kept while any GameState or GameRoom references them
+            orphan_qs = GameConfigBlob.objects.filter(game_states__isnull=True, game_rooms__isnull=True)
+            deleted_info = orphan_qs.delete()
+            orphan_count = deleted_info[0] if isinstance(deleted_info, tuple) else int(deleted_info)
+            self.stdout.write(f'Deleted {orphan_count} unreferenced config blobs')
+            logger.info(f'Deleted {orphan_count} unreferenced config blobs')
+
             self.stdout.write('Cleanup complete.')
         except Exception as exc:
             logger.exception('Error running cleanup_game_state command')
@@ -0,0 +1,493 @@
+"""
+Inbound WebSocket messages - one typed struct per client message type.
+
+Every message a client sends (the client -> server constants in
+shared/message-types.ts) is declared here once, as a ``Message`` subclass
+with annotated fields. ``Message`` is a ``msgspec.Struct`` when msgspec is
+installed and a plain dataclass otherwise; both decode the same way.
+
+``decode_frame`` decodes a JSON text frame straight into its instance, in
+one msgspec pass over the text (the message classes form a union tagged on
+``type``). Without msgspec, or for a frame that pass rejects, the caller
+falls back to ``decode_message``, which turns the dict the JSON codec or
+the MessagePack wire layer produced into an instance and raises the
+errors below. Either way required fields, types, stripping and the pure
+per-field validators are all settled before any handler runs.
+Handlers get the instance and read attributes; checks that need the
+database or the game (identity, permissions, turn order) stay in the
+handler.
+
+Decoding rules:
+
+- The wire key is the camelCase of the attribute name (``_WIRE_KEYS``
+  lists the exceptions). Keys a message doesn't declare are ignored.
+- A missing or null value takes the field's default. A field without a
+  default is required.
+- ``str`` fields must be strings and are stripped, ``bool`` fields must be
+  JSON booleans (0/1 and "true" are rejected) and ``Any`` takes anything.
+- ``Rules`` in a field's ``Annotated`` metadata turn stripping off, truncate
+  or lowercase the value, or run one of the validators.py checks on it.
+  They stay ours rather than ``msgspec.Meta`` constraints: they transform
+  values, and their checks answer with the validators' own codes.
+
+Failures raise validators.ValidationError with the codes the handlers have
+always sent: MISSING_FIELD, INVALID_FIELD, or the validator's own code.
+
+Consumer methods are bound to their message class with ``handles``; the
+``message_dispatch`` class decorator collects them into a type -> handler
+table once, when the consumer class is created.
+"""
+
+from __future__ import annotations
+import dataclasses
+import re
+import types
+from typing import (
+    TYPE_CHECKING, Annotated, Any, Callable, ClassVar, Dict, Optional, Tuple, Type, Union,
+    cast, get_args, get_origin, get_type_hints,
+)
+
+from .validators import (
+    ValidationError, validate_username, validate_status, validate_game_mode,
+    validate_game_options, validate_chat_message, validate_reveal_action,
+)
+
+if TYPE_CHECKING:
+    import msgspec
+else:
+    try:
+        import msgspec
+    except ImportError:  # pragma: no cover - optional
+        msgspec = None
+
+# value -> None; raises ValidationError
+Check = Callable[[Any], None]
+
+# attribute name -> wire key, where it isn't the camelCase of the name
+_WIRE_KEYS = {
+    'from_coord': 'from',
+    'to_coord': 'to',
+    'idempotency_key': 'idempotency_key',
+}
+
+_TYPE_NAMES = {str: 'string', bool: 'boolean', 'str': 'string', 'bool': 'boolean'}
+
+
+def _wire_key(name: str) -> str:
+    if name in _WIRE_KEYS:
+        return _WIRE_KEYS[name]
+    head, *rest = name.split('_')
+    return head + ''.join(part.title() for part in rest)
+
+
+def _tag(class_name: str) -> str:
+    """JoinGameRoom -> 'join_game_room', the ``type`` it declares (checked
+    in ``_frame_decoder``)."""
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', class_name).lower()
+
+
+def _missing(key: str) -> ValidationError:
+    return ValidationError('MISSING_FIELD', f'Missing required field: {key}')
+
+
+def _invalid(key: str, kind: str) -> ValidationError:
+    return ValidationError('INVALID_FIELD', f'{key} must be a {kind}')
+
+
+class Rules:
+    """``Annotated`` metadata for a field.
+
+    The value of a ``str`` field is stripped unless *strip* is false, then
+    cut to *max_length* and lowercased if asked. *check* then runs on every
+    value that isn't None, defaults included.
+    """
+
+    __slots__ = ('strip', 'max_length', 'lower', 'check')
+
+    def __init__(self, strip: bool = True, max_length: Optional[int] = None,
+                 lower: bool = False, check: Optional[Check] = None):
+        self.strip = strip
+        self.max_length = max_length
+        self.lower = lower
+        self.check = check
+
+    def apply(self, value: Any, text: bool) -> Any:
+        if text and value is not None:
+            if self.strip:
+                value = value.strip()
+            if self.max_length is not None:
+                value = value[:self.max_length]
+            if self.lower:
+                value = value.lower()
+        if self.check is not None and value is not None:
+            self.check(value)
+        return value
+
+
+_DEFAULT_RULES = Rules()
+
+# A string taken exactly as sent
+Raw = Annotated[str, Rules(strip=False)]
+
+
+class _FieldSpec:
+    """One field of a message class, as the decoder needs it."""
+
+    __slots__ = ('name', 'key', 'kind', 'required', 'rules')
+
+    def __init__(self, name: str, hint: Any, required: bool):
+        rules = None
+        while True:
+            origin = get_origin(hint)
+            if origin is Annotated:
+                rules = next((m for m in hint.__metadata__ if isinstance(m, Rules)), rules)
+                hint = get_args(hint)[0]
+            elif origin is Union or origin is types.UnionType:
+                hint = next(arg for arg in get_args(hint) if arg is not type(None))
+            else:
+                break
+        self.name = name
+        self.key = _wire_key(name)
+        self.kind = hint if hint in (str, bool) else None  # None: any value
+        self.required = required
+        self.rules = rules if rules is not None else (_DEFAULT_RULES if hint is str else None)
+
+
+def _message_fields(cls: type) -> Tuple[_FieldSpec, ...]:
+    hints = get_type_hints(cls, include_extras=True)
+    if msgspec is not None:
+        info = msgspec.structs.fields(cls)
+        return tuple(_FieldSpec(f.name, hints[f.name], f.required) for f in info)
+    return tuple(
+        _FieldSpec(f.name, hints[f.name],
+                   f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING)
+        for f in dataclasses.fields(cls)
+    )
+
+
+# msgspec.ValidationError texts, mapped back to the codes above
+_MSGSPEC_MISSING = re.compile(r'missing required field `([^`]+)`')
+_MSGSPEC_INVALID = re.compile(r'Expected `(\w+)`.* at `\$\.([^`]+)`')
+
+
+def _from_msgspec_error(error: Exception) -> ValidationError:
+    text = str(error)
+    missing = _MSGSPEC_MISSING.search(text)
+    if missing:
+        return _missing(missing.group(1))
+    invalid = _MSGSPEC_INVALID.search(text)
+    if invalid:
+        expected, key = invalid.groups()
+        return _invalid(key, _TYPE_NAMES.get(expected, expected))
+    return ValidationError('INVALID_FIELD', text)
+
+
+# -- Messages -----------------------------------------------------------------
+
+MESSAGE_TYPES: Dict[str, Type['Message']] = {}
+
+# message class -> its fields
+_FIELDS: Dict[type, Tuple[_FieldSpec, ...]] = {}
+
+if msgspec is not None:
+    _MessageBase: Any = msgspec.Struct
+    _BASE_OPTIONS: Dict[str, Any] = {'rename': _wire_key, 'kw_only': True,
+                                     'tag_field': 'type', 'tag': _tag}
+else:
+    _MessageBase = object
+    _BASE_OPTIONS = {}
+
+
+class Message(_MessageBase, **_BASE_OPTIONS):
+    """Base of the typed messages. A subclass setting ``type`` is registered
+    for ``decode_message``; one without is an abstract base whose fields its
+    subclasses inherit."""
+
+    type: ClassVar[str] = ''
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if msgspec is None:
+            dataclasses.dataclass(kw_only=True)(cls)
+        if 'type' in vars(cls):
+            MESSAGE_TYPES[cls.type] = cls
+
+    @classmethod
+    def _field_specs(cls) -> Tuple[_FieldSpec, ...]:
+        # Built on first use: msgspec only finishes a Struct class after
+        # __init_subclass__ has returned.
+        fields = _FIELDS.get(cls)
+        if fields is None:
+            fields = _FIELDS[cls] = _message_fields(cls)
+        return fields
+
+    @classmethod
+    def decode(cls, data: Dict[str, Any]) -> 'Message':
+        fields = cls._field_specs()
+        # null means "not sent", as it always has
+        present = {key: value for key, value in data.items() if value is not None}
+        if msgspec is not None:
+            try:
+                message = msgspec.convert(present, cls)
+            except msgspec.ValidationError as e:
+                raise _from_msgspec_error(e) from None
+        else:
+            message = cls(**_read(fields, present))
+        message._apply_rules()
+        return message
+
+    def _apply_rules(self) -> None:
+        for field in self._field_specs():
+            if field.rules is not None:
+                value = field.rules.apply(getattr(self, field.name), field.kind is str)
+                setattr(self, field.name, value)
+
+
+def _read(fields: Tuple[_FieldSpec, ...], present: Dict[str, Any]) -> Dict[str, Any]:
+    """Dataclass constructor arguments from the non-null values sent."""
+    values = {}
+    for field in fields:
+        if field.key not in present:
+            if field.required:
+                raise _missing(field.key)
+            continue
+        value = present[field.key]
+        if field.kind is not None and not isinstance(value, field.kind):
+            raise _invalid(field.key, _TYPE_NAMES[field.kind])
+        values[field.name] = value
+    return values
+
+
+_DECODER: Optional[Any] = None
+
+
+def _frame_decoder() -> Any:
+    """The msgspec JSON decoder of every registered message, built on first
+    use (after all the message classes exist)."""
+    global _DECODER
+    if _DECODER is None:
+        for cls in MESSAGE_TYPES.values():
+            tag = cast(Any, cls).__struct_config__.tag
+            if tag != cls.type:
+                raise TypeError(f"{cls.__name__}: type {cls.type!r} doesn't match its tag {tag!r}")
+        _DECODER = msgspec.json.Decoder(Union[tuple(MESSAGE_TYPES.values())])  # type: ignore[valid-type]
+    return _DECODER
+
+
+def decode_frame(frame: Union[str, bytes]) -> Optional[Message]:
+    """The typed message in a JSON text frame, decoded in one pass straight
+    from the text. None if msgspec isn't installed or the frame isn't a
+    valid, known message as sent - unknown types, nulls, malformed JSON -
+    so the caller takes the ``decode_message`` path, which settles those
+    with the usual results and errors."""
+    if msgspec is None:
+        return None
+    try:
+        message = cast(Message, _frame_decoder().decode(frame))
+    except msgspec.DecodeError:  # ValidationError included
+        return None
+    # null is "not sent": a required Any field can't take it
+    if any(field.required and getattr(message, field.name) is None for field in message._field_specs()):
+        return None
+    message._apply_rules()
+    return message
+
+
+def decode_message(data: Any) -> Optional[Message]:
+    """The typed form of an inbound message dict, or None if its type is
+    unknown. Raises ValidationError if it doesn't fit its type's fields."""
+    if not isinstance(data, dict):
+        raise ValidationError('INVALID_MESSAGE', 'Message must be an object')
+    message_type = data.get('type')
+    cls = MESSAGE_TYPES.get(message_type) if isinstance(message_type, str) else None
+    return cls.decode(data) if cls is not None else None
+
+
+# -- Lobby ----------------------------------------------------------------
+
+class JoinLobby(Message):
+    type = 'join_lobby'
+    username: Annotated[str, Rules(check=validate_username)] = ''
+    rejoining: bool = False
+    secret: Annotated[str, Rules(max_length=64)] = ''  # client-asserted identity secret
+
+
+class LeaveLobby(Message):
+    type = 'leave_lobby'
+    username: str = ''
+
+
+class ChatMessage(Message):
+    type = 'chat_message'
+    content: Annotated[Any, Rules(check=validate_chat_message)]
+    timestamp: Optional[Raw] = None
+
+
+class ChangeUsername(Message):
+    type = 'change_username'
+    old_username: str = ''
+    new_username: Annotated[str, Rules(check=validate_username)] = ''
+    secret: Annotated[str, Rules(max_length=64)] = ''
+
+
+class SetStatus(Message):
+    type = 'set_status'
+    username: str = ''
+    status: Annotated[str, Rules(check=validate_status)] = ''
+
+
+class RequestUserList(Message):
+    type = 'request_user_list'
+
+
+class Heartbeat(Message):
+    type = 'heartbeat'
+
+
+# -- Challenges -----------------------------------------------------------
+
+class _Challenge(Message):
+    challenger: str
+    opponent: str
+
+
+class GameChallenge(_Challenge):
+    type = 'game_challenge'
+    idempotency_key: Optional[str] = None
+
+
+class ChallengeAccept(_Challenge):
+    type = 'challenge_accept'
+    idempotency_key: Optional[str] = None
+
+
+class ChallengeDecline(_Challenge):
+    type = 'challenge_decline'
+
+
+# -- Game Room (pre-game) -------------------------------------------------
+
+class _RoomMember(Message):
+    username: str
+    game_id: str
+
+
+class JoinGameRoom(_RoomMember):
+    type = 'join_game_room'
+    token: str
+    board_deltas: bool = False  # receive move_made as a delta
+    legal_moves: bool = False   # move_made carries our side's move map when we're next
+
+
+class LeaveGameRoom(_RoomMember):
+    type = 'leave_game_room'
+
+
+class GameRoomMessage(Message):
+    type = 'game_room_message'
+    content: Annotated[Any, Rules(check=validate_chat_message)]
+    timestamp: Optional[Raw] = None
+
+
+class PlayerReady(_RoomMember):
+    type = 'player_ready'
+
+
+class PlayerUnready(_RoomMember):
+    type = 'player_unready'
+    silent: bool = False
+
+
+class ChangeGameMode(Message):
+    type = 'change_game_mode'
+    mode: Annotated[str, Rules(check=validate_game_mode)]
+    game_id: str
+    options: Annotated[Any, Rules(check=validate_game_options)] = None
+
+
+class SetCustomConfig(Message):
+    type = 'set_custom_config'
+    config: Any  # validated by load_config
+
+
+class RequestRevealMode(Message):
+    type = 'request_reveal_mode'
+    game_id: str
+    action: Annotated[str, Rules(lower=True, check=validate_reveal_action)]
+
+
+class RevealResponse(Message):
+    type = 'reveal_response'
+    game_id: str
+    accepted: bool
+
+
+class StartGame(Message):
+    type = 'start_game'
+    game_id: str
+
+
+# -- Gameplay (in-game) ---------------------------------------------------
+
+class MakeMove(Message):
+    type = 'make_move'
+    # "q,r" - parsed by the handler, which answers INVALID_MOVE if malformed
+    from_coord: Raw
+    to_coord: Raw
+
+
+class Resign(Message):
+    type = 'resign'
+
+
+class OfferDraw(Message):
+    type = 'offer_draw'
+
+
+class RespondDraw(Message):
+    type = 'respond_draw'
+    accept: bool
+
+
+class RequestGameState(Message):
+    type = 'request_game_state'
+    config_hash: Optional[Raw] = None
+
+
+class RequestConfig(Message):
+    type = 'request_config'
+    config_hash: Raw
+
+
+# -- Dispatch -------------------------------------------------------------
+
+def handles(message_cls: Type[Message]) -> Callable[[Callable], Callable]:
+    """Mark a consumer method as the handler of *message_cls*."""
+    def mark(handler: Callable) -> Callable:
+        handler.message_type = message_cls.type  # type: ignore[attr-defined]
+        return handler
+
+    return mark
+
+
+def message_dispatch(cls: type) -> type:
+    """Class decorator: collect the methods marked with ``handles`` into
+    ``cls.message_handlers`` (message type -> function), once, when the
+    consumer class is created.
+
+    Every registered message type must have exactly one handler, so a
+    message declared above can't be silently dropped.
+    """
+    table: Dict[str, Callable] = {}
+    for attr in vars(cls).values():
+        message_type = getattr(attr, 'message_type', None)
+        if not isinstance(message_type, str):
+            continue
+        if message_type in table:
+            raise TypeError(f"{cls.__name__}: two handlers for {message_type!r}")
+        table[message_type] = attr
+    missing = MESSAGE_TYPES.keys() - table.keys()
+    if missing:
+        raise TypeError(f"{cls.__name__}: no handler for {', '.join(sorted(missing))}")
+    cls.message_handlers = table  # type: ignore[attr-defined]
+    return cls
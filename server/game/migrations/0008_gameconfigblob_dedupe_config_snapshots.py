@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _fingerprint(config):
+    # Frozen copy of engine.config_loader.config_fingerprint at the time of
+    # this migration - migrations must not depend on code that can change.
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def intern_config_snapshots(apps, schema_editor):
+    """Move every GameState.config_snapshot into one shared blob per distinct config."""
+    GameState = apps.get_model('game', 'GameState')
+    GameConfigBlob = apps.get_model('game', 'GameConfigBlob')
+    blobs = {}
+    for pk, snapshot in GameState.objects.values_list('pk', 'config_snapshot').iterator():
+        if not snapshot:
+            continue
+        fingerprint = _fingerprint(snapshot)
+        if fingerprint not in blobs:
+            blobs[fingerprint], _created = GameConfigBlob.objects.get_or_create(
+                fingerprint=fingerprint, defaults={'config': snapshot},
+            )
+        GameState.objects.filter(pk=pk).update(config_blob=blobs[fingerprint])
+
+
+def restore_config_snapshots(apps, schema_editor):
+    GameState = apps.get_model('game', 'GameState')
+    for state in GameState.objects.exclude(config_blob=None).select_related('config_blob').iterator():
+        GameState.objects.filter(pk=state.pk).update(config_snapshot=state.config_blob.config)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0007_playerconnection_secret"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GameConfigBlob",
+            fields=[
+                ("fingerprint", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("config", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="gamestate",
+            name="config_blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="game_states",
+                to="game.gameconfigblob",
+            ),
+        ),
+        migrations.RunPython(intern_config_snapshots, restore_config_snapshots),
+        migrations.RemoveField(
+            model_name="gamestate",
+            name="config_snapshot",
+        ),
+    ]
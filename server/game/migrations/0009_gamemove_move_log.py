@@ -0,0 +1,94 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def _record_to_row(GameMove, game_id, ply, record):
+    # Frozen copy of GameMove.from_record at the time of this migration.
+    return GameMove(
+        game_id=game_id,
+        ply=ply,
+        from_coord=record.get('from', ''),
+        to_coord=record.get('to', ''),
+        unit_id=record.get('unit_id', ''),
+        color=record.get('color', ''),
+        captured=record.get('captured'),
+        attacked=bool(record.get('attacked', False)),
+        damage_dealt=record.get('damage_dealt') or 0,
+        defender_eliminated=bool(record.get('defender_eliminated', False)),
+        moved=bool(record.get('moved', True)),
+        defender_hp=record.get('defender_hp'),
+    )
+
+
+def split_move_histories(apps, schema_editor):
+    """One GameMove row per entry of every GameState.move_history."""
+    GameState = apps.get_model('game', 'GameState')
+    GameMove = apps.get_model('game', 'GameMove')
+    for pk, history in GameState.objects.values_list('pk', 'move_history').iterator():
+        if history:
+            GameMove.objects.bulk_create(
+                _record_to_row(GameMove, pk, ply, record) for ply, record in enumerate(history, start=1)
+            )
+
+
+def join_move_histories(apps, schema_editor):
+    GameState = apps.get_model('game', 'GameState')
+    GameMove = apps.get_model('game', 'GameMove')
+    histories = {}
+    for move in GameMove.objects.order_by('game_id', 'ply').iterator():
+        record = {
+            'from': move.from_coord,
+            'to': move.to_coord,
+            'unit_id': move.unit_id,
+            'color': move.color,
+            'turn': move.ply,
+            'captured': move.captured,
+            'attacked': move.attacked,
+            'damage_dealt': move.damage_dealt,
+            'defender_eliminated': move.defender_eliminated,
+            'moved': move.moved,
+        }
+        if move.defender_hp is not None:
+            record['defender_hp'] = move.defender_hp
+        histories.setdefault(move.game_id, []).append(record)
+    for pk, history in histories.items():
+        GameState.objects.filter(pk=pk).update(move_history=history)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_gameconfigblob_dedupe_config_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameMove',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ply', models.PositiveIntegerField()),
+                ('from_coord', models.CharField(max_length=16)),
+                ('to_coord', models.CharField(max_length=16)),
+                ('unit_id', models.CharField(max_length=64)),
+                ('color', models.CharField(max_length=5)),
+                ('captured', models.CharField(blank=True, max_length=64, null=True)),
+                ('attacked', models.BooleanField(default=False)),
+                ('damage_dealt', models.IntegerField(default=0)),
+                ('defender_eliminated', models.BooleanField(default=False)),
+                ('moved', models.BooleanField(default=True)),
+                ('defender_hp', models.IntegerField(blank=True, null=True)),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moves', to='game.gamestate')),
+            ],
+            options={
+                'ordering': ['ply'],
+                'constraints': [models.UniqueConstraint(fields=('game', 'ply'), name='unique_game_move_ply')],
+            },
+        ),
+        migrations.RunPython(split_move_histories, join_move_histories),
+        migrations.RemoveField(
+            model_name='gamestate',
+            name='move_history',
+        ),
+    ]
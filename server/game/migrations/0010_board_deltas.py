@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def snapshot_current_boards(apps, schema_editor):
+    """Existing rows hold the full current board: a snapshot at their current turn."""
+    GameState = apps.get_model('game', 'GameState')
+    GameState.objects.update(snapshot_turn=models.F('turn_number'))
+
+
+def fold_deltas_into_boards(apps, schema_editor):
+    GameState = apps.get_model('game', 'GameState')
+    GameMove = apps.get_model('game', 'GameMove')
+    for state in GameState.objects.iterator():
+        moves = GameMove.objects.filter(game_id=state.pk, ply__gte=state.snapshot_turn).order_by('ply')
+        board = dict(state.board_state)
+        changed = False
+        for delta in moves.values_list('delta', flat=True):
+            for key, cell in delta.items():
+                changed = True
+                if cell is None:
+                    board.pop(key, None)
+                else:
+                    board[key] = cell
+        if changed:
+            GameState.objects.filter(pk=state.pk).update(board_state=board)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0009_gamemove_move_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamemove',
+            name='delta',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='gamestate',
+            name='snapshot_turn',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(snapshot_current_boards, fold_deltas_into_boards),
+    ]
@@ -0,0 +1,60 @@
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _fingerprint(config):
+    # Frozen copy of engine.config_loader.config_fingerprint at the time of
+    # this migration - migrations must not depend on code that can change.
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def intern_custom_configs(apps, schema_editor):
+    """Move every saved GameRoom.custom_config into the shared blob for its content."""
+    GameRoom = apps.get_model('game', 'GameRoom')
+    GameConfigBlob = apps.get_model('game', 'GameConfigBlob')
+    blobs = {}
+    for pk, config in GameRoom.objects.values_list('pk', 'custom_config').iterator():
+        if not config:
+            continue
+        fingerprint = _fingerprint(config)
+        if fingerprint not in blobs:
+            blobs[fingerprint], _created = GameConfigBlob.objects.get_or_create(
+                fingerprint=fingerprint, defaults={'config': config},
+            )
+        GameRoom.objects.filter(pk=pk).update(custom_config_blob=blobs[fingerprint])
+
+
+def restore_custom_configs(apps, schema_editor):
+    GameRoom = apps.get_model('game', 'GameRoom')
+    for room in GameRoom.objects.exclude(custom_config_blob=None).select_related('custom_config_blob').iterator():
+        GameRoom.objects.filter(pk=room.pk).update(custom_config=room.custom_config_blob.config)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0010_board_deltas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gameroom",
+            name="custom_config_blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="game_rooms",
+                to="game.gameconfigblob",
+            ),
+        ),
+        migrations.RunPython(intern_custom_configs, restore_custom_configs),
+        migrations.RemoveField(
+            model_name="gameroom",
+            name="custom_config",
+        ),
+    ]
@@ -3,12 +3,22 @@ from django.utils import timezone
 from typing import Any
 import uuid
 
+from .engine.config_loader import ConfigLike, config_fingerprint, raw_config
+
 
 def generate_uuid():
     """Generate a UUID string for use as default primary key."""
     return str(uuid.uuid4())
 
 
+class GameRoomManager(models.Manager):
+    """Always joins the custom config blob, so ``custom_config`` never costs
+    an extra (or async-unsafe lazy) query."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('custom_config_blob')
+
+
 class GameRoom(models.Model):
     """Represents an active game room"""
     STATUS_CHOICES = [
@@ -26,7 +36,9 @@ class GameRoom(models.Model):
     game_options = models.JSONField(default=dict)  # {'reveal': True/False, etc}
     # Full custom board/unit config (board, units, setup, rules), saved from the
     # setup screen. Only applied at game start when game_mode == 'custom'.
-    custom_config = models.JSONField(default=dict)
+    # Stored once in GameConfigBlob, like GameState.config_blob.
+    custom_config_blob: Any = models.ForeignKey('GameConfigBlob', on_delete=models.PROTECT, null=True,
+                                                blank=True, related_name='game_rooms')
     # Access tokens for secure game room entry
     host_token = models.CharField(max_length=64, blank=True, default='')
     opponent_token = models.CharField(max_length=64, blank=True, default='')
@@ -45,10 +57,18 @@ class GameRoom(models.Model):
     
     def __str__(self):
         return f"Game {self.game_id} - {self.host} vs {self.opponent} ({self.status})"
+
+    @property
+    def custom_config(self) -> dict:
+        """The saved custom config dict (empty if none was saved)."""
+        return self.custom_config_blob.config if self.custom_config_blob_id else {}
+
     # Explicit manager annotation for static analysis
-    objects: Any = models.Manager()
+    objects: Any = GameRoomManager()
     # Explicit DoesNotExist annotation for static analysis
     DoesNotExist: Any
+    # Explicit foreign-key id annotation for static analysis
+    custom_config_blob_id: Any
 
 
 class GameChallenge(models.Model):
@@ -137,6 +157,43 @@ class PlayerReadyStatus(models.Model):
     DoesNotExist: Any
 
 
+class GameConfigBlob(models.Model):
+    """
+    A game config stored once, content-addressed by its fingerprint
+    (SHA-256 of the canonical JSON - engine.config_loader.config_fingerprint).
+    Every GameState on the same rules, and every GameRoom's saved custom
+    config, references the same row instead of carrying its own copy.
+    """
+    fingerprint = models.CharField(max_length=64, primary_key=True)
+    config = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Config {self.pk[:12]}"
+
+    @classmethod
+    def intern(cls, config: ConfigLike) -> 'GameConfigBlob':
+        """Return the blob for *config*, creating it on first use."""
+        blob, _created = cls.objects.get_or_create(
+            fingerprint=config_fingerprint(config),
+            defaults={'config': raw_config(config)},
+        )
+        return blob
+
+    # Explicit manager annotation for static analysis
+    objects: Any = models.Manager()
+    # Explicit DoesNotExist annotation for static analysis
+    DoesNotExist: Any
+
+
+class GameStateManager(models.Manager):
+    """Always joins the config blob, so ``config_snapshot`` never costs an
+    extra (or async-unsafe lazy) query."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('config_blob')
+
+
 class GameState(models.Model):
     """
     Tracks the live state of an active game.
@@ -153,21 +210,25 @@ class GameState(models.Model):
     ]
 
     game = models.OneToOneField(GameRoom, on_delete=models.CASCADE, related_name='state', primary_key=True)
-    # Full board representation as JSON  - dict of "q,r" -> {unit_id, color}
-    board_state = models.JSONField(default=dict)
+    # Full board snapshot as JSON - dict of "q,r" -> {unit_id, color, hp, ...} -
+    # taken at the start of turn snapshot_turn. Moves played since then carry
+    # cell deltas (GameMove.delta); see current_board_state.
+    board_state: Any = models.JSONField(default=dict)
+    snapshot_turn = models.PositiveIntegerField(default=1)
     # Username of whoever's turn it is
     current_turn = models.CharField(max_length=24)
     turn_number = models.PositiveIntegerField(default=1)
-    # Ordered list of moves: [{from_coord, to_coord, unit_id, color, turn, captured?, timestamp}]
-    move_history = models.JSONField(default=list)
+    # Moves live in GameMove (one row per move); see ``move_history``
     # Side assignments
     player_white = models.CharField(max_length=24)
     player_black = models.CharField(max_length=24)
     # End-of-game fields
     winner = models.CharField(max_length=24, blank=True, default='')
     end_reason = models.CharField(max_length=20, choices=END_REASON_CHOICES, blank=True, default='')
-    # Frozen copy of the GameConfig used at game start (prevents mid-game config edits from corrupting state)
-    config_snapshot = models.JSONField(default=dict)
+    # The GameConfig used at game start, frozen (prevents mid-game config edits
+    # from corrupting state) and shared with every other game on the same rules
+    config_blob: Any = models.ForeignKey(GameConfigBlob, on_delete=models.PROTECT, null=True, blank=True,
+                                         related_name='game_states')
     # Draw offer tracking
     draw_offered_by = models.CharField(max_length=24, blank=True, default='')
     # When the current turn started - persisted so reconnect resyncs report the
@@ -190,7 +251,123 @@ class GameState(models.Model):
     def is_finished(self) -> bool:
         return self.end_reason != ''
 
+    @property
+    def config_snapshot(self) -> dict:
+        """The frozen config dict (empty if none was recorded)."""
+        return self.config_blob.config if self.config_blob_id else {}
+
+    @property
+    def config_hash(self) -> str:
+        """Fingerprint of the frozen config ('' if none was recorded)."""
+        return self.config_blob_id or ''
+
+    def current_board_state(self) -> dict:
+        """The board now: the snapshot with the deltas of every later move
+        applied. Same query caveat as ``move_history``."""
+        board = dict(self.board_state)
+        for move in self.moves.all():
+            if move.ply < self.snapshot_turn:
+                continue
+            for key, cell in move.delta.items():
+                if cell is None:
+                    board.pop(key, None)
+                else:
+                    board[key] = cell
+        return board
+
+    @property
+    def move_history(self) -> list:
+        """The move records in play order, materialised from GameMove rows.
+
+        Queries unless fetched with ``prefetch_related('moves')`` - do that
+        before touching this from async code.
+        """
+        return [move.to_record() for move in self.moves.all()]
+
+    # Explicit manager annotation for static analysis
+    objects: Any = GameStateManager()
+    # Explicit DoesNotExist annotation for static analysis
+    DoesNotExist: Any
+    # Explicit foreign-key id annotation for static analysis
+    config_blob_id: Any
+    # Explicit reverse-accessor annotation for static analysis (GameMove.game)
+    moves: Any
+
+
+class GameMove(models.Model):
+    """
+    One move of a game - an append-only log, one INSERT per move instead of
+    rewriting a JSON history. ``to_record``/``from_record`` convert to and
+    from the move dicts sent to clients (``move_made.move``, ``moveHistory``).
+    """
+    game = models.ForeignKey(GameState, on_delete=models.CASCADE, related_name='moves')
+    # 1-based position in the game; equals the turn number it was played on
+    ply = models.PositiveIntegerField()
+    from_coord = models.CharField(max_length=16)
+    to_coord = models.CharField(max_length=16)
+    unit_id = models.CharField(max_length=64)
+    color = models.CharField(max_length=5)
+    # Combat result
+    captured = models.CharField(max_length=64, null=True, blank=True)
+    attacked = models.BooleanField(default=False)
+    damage_dealt = models.IntegerField(default=0)
+    defender_eliminated = models.BooleanField(default=False)
+    moved = models.BooleanField(default=True)
+    defender_hp = models.IntegerField(null=True, blank=True)
+    played_at = models.DateTimeField(default=timezone.now)
+    # Cells this move changed: "q,r" -> new CellData, or None if emptied
+    delta = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['ply']
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'ply'], name='unique_game_move_ply'),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} #{self.ply}: {self.from_coord}->{self.to_coord}"
+
+    @classmethod
+    def from_record(cls, game_id: str, record: dict, played_at=None, delta=None) -> 'GameMove':
+        """An unsaved row for a move record (as built by make_move) and the
+        cells it changed."""
+        return cls(
+            game_id=game_id,
+            ply=record['turn'],
+            from_coord=record['from'],
+            to_coord=record['to'],
+            unit_id=record.get('unit_id', ''),
+            color=record.get('color', ''),
+            captured=record.get('captured'),
+            attacked=record.get('attacked', False),
+            damage_dealt=record.get('damage_dealt', 0),
+            defender_eliminated=record.get('defender_eliminated', False),
+            moved=record.get('moved', True),
+            defender_hp=record.get('defender_hp'),
+            played_at=played_at or timezone.now(),
+            delta=delta or {},
+        )
+
+    def to_record(self) -> dict:
+        record = {
+            'from': self.from_coord,
+            'to': self.to_coord,
+            'unit_id': self.unit_id,
+            'color': self.color,
+            'turn': self.ply,
+            'captured': self.captured,
+            'attacked': self.attacked,
+            'damage_dealt': self.damage_dealt,
+            'defender_eliminated': self.defender_eliminated,
+            'moved': self.moved,
+        }
+        if self.defender_hp is not None:
+            record['defender_hp'] = self.defender_hp
+        return record
+
     # Explicit manager annotation for static analysis
     objects: Any = models.Manager()
     # Explicit DoesNotExist annotation for static analysis
     DoesNotExist: Any
+    # Explicit foreign-key id annotation for static analysis
+    game_id: Any
@@ -1,28 +1,55 @@
 import asyncio
 import copy
-from unittest.mock import patch
+import json
+import logging
+from typing import Any, cast
+from unittest.mock import ANY, AsyncMock, patch
 
+from channels.db import database_sync_to_async
 from channels.routing import URLRouter
 from channels.testing import WebsocketCommunicator
-from django.test import SimpleTestCase, TestCase, TransactionTestCase
-
-from game.models import GameRoom, GameState
-from game.engine.config_loader import DEFAULT_CONFIG
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from game.models import GameConfigBlob, GameMove, GameRoom, GameState
+from game import live_games as live_games_module
+from game import consumers, messages, wire
+from game.messages import decode_message
+from game.validators import ValidationError
+from game.engine.board import HexBoard, coord_key, parse_coord
+from game.engine.config_loader import DEFAULT_CONFIG, build_initial_board, load_config
+from game.engine.game_logic import resolve_combat
+from game.engine.move_validator import get_legal_moves
+from game.live_games import LiveGame, LiveGameRegistry, live_games, write_game_state
+from game.consumers import GameConsumer
 from game.routing import websocket_urlpatterns
 
 
+def _lobby_client(**kwargs) -> WebsocketCommunicator:
+    """A WebSocket client of the lobby room."""
+    return WebsocketCommunicator(URLRouter(cast(Any, websocket_urlpatterns)), '/ws/game/lobby/', **kwargs)
+
+
 async def _receive_until(comm, msg_type, timeout=8):
     """Consume messages from the communicator until one with `type: msg_type`
-    is seen, discarding any others (housekeeping broadcasts) along the way."""
+    is seen, discarding any others (housekeeping broadcasts) along the way.
+    Binary (MessagePack) frames are decoded too."""
+    msg, _frame = await _receive_frame_until(comm, msg_type, timeout)
+    return msg
+
+
+async def _receive_frame_until(comm, msg_type, timeout=8):
+    """Like `_receive_until`, but returns `(msg, frame)` with the raw text or
+    bytes frame the message arrived in."""
     loop = asyncio.get_event_loop()
     deadline = loop.time() + timeout
     while True:
         remaining = deadline - loop.time()
         if remaining <= 0:
             raise AssertionError(f"Timed out waiting for message type {msg_type!r}")
-        msg = await comm.receive_json_from(timeout=remaining)
+        frame = await comm.receive_from(timeout=remaining)
+        msg = wire.unpack_message(frame) if isinstance(frame, bytes) else json.loads(frame)
         if msg.get('type') == msg_type:
-            return msg
+            return msg, frame
 
 
 class ConsumerSmokeTests(SimpleTestCase):
@@ -39,9 +66,221 @@ class ConsumerSmokeTests(SimpleTestCase):
             self.fail(f"Importing game.utils failed: {e}")
 
 
+class BroadcastEncodingTests(SimpleTestCase):
+    """broadcast_to_group encodes a message once for the whole group."""
+
+    async def test_group_members_receive_one_pre_encoded_text(self):
+        from channels.layers import InMemoryChannelLayer
+        from game import utils
+
+        layer = InMemoryChannelLayer()
+        channels = [await layer.new_channel() for _ in range(5)]
+        for name in channels:
+            await layer.group_add('lobby_test', name)
+        message = {'type': 'user_list', 'users': [{'username': f'user{n}'} for n in range(50)]}
+
+        with patch('game.utils.encode_json', wraps=utils.encode_json) as dumps, \
+                patch('game.utils.wire.pack_message', wraps=wire.pack_message) as pack:
+            await utils.broadcast_to_group(layer, 'lobby_test', message)
+        self.assertEqual(dumps.call_count, 1)
+        self.assertEqual(pack.call_count, 0)  # no MessagePack frame while it is disabled
+
+        frames = [(await layer.receive(name))['frames'] for name in channels]
+        self.assertEqual(len({f['text'] for f in frames}), 1)
+        self.assertEqual(json.loads(frames[0]['text']), message)
+
+    @override_settings(GAME_MSGPACK_WIRE=True)
+    async def test_msgpack_frame_is_packed_once_from_the_message(self):
+        from game import utils
+
+        message = {'type': 'user_list', 'users': [{'username': f'user{n}'} for n in range(50)]}
+        consumers = [AsyncMock(wire_format='msgpack') for _ in range(3)]
+        with patch('game.utils.wire.pack_message', wraps=wire.pack_message) as pack, \
+                patch('game.utils.decode_json') as loads:
+            frames = utils.encode_frames(message)
+            for consumer in consumers:
+                await utils.send_frames(consumer, frames)
+        self.assertEqual(pack.call_count, 1)
+        loads.assert_not_called()  # not round-tripped through the JSON text
+        sent = {c.send.await_args.kwargs['bytes_data'] for c in consumers}
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(wire.unpack_message(sent.pop()), message)
+
+
+class JsonCodecTests(SimpleTestCase):
+    """Every installed JSON codec is interchangeable with the stdlib."""
+
+    def tearDown(self):
+        from game import utils
+        utils.set_json_codec('auto')
+
+    def test_codecs_agree_with_the_stdlib(self):
+        from game import utils
+
+        board = build_initial_board(load_config(None)).to_dict()
+        message = {'type': 'game_state_update', 'boardState': board, 'config': DEFAULT_CONFIG,
+                   'moveHistory': [{'from': '-5,10', 'to': '-5,9', 'captured': None, 'turn': 1}],
+                   'note': 'caf\u00e9 / \u265e'}
+        for name in utils.JSON_CODECS:
+            with self.subTest(codec=name):
+                utils.set_json_codec(name)
+                text = utils.encode_json(message)
+                self.assertEqual(json.loads(text), message)
+                self.assertEqual(utils.decode_json(json.dumps(message)), message)
+                self.assertEqual(utils.decode_json(text.encode()), message)
+                with self.assertRaises(utils.JsonDecodeError):
+                    utils.decode_json('{"type": ')
+                self.assertEqual(utils.encode_json({'n': object}, default=lambda o: 'x'), '{"n":"x"}')
+
+    def test_unknown_codec_is_rejected(self):
+        from game import utils
+
+        with self.assertRaises(ValueError):
+            utils.set_json_codec('yaml')
+        utils.set_json_codec('json')
+        self.assertEqual(utils.get_json_codec(), 'json')
+
+
+class WireFormatTests(SimpleTestCase):
+    """The MessagePack wire format round-trips the board-heavy messages."""
+
+    def test_compact_fields_round_trip(self):
+        board = build_initial_board(load_config(None)).to_dict()
+        board['0,0'] = {'unit_id': 'rook', 'color': 'white', 'hp': 3, 'max_hp': 12}
+        message = {
+            'type': 'move_made',
+            'boardState': board,
+            'changes': {'0,1': None, '0,0': board['0,0']},
+            'legalMoves': {'-5,10': ['-5,9', '-5,8'], '0,0': []},
+            'move': {'from': '0,1', 'to': '0,0', 'turn': 4},
+            'moveHistory': [{'from': '-5,10', 'to': '-5,9', 'turn': 1}],
+            'turnNumber': 5,
+        }
+        frame = wire.pack_message(message)
+        self.assertEqual(wire.unpack_message(frame), message)
+        self.assertLess(len(frame), len(json.dumps(message)) // 2)
+        # hp and max_hp are row columns, not a trailing map
+        self.assertEqual(wire.compact_message({'boardState': {'0,0': board['0,0']}}),
+                         {'boardState': [[0, 0, 'rook', 0, 3, 12]]})
+
+    def test_bad_frames_are_rejected(self):
+        for frame in (b'\xc1', b'\x92\x01\x02', b'\x92'):  # bad byte, [1, 2], truncated
+            with self.assertRaises(wire.WireDecodeError):
+                wire.unpack_message(frame)
+
+
+class MessageDecodingTests(SimpleTestCase):
+    """Inbound messages are parsed and validated into typed structs in one pass."""
+
+    def test_fields_are_typed_normalised_and_defaulted(self):
+        msg = decode_message({'type': 'join_game_room', 'username': ' alice ', 'gameId': 'g1',
+                              'token': 't', 'legalMoves': True, 'extra': 1})
+        assert isinstance(msg, messages.JoinGameRoom)
+        self.assertEqual((msg.username, msg.game_id, msg.token, msg.board_deltas, msg.legal_moves),
+                         ('alice', 'g1', 't', False, True))
+
+        move = decode_message({'type': 'make_move', 'from': '-5,10', 'to': '-5,9'})
+        assert isinstance(move, messages.MakeMove)
+        self.assertEqual((move.from_coord, move.to_coord), ('-5,10', '-5,9'))
+        self.assertEqual(cast(Any, decode_message({'type': 'request_reveal_mode', 'gameId': 'g',
+                                                   'action': ' ENABLE'})).action, 'enable')
+        self.assertEqual(cast(Any, decode_message({'type': 'join_lobby', 'username': 'bob',
+                                                   'secret': 'x' * 100})).secret, 'x' * 64)
+        self.assertIsNone(decode_message({'type': 'no_such_message'}))
+        # Only str fields are stripped; chat content is kept as sent.
+        self.assertEqual(cast(Any, decode_message({'type': 'chat_message', 'content': ' hi '})).content, ' hi ')
+
+    def test_malformed_messages_are_rejected(self):
+        cases = [
+            ({'type': 'make_move', 'to': '0,0'}, 'MISSING_FIELD'),
+            ({'type': 'make_move', 'from': None, 'to': '0,0'}, 'MISSING_FIELD'),
+            ({'type': 'make_move', 'from': [0, 1], 'to': '0,0'}, 'INVALID_FIELD'),
+            ({'type': 'start_game'}, 'MISSING_FIELD'),
+            ({'type': 'start_game', 'gameId': 7}, 'INVALID_FIELD'),
+            ({'type': 'change_game_mode', 'gameId': 'g', 'mode': 'blitz'}, 'INVALID_GAME_MODE'),
+            ({'type': 'respond_draw', 'accept': 1}, 'INVALID_FIELD'),
+            ({'type': 'request_config', 'configHash': 7}, 'INVALID_FIELD'),
+            ({'type': 'join_lobby', 'username': 'x' * 25}, 'USERNAME_TOO_LONG'),
+            ({'type': 'set_status', 'username': 'a', 'status': 'away'}, 'INVALID_STATUS'),
+            ({'type': 'chat_message', 'content': ''}, 'INVALID_MESSAGE'),
+            ({'type': 'change_game_mode', 'gameId': 'g', 'mode': 'custom', 'options': {'x': 1}},
+             'INVALID_OPTION_KEY'),
+            ({'type': 'request_reveal_mode', 'gameId': 'g', 'action': 'toggle'}, 'INVALID_ACTION'),
+            (['make_move'], 'INVALID_MESSAGE'),
+        ]
+        for data, code in cases:
+            with self.subTest(data=data):
+                with self.assertRaises(ValidationError) as ctx:
+                    decode_message(data)
+                self.assertEqual(ctx.exception.code, code)
+
+    def test_frames_decode_as_their_dicts_do(self):
+        frames = [
+            {'type': 'join_game_room', 'username': ' alice ', 'gameId': 'g1', 'token': 't',
+             'boardDeltas': True, 'extra': [1]},
+            {'type': 'make_move', 'from': ' -5,10', 'to': '-5,9'},
+            {'type': 'join_lobby', 'username': 'bob', 'secret': 'x' * 100},
+            {'type': 'chat_message', 'content': ' hi ', 'timestamp': None},
+            {'type': 'request_reveal_mode', 'gameId': 'g', 'action': ' ENABLE'},
+            {'type': 'heartbeat'},
+        ]
+        for data in frames:
+            with self.subTest(data=data):
+                message = messages.decode_frame(json.dumps(data))
+                if messages.msgspec is not None:
+                    self.assertEqual(message, decode_message(data))
+                else:
+                    self.assertIsNone(message)
+        # Left to decode_message, which answers for them.
+        for data in [{'type': 'no_such_message'}, {'type': 'make_move', 'from': None, 'to': '0,0'},
+                     {'type': 'chat_message', 'content': None}, {'type': 'respond_draw', 'accept': 1},
+                     ['make_move']]:
+            with self.subTest(data=data):
+                self.assertIsNone(messages.decode_frame(json.dumps(data)))
+        self.assertIsNone(messages.decode_frame('{"type": '))
+
+    async def test_malformed_message_is_answered_with_its_code(self):
+        comm = _lobby_client()
+        try:
+            await comm.connect()
+            await _receive_until(comm, 'connection_established')
+            await comm.send_json_to({'type': 'start_game'})
+            self.assertEqual((await _receive_until(comm, 'error'))['code'], 'MISSING_FIELD')
+            await comm.send_json_to({'type': 'change_game_mode', 'gameId': 'g', 'mode': 'blitz'})
+            self.assertEqual((await _receive_until(comm, 'error'))['code'], 'INVALID_GAME_MODE')
+        finally:
+            await comm.disconnect()
+
+    def test_every_message_type_has_one_class_level_handler(self):
+        self.assertEqual(set(GameConsumer.message_handlers), set(messages.MESSAGE_TYPES))
+        self.assertIs(GameConsumer.message_handlers['make_move'], GameConsumer._handle_make_move)
+
+        class Incomplete:
+            @messages.handles(messages.Heartbeat)
+            async def heartbeat(self, msg):
+                pass
+
+        with self.assertRaises(TypeError):
+            messages.message_dispatch(Incomplete)
+
+    def test_disabled_structured_log_builds_nothing(self):
+        from game import utils
+
+        with patch.object(utils.logger, 'isEnabledFor', return_value=False), \
+                patch.object(utils, 'encode_json') as encode, patch.object(utils.logger, 'log') as log:
+            utils.structured_log('debug', 'message_received', username='alice')
+        encode.assert_not_called()
+        log.assert_not_called()
+        with patch.object(utils.logger, 'isEnabledFor', return_value=True), \
+                patch.object(utils.logger, 'log') as log:
+            utils.structured_log('warning', 'idempotency_set_failed', key='k')
+        self.assertEqual(log.call_args.args[0], logging.WARNING)
+        self.assertEqual(json.loads(log.call_args.args[1])['key'], 'k')
+
+
 class GameStateOptimisticConcurrencyTests(TestCase):
     """
-    Verifies the conditional-write mechanism in GameConsumer._update_game_state /
+    Verifies the conditional-write mechanism in live_games.write_game_state /
     _end_game that prevents a stale turn-timer write from clobbering a move
     that already ended the game (or vice versa). Each test exercises the real
     consumer methods directly against a real GameState row - no WebSocket or
@@ -62,40 +301,42 @@ class GameStateOptimisticConcurrencyTests(TestCase):
             player_black='bob',
         )
 
+    @database_sync_to_async
+    def _write(self, expected_turn_number, new_moves=(), **fields):
+        moves = [GameMove.from_record(self.game.game_id, record) for record in new_moves]
+        return write_game_state(self.game.game_id, fields, expected_turn_number, moves)
+
     async def test_update_succeeds_when_turn_matches(self):
-        applied = await self.consumer._update_game_state(
-            game_id=self.game.game_id,
+        applied = await self._write(
             board_state={'moved': True},
             current_turn='bob',
             turn_number=2,
-            move_history=[{'from': '0,0', 'to': '1,0'}],
+            new_moves=[{'from': '0,0', 'to': '1,0', 'turn': 1}],
             expected_turn_number=1,
         )
         self.assertTrue(applied)
         refreshed = await GameState.objects.aget(game_id=self.game.game_id)
         self.assertEqual(refreshed.turn_number, 2)
         self.assertEqual(refreshed.current_turn, 'bob')
+        move = await GameMove.objects.aget(game_id=self.game.game_id)
+        self.assertEqual((move.ply, move.from_coord, move.to_coord), (1, '0,0', '1,0'))
 
     async def test_stale_write_is_rejected_and_does_not_clobber(self):
         """A writer that read state before another writer already advanced
         turn_number must not be able to overwrite that newer state."""
         # A move already advanced the game to turn 2 (simulating the winning writer).
-        await self.consumer._update_game_state(
-            game_id=self.game.game_id,
+        await self._write(
             board_state={'first': True},
             current_turn='bob',
             turn_number=2,
-            move_history=[],
             expected_turn_number=1,
         )
 
         # A second writer, still holding a stale turn_number=1 snapshot, tries to write.
-        applied = await self.consumer._update_game_state(
-            game_id=self.game.game_id,
+        applied = await self._write(
             board_state={'second': True},
             current_turn='alice',
             turn_number=2,
-            move_history=[],
             expected_turn_number=1,  # stale - the row is already at turn_number=2
         )
         self.assertFalse(applied)
@@ -108,12 +349,10 @@ class GameStateOptimisticConcurrencyTests(TestCase):
         """A move that finishes processing after a turn timer already ended
         the game must not revive it back to 'in progress'."""
         # Turn timer fires first and ends the game (still turn_number=1).
-        applied_timeout = await self.consumer._update_game_state(
-            game_id=self.game.game_id,
+        applied_timeout = await self._write(
             board_state={},
             current_turn='alice',
             turn_number=1,
-            move_history=[],
             winner='bob',
             end_reason='timeout',
             expected_turn_number=1,
@@ -122,12 +361,11 @@ class GameStateOptimisticConcurrencyTests(TestCase):
 
         # The move that was already in flight (read state before the timeout
         # landed) now tries to persist its own result on the same turn_number.
-        applied_move = await self.consumer._update_game_state(
-            game_id=self.game.game_id,
+        applied_move = await self._write(
             board_state={'move_applied': True},
             current_turn='bob',
             turn_number=2,
-            move_history=[{'from': '0,0', 'to': '1,0'}],
+            new_moves=[{'from': '0,0', 'to': '1,0', 'turn': 1}],
             winner='',
             end_reason='',
             expected_turn_number=1,  # matches turn_number, but end_reason is no longer ''
@@ -138,6 +376,7 @@ class GameStateOptimisticConcurrencyTests(TestCase):
         self.assertEqual(refreshed.end_reason, 'timeout')  # not clobbered back to in-progress
         self.assertEqual(refreshed.winner, 'bob')
         self.assertEqual(refreshed.board_state, {})
+        self.assertFalse(await GameMove.objects.filter(game_id=self.game.game_id).aexists())
 
     async def test_end_game_second_caller_on_same_turn_is_rejected(self):
         """Two concurrent end-game paths (e.g. resign racing a timeout) on the
@@ -153,6 +392,264 @@ class GameStateOptimisticConcurrencyTests(TestCase):
         self.assertEqual(refreshed.winner, 'bob')
 
 
+class LiveGameRegistryTests(TestCase):
+    """
+    The in-memory live-game registry: moves are applied to the resident
+    game and written behind, coalesced, under the turn-number guard of
+    write_game_state.
+    """
+
+    def setUp(self):
+        self.registry = LiveGameRegistry()
+        self.game = GameRoom.objects.create(host='alice', opponent='bob', status='started')
+        board = build_initial_board(load_config(None))
+        GameState.objects.create(
+            game=self.game,
+            board_state=board.to_dict(),
+            current_turn='alice',
+            turn_number=1,
+            player_white='alice',
+            player_black='bob',
+        )
+
+    async def _live(self) -> LiveGame:
+        live = await self.registry.get(self.game.game_id)
+        assert live is not None
+        return live
+
+    def _move(self, live, src, dst, color):
+        live.board.move(*parse_coord(src), *parse_coord(dst))
+        next_turn = 'bob' if live.current_turn == 'alice' else 'alice'
+        record = {'from': src, 'to': dst, 'unit_id': 'pawn', 'color': color, 'turn': live.turn_number}
+        applied = live.advance(record, current_turn=next_turn,
+                               turn_number=live.turn_number + 1, winner='', end_reason='',
+                               turn_started_at=None, expected_turn_number=live.turn_number)
+        self.assertTrue(applied)
+        self.registry.mark_dirty(live)
+
+    async def test_moves_are_kept_in_memory_and_coalesced_into_one_write(self):
+        with override_settings(GAME_STATE_FLUSH_DELAY=60), \
+                patch('game.live_games._write_state', wraps=live_games_module._write_state) as write:
+            live = await self._live()
+            self.assertIs(await self.registry.get(self.game.game_id), live)
+            self._move(live, '-5,10', '-5,9', 'white')
+            self._move(live, '5,-10', '5,-9', 'black')
+
+            state = await GameState.objects.aget(game_id=self.game.game_id)
+            self.assertEqual(state.turn_number, 1)  # nothing written yet
+
+            self.assertTrue(await self.registry.flush(self.game.game_id))
+            self.assertEqual(write.call_count, 1)
+            self.assertTrue(await self.registry.flush(self.game.game_id))  # clean: no write
+            self.assertEqual(write.call_count, 1)
+
+        state = await GameState.objects.aget(game_id=self.game.game_id)
+        self.assertEqual(state.turn_number, 3)
+        moves = [m.to_record() async for m in GameMove.objects.filter(game_id=self.game.game_id)]
+        self.assertEqual([(m['from'], m['to'], m['turn']) for m in moves],
+                         [('-5,10', '-5,9', 1), ('5,-10', '5,-9', 2)])
+        # Two moves are well inside the snapshot interval: the stored board is
+        # still the initial snapshot, and the moves' deltas bring it up to date.
+        self.assertEqual((state.snapshot_turn, state.board_state),
+                         (1, build_initial_board(load_config(None)).to_dict()))
+        self.assertEqual(await self._current_board(), live.board.to_dict())
+
+    @database_sync_to_async
+    def _current_board(self):
+        state = GameState.objects.prefetch_related('moves').get(game_id=self.game.game_id)
+        return state.current_board_state()
+
+    async def test_game_ending_move_whose_write_fails_is_taken_back(self):
+        consumer = GameConsumer()
+        consumer.username = 'alice'
+        consumer.send = AsyncMock()
+        with override_settings(GAME_STATE_FLUSH_DELAY=60), \
+                patch('game.consumers.live_games', self.registry):
+            live = await self._live()
+            self._move(live, '-5,10', '-5,9', 'white')
+            self._move(live, '5,-10', '5,-9', 'black')
+            board = copy.deepcopy(live.board.to_dict())
+
+            move = decode_message({'type': 'make_move', 'from': '-5,9', 'to': '-5,8'})
+            with patch('game.consumers.detect_outcome', return_value='elimination'), \
+                    patch('game.live_games._write_state', AsyncMock(side_effect=RuntimeError('db down'))):
+                with self.assertRaises(RuntimeError):
+                    await consumer._apply_move(live, move)
+
+            # Nobody was told, and the live game is as it was before the move.
+            consumer.send.assert_not_called()
+            self.assertEqual(live.board.to_dict(), board)
+            self.assertEqual(live.board.zobrist_hash, live.board.compute_zobrist_hash())
+            self.assertEqual((live.turn_number, live.current_turn, live.end_reason, live.winner),
+                             (3, 'alice', '', ''))
+            self.assertEqual([m['turn'] for m in live.move_history], [1, 2])
+            self.assertEqual([m.ply for m in live.unsaved_moves], [1, 2])
+            # The earlier moves' write is rescheduled.
+            self.assertIsNotNone(live.flush_task)
+            self.registry.discard(live)
+
+    async def test_board_is_snapshotted_every_interval_and_rebuilt_on_reload(self):
+        with override_settings(GAME_STATE_FLUSH_DELAY=60, GAME_STATE_SNAPSHOT_INTERVAL=2):
+            live = await self._live()
+            self._move(live, '-5,10', '-5,9', 'white')
+            await self.registry.flush(live)
+            state = await GameState.objects.aget(game_id=self.game.game_id)
+            self.assertEqual(state.snapshot_turn, 1)  # delta only
+
+            self._move(live, '5,-10', '5,-9', 'black')
+            await self.registry.flush(live)
+            state = await GameState.objects.aget(game_id=self.game.game_id)
+            self.assertEqual((state.snapshot_turn, state.board_state), (3, live.board.to_dict()))
+
+            self._move(live, '-5,9', '-5,8', 'white')
+            await self.registry.flush(live)
+            expected = {key: dict(cell) for key, cell in live.board.to_dict().items()}
+
+        self.registry.discard(live)
+        reloaded = await self._live()
+        self.assertIsNot(reloaded, live)
+        self.assertEqual(reloaded.snapshot_turn, 3)
+        self.assertEqual(reloaded.board.to_dict(), expected)
+        self.assertEqual(await self._current_board(), expected)
+
+    async def test_cells_changed_covers_damage_and_elimination(self):
+        live = await self._live()
+        board = live.board
+        board.set(0, 0, 'rook', 'white', hp=12)
+        board.set(1, 0, 'king', 'black', hp=10)  # takes 4 per rook hit
+        for _ in range(2):
+            resolve_combat(board, (0, 0), (1, 0), live.config)
+            self.assertEqual(live.cells_changed({'from': '0,0', 'to': '1,0'}),
+                             {'0,0': board.get(0, 0), '1,0': board.get(1, 0)})
+        resolve_combat(board, (0, 0), (1, 0), live.config)  # eliminated: the rook moves in
+        self.assertEqual(live.cells_changed({'from': '0,0', 'to': '1,0'}),
+                         {'0,0': None, '1,0': {'unit_id': 'rook', 'color': 'white', 'hp': 12}})
+
+    async def test_write_behind_fires_after_the_flush_delay(self):
+        with override_settings(GAME_STATE_FLUSH_DELAY=0.05):
+            live = await self._live()
+            self._move(live, '-5,10', '-5,9', 'white')
+            for _ in range(40):
+                state = await GameState.objects.aget(game_id=self.game.game_id)
+                if state.turn_number == 2:
+                    break
+                await asyncio.sleep(0.05)
+        self.assertEqual(state.turn_number, 2)
+        self.assertFalse(live.dirty)
+
+    async def test_write_conflict_reloads_the_game_and_resyncs_its_room(self):
+        live = await self._live()
+        # Someone else moved the row on behind the resident copy's back.
+        await GameState.objects.filter(game_id=self.game.game_id).aupdate(turn_number=5)
+        self._move(live, '-5,10', '-5,9', 'white')
+
+        with patch('game.live_games.group_send_event', new_callable=AsyncMock) as send, \
+                self.assertLogs('game', level='WARNING'):
+            self.assertFalse(await self.registry.flush(live))
+        send.assert_awaited_once_with(ANY, f'game_{self.game.game_id}',
+                                      {'type': 'resync_game_state', 'game_id': self.game.game_id})
+        state = await GameState.objects.aget(game_id=self.game.game_id)
+        self.assertEqual((state.turn_number, state.board_state), (5, build_initial_board(load_config(None)).to_dict()))
+        reloaded = await self._live()
+        self.assertIsNot(reloaded, live)
+        self.assertEqual(reloaded.turn_number, 5)
+
+    async def test_failed_write_behind_is_retried(self):
+        real_write = live_games_module._write_state
+        calls = []
+
+        async def flaky_write(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise RuntimeError('database unavailable')
+            return await real_write(*args)
+
+        with override_settings(GAME_STATE_FLUSH_DELAY=0.01), \
+                patch('game.live_games._write_state', flaky_write), \
+                self.assertLogs('game', level='ERROR'):
+            live = await self._live()
+            self._move(live, '-5,10', '-5,9', 'white')
+            for _ in range(100):
+                if len(calls) == 2 and not live.dirty:
+                    break
+                await asyncio.sleep(0.01)
+        self.assertEqual(len(calls), 2)
+        state = await GameState.objects.aget(game_id=self.game.game_id)
+        self.assertEqual(state.turn_number, 2)
+        self.assertEqual(await GameMove.objects.filter(game_id=self.game.game_id).acount(), 1)
+
+    @override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels_redis.core.RedisChannelLayer'}})
+    async def test_shared_registry_writes_through_and_keeps_nothing_resident(self):
+        self.assertTrue(self.registry.shared)
+        self.assertIsNot(await self.registry.get(self.game.game_id),
+                         await self.registry.get(self.game.game_id))
+
+        async def move(live):
+            self.assertIs(await self.registry.get(self.game.game_id), live)  # one copy per mutation
+            self._move(live, '-5,10', '-5,9', 'white')
+            live.flush_task.cancel()  # _move schedules a write behind; save writes now
+            return await self.registry.save(live)
+
+        self.assertTrue(await self.registry.run(self.game.game_id, move))
+        state = await GameState.objects.aget(game_id=self.game.game_id)
+        self.assertEqual(state.turn_number, 2)
+        self.assertNotIn(self.game.game_id, self.registry)
+
+    async def test_finished_game_is_written_and_leaves_the_registry(self):
+        live = await self._live()
+        self.assertFalse(live.finish('bob', 'timeout', expected_turn_number=2))  # stale turn
+        self.assertTrue(live.finish('bob', 'timeout', expected_turn_number=1))
+        self.assertFalse(live.finish('alice', 'resign', expected_turn_number=1))
+        self.assertTrue(await self.registry.flush(live))
+        self.assertNotIn(self.game.game_id, self.registry)
+
+        state = await GameState.objects.aget(game_id=self.game.game_id)
+        self.assertEqual((state.end_reason, state.winner), ('timeout', 'bob'))
+        finished = await self._live()
+        self.assertTrue(finished.is_finished)
+        self.assertNotIn(self.game.game_id, self.registry)  # not kept resident
+
+    async def test_actor_runs_a_games_mutations_one_at_a_time(self):
+        """A move that yields half-way finishes before a resignation
+        submitted meanwhile even looks at the game - no retry needed."""
+        game_id = self.game.game_id
+        events = []
+
+        async def move(live):
+            events.append(('move', live.turn_number))
+            await asyncio.sleep(0.05)  # e.g. writing a result
+            self._move(live, '-5,10', '-5,9', 'white')
+            # Re-entering the game's own actor runs inline instead of deadlocking.
+            return await self.registry.run(game_id, lambda l: asyncio.sleep(0, l.turn_number))
+
+        async def resign(live, winner, **extra):
+            events.append(('resign', live.turn_number, extra))
+            return live.finish(winner, 'resign', expected_turn_number=live.turn_number)
+
+        async def fail(live):
+            raise ValueError('boom')
+
+        async def skip(live):
+            skipped.append(live)
+
+        with override_settings(GAME_STATE_FLUSH_DELAY=60):
+            skipped = []
+            first = asyncio.ensure_future(self.registry.run(game_id, move))
+            second = asyncio.ensure_future(self.registry.run(game_id, resign, 'bob', resignedBy='alice'))
+            abandoned = asyncio.ensure_future(self.registry.run(game_id, skip))
+            await asyncio.sleep(0.01)
+            abandoned.cancel()  # its submitter stops waiting before its turn
+            self.assertEqual(await first, 2)
+            self.assertTrue(await second)
+            with self.assertRaises(ValueError):
+                await self.registry.run(game_id, fail)
+
+        self.assertEqual(events, [('move', 1), ('resign', 2, {'resignedBy': 'alice'})])
+        self.assertEqual(skipped, [])
+        self.assertEqual(self.registry._actors, {})  # idle games hold no task
+        self.registry.discard(game_id)
+
+
 class TurnTimerLiveIntegrationTests(TransactionTestCase):
     """
     Drives a real game through the full async WebSocket stack with a short
@@ -169,7 +666,8 @@ class TurnTimerLiveIntegrationTests(TransactionTestCase):
         game = await GameRoom.objects.acreate(
             host='alice', opponent='bob', status='waiting',
             host_token='host-tok', opponent_token='opp-tok',
-            game_mode='custom', custom_config=config,
+            game_mode='custom',
+            custom_config_blob=await database_sync_to_async(GameConfigBlob.intern)(config),
         )
 
         application = URLRouter(websocket_urlpatterns)
@@ -236,7 +734,8 @@ class DisconnectGraceLiveIntegrationTests(TransactionTestCase):
         game = await GameRoom.objects.acreate(
             host='alice', opponent='bob', status='waiting',
             host_token='host-tok', opponent_token='opp-tok',
-            game_mode='custom', custom_config=config,
+            game_mode='custom',
+            custom_config_blob=await database_sync_to_async(GameConfigBlob.intern)(config),
         )
         application = URLRouter(websocket_urlpatterns)
         host_comm = WebsocketCommunicator(application, f"/ws/game/{game.game_id}/")
@@ -265,11 +764,15 @@ class DisconnectGraceLiveIntegrationTests(TransactionTestCase):
         with patch('game.consumers.DISCONNECT_GRACE_SECONDS', 1):
             game, host_comm, opp_comm = await self._start_game(grace_seconds=1)
             try:
-                # Bob disconnects and never comes back.
-                await opp_comm.disconnect()
-
-                notice = await _receive_until(host_comm, 'opponent_disconnected', timeout=5)
+                # Bob disconnects and never comes back. Only this game is
+                # written on the spot.
+                with patch.object(live_games, 'flush_all') as flush_all, \
+                        patch.object(live_games, 'flush_or_retry', wraps=live_games.flush_or_retry) as flush:
+                    await opp_comm.disconnect()
+                    notice = await _receive_until(host_comm, 'opponent_disconnected', timeout=5)
                 self.assertEqual(notice['username'], 'bob')
+                flush_all.assert_not_called()
+                flush.assert_awaited_once_with(game.game_id)
 
                 # Game must still be active immediately after the disconnect
                 # (not instantly forfeited - a page refresh shouldn't lose the game).
@@ -535,23 +1038,26 @@ class GameLifecycleGuardTests(TransactionTestCase):
     disconnect, which gets a reconnect grace period).
     """
 
-    async def _start_game(self):
+    async def _start_game(self, host_board_deltas=False, host_subprotocols=None, opp_legal_moves=False):
         game = await GameRoom.objects.acreate(
             host='alice', opponent='bob', status='waiting',
             host_token='host-tok', opponent_token='opp-tok',
         )
         application = URLRouter(websocket_urlpatterns)
-        host_comm = WebsocketCommunicator(application, f"/ws/game/{game.game_id}/")
+        host_comm = WebsocketCommunicator(application, f"/ws/game/{game.game_id}/",
+                                          subprotocols=host_subprotocols)
         opp_comm = WebsocketCommunicator(application, f"/ws/game/{game.game_id}/")
 
         await host_comm.connect()
         await opp_comm.connect()
         await host_comm.send_json_to({
             'type': 'join_game_room', 'username': 'alice', 'gameId': game.game_id, 'token': 'host-tok',
+            'boardDeltas': host_board_deltas,
         })
         await _receive_until(host_comm, 'join_game_room_success')
         await opp_comm.send_json_to({
             'type': 'join_game_room', 'username': 'bob', 'gameId': game.game_id, 'token': 'opp-tok',
+            'legalMoves': opp_legal_moves,
         })
         await _receive_until(opp_comm, 'join_game_room_success')
 
@@ -576,6 +1082,7 @@ class GameLifecycleGuardTests(TransactionTestCase):
             self.assertEqual(err['code'], 'GAME_IN_PROGRESS')
 
             # The live game was not reset: still turn 2, same colour assignment.
+            await live_games.flush_all()  # moves are written behind
             state = await GameState.objects.aget(game_id=game.game_id)
             self.assertEqual(state.turn_number, 2)
             self.assertEqual(state.player_white, started['playerWhite'])
@@ -706,6 +1213,7 @@ class GameLifecycleGuardTests(TransactionTestCase):
 
             # The stale offer must be gone server-side too (a reconnect resync
             # previously resurrected it).
+            await live_games.flush_all()
             state = await GameState.objects.aget(game_id=game.game_id)
             self.assertEqual(state.draw_offered_by, '')
 
@@ -719,6 +1227,33 @@ class GameLifecycleGuardTests(TransactionTestCase):
             await host_comm.disconnect()
             await opp_comm.disconnect()
 
+    async def test_move_made_carries_legal_moves_to_the_opted_in_next_player_only(self):
+        with patch('game.consumers.random.random', return_value=0.0):  # alice plays white
+            game, white_comm, black_comm, started = await self._start_game(opp_legal_moves=True)
+        try:
+            await white_comm.send_json_to({'type': 'make_move', 'from': '-5,10', 'to': '-5,9'})
+            made = await _receive_until(black_comm, 'move_made')
+            self.assertNotIn('legalMoves', await _receive_until(white_comm, 'move_made'))
+            self.assertIn('legalMoves', made)
+
+            config = load_config(None)
+            board = HexBoard.from_dict(config['board']['radius'], made['boardState'])
+            expected = {}
+            for coord, _cell in board.iter_pieces('black'):
+                moves = get_legal_moves(board, coord, config, 'black')
+                if moves:
+                    expected[coord_key(*coord)] = sorted(coord_key(*m) for m in moves)
+            self.assertEqual({k: sorted(v) for k, v in made['legalMoves'].items()}, expected)
+            self.assertTrue(expected)
+
+            # White didn't opt in, and black isn't next: neither gets a map.
+            await black_comm.send_json_to({'type': 'make_move', 'from': '5,-10', 'to': '5,-9'})
+            self.assertNotIn('legalMoves', await _receive_until(white_comm, 'move_made'))
+            self.assertNotIn('legalMoves', await _receive_until(black_comm, 'move_made'))
+        finally:
+            await white_comm.disconnect()
+            await black_comm.disconnect()
+
     async def test_malformed_move_coordinates_get_client_error_not_internal(self):
         game, host_comm, opp_comm, started = await self._start_game()
         try:
@@ -726,6 +1261,156 @@ class GameLifecycleGuardTests(TransactionTestCase):
             await white_comm.send_json_to({'type': 'make_move', 'from': 'garbage', 'to': '0,0'})
             err = await _receive_until(white_comm, 'error', timeout=5)
             self.assertEqual(err['code'], 'INVALID_MOVE')
+
+            # Not a string at all: rejected before the handler runs.
+            with patch.dict(GameConsumer.message_handlers, {'make_move': AsyncMock()}):
+                handler = GameConsumer.message_handlers['make_move']
+                await white_comm.send_json_to({'type': 'make_move', 'from': {'q': 0}, 'to': '0,0'})
+                err = await _receive_until(white_comm, 'error', timeout=5)
+            self.assertEqual(err['code'], 'INVALID_FIELD')
+            handler.assert_not_called()
+        finally:
+            await host_comm.disconnect()
+            await opp_comm.disconnect()
+
+    async def test_resync_move_history_survives_reload_from_move_log(self):
+        game, host_comm, opp_comm, started = await self._start_game()
+        try:
+            white_comm = host_comm if started['currentTurn'] == 'alice' else opp_comm
+            black_comm = opp_comm if white_comm is host_comm else host_comm
+            await white_comm.send_json_to({'type': 'make_move', 'from': '-5,10', 'to': '-5,9'})
+            first = await _receive_until(black_comm, 'move_made')
+            await _receive_until(white_comm, 'move_made')
+            await black_comm.send_json_to({'type': 'make_move', 'from': '5,-10', 'to': '5,-9'})
+            second = await _receive_until(white_comm, 'move_made')
+            await _receive_until(black_comm, 'move_made')
+            expected = [first['move'], second['move']]
+
+            await host_comm.send_json_to({'type': 'request_game_state'})
+            resync = await _receive_until(host_comm, 'game_state_update', timeout=5)
+            self.assertEqual(resync['moveHistory'], expected)
+
+            # Written as one row per move; a reload rebuilds the same history.
+            await live_games.flush_all()
+            self.assertEqual(await GameMove.objects.filter(game_id=game.game_id).acount(), 2)
+            live_games.discard(game.game_id)
+            await host_comm.send_json_to({'type': 'request_game_state'})
+            resync = await _receive_until(host_comm, 'game_state_update', timeout=5)
+            self.assertEqual(resync['moveHistory'], expected)
+            self.assertEqual(resync['turnNumber'], 3)
+        finally:
+            await host_comm.disconnect()
+            await opp_comm.disconnect()
+
+    async def test_non_canonical_move_coordinates_are_logged_canonically(self):
+        game, host_comm, opp_comm, started = await self._start_game()
+        try:
+            white_comm = host_comm if started['currentTurn'] == 'alice' else opp_comm
+            # Longer than GameMove.from_coord allows, but parses as -5,10.
+            await white_comm.send_json_to({'type': 'make_move', 'from': ' -000005, +000010 ', 'to': '-5,9'})
+            made = await _receive_until(white_comm, 'move_made')
+            self.assertEqual((made['move']['from'], made['move']['to']), ('-5,10', '-5,9'))
+
+            await live_games.flush_all()
+            row = await GameMove.objects.aget(game_id=game.game_id)
+            self.assertEqual((row.from_coord, row.to_coord), ('-5,10', '-5,9'))
+            live_games.discard(game.game_id)
+            await host_comm.send_json_to({'type': 'request_game_state'})
+            resync = await _receive_until(host_comm, 'game_state_update', timeout=5)
+            self.assertEqual(resync['moveHistory'], [made['move']])
+        finally:
+            await host_comm.disconnect()
+            await opp_comm.disconnect()
+
+    async def test_move_made_is_encoded_only_in_the_forms_the_room_takes(self):
+        game, host_comm, opp_comm, started = await self._start_game()
+        try:
+            white_comm = host_comm if started['currentTurn'] == 'alice' else opp_comm
+            with patch('game.consumers.group_send_event', wraps=consumers.group_send_event) as send:
+                await white_comm.send_json_to({'type': 'make_move', 'from': '-5,10', 'to': '-5,9'})
+                made = await _receive_until(opp_comm, 'move_made')
+                await _receive_until(host_comm, 'move_made')
+            event = next(call.args[2] for call in send.call_args_list
+                         if call.args[2]['type'] == 'send_move_made')
+            self.assertIsNone(event['delta'])
+            self.assertIn('boardState', made)
+        finally:
+            await host_comm.disconnect()
+            await opp_comm.disconnect()
+        self.assertNotIn(game.game_id, consumers._room_move_forms)
+
+    async def test_delta_move_made_converges_to_the_full_board(self):
+        game, host_comm, opp_comm, started = await self._start_game(host_board_deltas=True)
+        try:
+            white_comm = host_comm if started['currentTurn'] == 'alice' else opp_comm
+            black_comm = opp_comm if white_comm is host_comm else host_comm
+            # alice rebuilds the board from deltas, bob gets full boards
+            board = dict(started['boardState'])
+            board_hash, turn = started['boardHash'], started['turnNumber']
+            moves = [(white_comm, '-5,10', '-5,9'), (black_comm, '5,-10', '5,-9'),
+                     (white_comm, '-5,9', '-5,8'), (black_comm, '5,-9', '5,-8')]
+            for comm, src, dst in moves:
+                await comm.send_json_to({'type': 'make_move', 'from': src, 'to': dst})
+                delta = await _receive_until(host_comm, 'move_made')
+                full = await _receive_until(opp_comm, 'move_made')
+                self.assertNotIn('boardState', delta)
+                self.assertEqual(delta['changes'], {src: None, dst: full['boardState'][dst]})
+
+                self.assertEqual((delta['baseHash'], delta['turnNumber'] - 1), (board_hash, turn))
+                for key, cell in delta['changes'].items():
+                    if cell is None:
+                        board.pop(key, None)
+                    else:
+                        board[key] = cell
+                board_hash, turn = delta['boardHash'], delta['turnNumber']
+                self.assertEqual(board, full['boardState'])
+                self.assertEqual(board_hash, full['boardHash'])
+
+            # The resync a client asks for on a mismatch agrees too.
+            await host_comm.send_json_to({'type': 'request_game_state'})
+            resync = await _receive_until(host_comm, 'game_state_update', timeout=5)
+            self.assertEqual((resync['boardState'], resync['boardHash'], resync['turnNumber']),
+                             (board, board_hash, turn))
+        finally:
+            await host_comm.disconnect()
+            await opp_comm.disconnect()
+
+    async def test_msgpack_subprotocol_is_not_offered_unless_enabled(self):
+        comm = _lobby_client(subprotocols=[wire.SUBPROTOCOL])
+        connected, subprotocol = await comm.connect()
+        try:
+            self.assertTrue(connected)
+            self.assertIsNone(subprotocol)
+            frame = await comm.receive_output()
+            self.assertIn('text', frame)
+        finally:
+            await comm.disconnect()
+
+    @override_settings(GAME_MSGPACK_WIRE=True)
+    async def test_msgpack_client_is_served_alongside_json(self):
+        with patch('game.consumers.random.random', return_value=0.0):  # alice plays white
+            game, host_comm, opp_comm, started = await self._start_game(
+                host_subprotocols=[wire.SUBPROTOCOL])
+        try:
+            await host_comm.send_to(bytes_data=wire.msgpack.packb({'type': 'request_game_state'}))
+            await opp_comm.send_json_to({'type': 'request_game_state'})
+            packed, frame = await _receive_frame_until(host_comm, 'game_state_update')
+            text_msg, text = await _receive_frame_until(opp_comm, 'game_state_update')
+            assert isinstance(frame, bytes) and isinstance(text, str)
+            self.assertEqual(packed, text_msg)
+            self.assertLess(len(frame), len(text.encode()) * 0.75)
+
+            # Coordinates may arrive as [q, r]; both clients see the same move.
+            await host_comm.send_to(bytes_data=wire.msgpack.packb(
+                {'type': 'make_move', 'from': [-5, 10], 'to': [-5, 9]}))
+            packed, frame = await _receive_frame_until(host_comm, 'move_made')
+            self.assertEqual(packed, await _receive_until(opp_comm, 'move_made'))
+            self.assertEqual(wire.msgpack.unpackb(frame)['move']['from'], [-5, 10])
+            self.assertEqual(packed['move']['from'], '-5,10')
+
+            await host_comm.send_to(bytes_data=b'\xc1')
+            err = await _receive_until(host_comm, 'error')
+            self.assertEqual(err['code'], 'INVALID_MESSAGE')
         finally:
             await host_comm.disconnect()
             await opp_comm.disconnect()
@@ -746,6 +1431,44 @@ class GameLifecycleGuardTests(TransactionTestCase):
             await opp_comm.disconnect()
 
 
+    async def test_resync_skips_config_the_client_already_has(self):
+        game, host_comm, opp_comm, started = await self._start_game()
+        try:
+            config_hash = started['configHash']
+            self.assertEqual(len(config_hash), 64)
+
+            await host_comm.send_json_to({'type': 'request_game_state'})
+            resync = await _receive_until(host_comm, 'game_state_update', timeout=5)
+            self.assertEqual(resync['config'], started['config'])
+            self.assertEqual(resync['configHash'], config_hash)
+
+            await host_comm.send_json_to({'type': 'request_game_state', 'configHash': config_hash})
+            resync = await _receive_until(host_comm, 'game_state_update', timeout=5)
+            self.assertNotIn('config', resync)
+            self.assertEqual(resync['configHash'], config_hash)
+
+            await host_comm.send_json_to({'type': 'request_config', 'configHash': config_hash})
+            fetched = await _receive_until(host_comm, 'game_config', timeout=5)
+            self.assertEqual(fetched['config'], started['config'])
+
+            await host_comm.send_json_to({'type': 'request_config', 'configHash': '0' * 64})
+            err = await _receive_until(host_comm, 'error', timeout=5)
+            self.assertEqual(err['code'], 'CONFIG_NOT_FOUND')
+
+            # Only from inside a game room.
+            outsider = _lobby_client()
+            await outsider.connect()
+            try:
+                await outsider.send_json_to({'type': 'request_config', 'configHash': config_hash})
+                err = await _receive_until(outsider, 'error', timeout=5)
+                self.assertEqual(err['code'], 'NOT_IN_GAME')
+            finally:
+                await outsider.disconnect()
+        finally:
+            await host_comm.disconnect()
+            await opp_comm.disconnect()
+
+
 class LobbyIdentityHijackTests(TransactionTestCase):
     """
     Verifies that rejoining an already-connected username requires proving
@@ -5,20 +5,37 @@ These are plain Django TestCase tests that exercise the pure-Python engine
 modules without needing WebSocket or async infrastructure.
 """
 
+import copy
+import random
 from django.test import TestCase
 from typing import Any, Dict
 
 from game.engine.board import HexBoard, coord_key, parse_coord, hex_distance, HEX_DIRECTIONS
+from game.engine.geometry import get_geometry
 from game.engine.config_loader import (
+    CompiledConfigCache,
+    GameConfig,
+    compile_config,
+    config_fingerprint,
     load_config,
     build_initial_board,
 )
 from game.engine.move_validator import (
+    MOVE_ENGINES,
+    get_all_legal_move_keys,
+    get_all_legal_moves,
     get_legal_moves,
+    get_move_engine,
     is_legal_move,
+    set_move_engine,
 )
+from game.engine.move_cache import LegalMoveCache
+from game.engine.schema_validator import MAX_ERRORS, compile_schema, validate_config_schema
 from game.engine.game_logic import (
     resolve_combat,
+    make_move,
+    unmake_move,
+    keep_move,
     get_legal_moves_filtered,
     has_any_legal_move,
     detect_outcome,
@@ -146,6 +163,126 @@ class HexBoardTestCase(TestCase):
         self.assertEqual(len(board.pieces_by_color('white')), 2)
         self.assertEqual(len(board.pieces_by_color('black')), 1)
 
+    def test_colour_index_tracks_mutations(self):
+        board = HexBoard(3)
+        board.set(0, 0, 'king', 'white', hp=3, max_hp=3)
+        board.set(1, 0, 'pawn', 'black', hp=1, max_hp=1)
+        board.set(-1, 0, 'pawn', 'black', hp=1, max_hp=1)
+        self.assertEqual((board.count('white'), board.count('black')), (1, 2))
+
+        board.move(0, 0, 1, 0)            # capture by moving onto a piece
+        self.assertEqual((board.count('white'), board.count('black')), (1, 1))
+        board.deal_damage(-1, 0, 5)       # eliminated
+        self.assertEqual(board.count('black'), 0)
+        board.set(1, 0, 'pawn', 'black')  # overwrite white's piece in place
+        self.assertEqual((board.count('white'), board.count('black')), (0, 1))
+        board.remove(1, 0)
+        self.assertEqual(board.count('black'), 0)
+        self.assertEqual(board.count('green'), 0)
+
+    def test_iter_pieces(self):
+        board = HexBoard(3)
+        board.set(0, 0, 'king', 'white')
+        board.set(1, 0, 'pawn', 'white')
+        board.set(-1, 0, 'king', 'black')
+        white = dict(board.iter_pieces('white'))
+        self.assertEqual(set(white), {(0, 0), (1, 0)})
+        self.assertIs(white[(0, 0)], board.get(0, 0))
+
+    def test_zobrist_hash_tracks_mutations_incrementally(self):
+        board = HexBoard(4)
+        empty = board.zobrist_hash
+        board.set(0, 0, 'queen', 'white', hp=8, max_hp=8)
+        board.set(1, 0, 'rook', 'black', hp=12, max_hp=12)
+        board.set(-2, 1, 'pawn', 'black', hp=4, max_hp=4)
+        steps = [
+            lambda: board.move(0, 0, 0, 1),
+            lambda: board.deal_damage(1, 0, 5),   # survives - hp changes
+            lambda: board.deal_damage(-2, 1, 9),  # eliminated
+            lambda: board.set(2, -1, 'pawn', 'white', hp=4),
+            lambda: board.remove(1, 0),
+        ]
+        seen = {board.zobrist_hash}
+        for step in steps:
+            step()
+            self.assertEqual(board.zobrist_hash, board.compute_zobrist_hash())
+            seen.add(board.zobrist_hash)
+        self.assertEqual(len(seen), len(steps) + 1)
+
+        board.remove(0, 1)
+        board.remove(2, -1)
+        self.assertEqual(board.zobrist_hash, empty)
+
+    def test_zobrist_hash_is_path_independent(self):
+        a = HexBoard(4)
+        a.set(0, 0, 'queen', 'white', hp=8)
+        a.set(1, 0, 'rook', 'black', hp=12)
+        b = HexBoard(4)
+        b.set(1, 0, 'rook', 'black', hp=12)
+        b.set(2, 0, 'queen', 'white', hp=8)
+        b.move(2, 0, 0, 0)
+        self.assertEqual(a.zobrist_hash, b.zobrist_hash)
+        self.assertEqual(HexBoard.from_dict(4, a.to_dict()).zobrist_hash, a.zobrist_hash)
+
+        b.deal_damage(1, 0, 1)
+        self.assertNotEqual(a.zobrist_hash, b.zobrist_hash)
+
+    def test_undoable_restores_board_exactly(self):
+        board = HexBoard(4)
+        board.set_cell(0, 0, {'unit_id': 'queen', 'color': 'white', 'hp': 8, 'status': ['haste']})
+        board.set(1, 0, 'rook', 'black', hp=12)
+        board.set(-1, 0, 'pawn', 'black')  # no hp key at all
+        before = copy.deepcopy(board.to_dict())
+        h = board.zobrist_hash
+
+        with board.undoable():
+            board.deal_damage(1, 0, 5)
+            board.deal_damage(-1, 0, 3)  # hp defaults to 1 -> eliminated
+            board.move(0, 0, -1, 0)
+            board.move(-1, 0, 1, 0)  # captures the damaged rook
+            board.set(2, 0, 'pawn', 'white', hp=4)
+        self.assertEqual(board.to_dict(), before)
+        self.assertEqual(board.zobrist_hash, h)
+        self.assertEqual(board.count('black'), 2)
+        restored = board.get(-1, 0)
+        assert restored is not None
+        self.assertNotIn('hp', restored)
+
+    def test_clone_is_independent(self):
+        board = HexBoard(4)
+        board.set(0, 0, 'queen', 'white', hp=8)
+        board.set(1, 0, 'rook', 'black', hp=12)
+        clone = board.clone()
+        self.assertEqual(clone.to_dict(), board.to_dict())
+        self.assertEqual(clone.zobrist_hash, board.zobrist_hash)
+
+        clone.deal_damage(1, 0, 5)
+        clone.move(0, 0, -1, 0)
+        original = board.get(1, 0)
+        assert original is not None
+        self.assertEqual(original['hp'], 12)
+        self.assertIsNotNone(board.get(0, 0))
+        self.assertEqual([c for c, _ in board.iter_pieces('white')], [(0, 0)])
+        self.assertEqual(clone.zobrist_hash, clone.compute_zobrist_hash())
+        self.assertNotEqual(clone.zobrist_hash, board.zobrist_hash)
+
+    def test_nested_undo_frames(self):
+        board = HexBoard(4)
+        board.set(0, 0, 'queen', 'white', hp=8)
+        outer = board.begin_undo()
+        board.move(0, 0, 1, 0)
+        inner = board.begin_undo()
+        board.move(1, 0, 2, 0)
+        board.undo_to(inner)
+        self.assertIsNotNone(board.get(1, 0))
+        board.undo_to(outer)
+        self.assertIsNotNone(board.get(0, 0))
+        with self.assertRaises(ValueError):
+            board.undo_to(0)  # no frame left
+        # Journal is off again: mutations are no longer recorded
+        board.move(0, 0, 1, 0)
+        self.assertIsNone(board._journal)
+
     def test_serialisation_roundtrip(self):
         board = HexBoard(3)
         board.set(0, 0, 'king', 'white')
@@ -159,12 +296,50 @@ class HexBoardTestCase(TestCase):
         self.assertEqual(r1['unit_id'], 'king')
         self.assertEqual(r2['unit_id'], 'queen')
 
+    def test_from_dict_accepts_non_canonical_keys(self):
+        board = HexBoard.from_dict(3, {' 1,-1': {'unit_id': 'rook', 'color': 'white'}})
+        piece = board.get(1, -1)
+        assert piece is not None
+        self.assertEqual(piece['unit_id'], 'rook')
+        self.assertEqual(list(board.to_dict()), ['1,-1'])
+
+    def test_from_dict_rejects_bad_keys(self):
+        for bad in ('4,0', 'a,b'):
+            with self.assertRaises(ValueError):
+                HexBoard.from_dict(3, {bad: {'unit_id': 'rook', 'color': 'white'}})
+
     def test_neighbours(self):
         nbrs = HexBoard.neighbours(0, 0)
         self.assertEqual(len(nbrs), 6)
         self.assertIn((1, 0), nbrs)
         self.assertIn((-1, 0), nbrs)
 
+    def test_cell_index_roundtrip(self):
+        board = HexBoard(4)
+        for i, coord in enumerate(board.all_coords()):
+            self.assertEqual(board.index_of(*coord), i)
+            self.assertEqual(board.coord_of(i), coord)
+        self.assertEqual(board.index_of(5, 0), -1)
+
+    def test_neighbour_table_matches_valid_neighbours(self):
+        board = HexBoard(3)
+        table = board.neighbour_table
+        for i, (q, r) in enumerate(board.all_coords()):
+            from_table = {board.coord_of(j) for j in table[6 * i:6 * i + 6] if j >= 0}
+            expected = {c for c in HexBoard.neighbours(q, r) if board.is_valid(*c)}
+            self.assertEqual(from_table, expected)
+            self.assertEqual(set(board.valid_neighbours(q, r)), expected)
+
+    def test_boards_of_same_radius_share_tables(self):
+        self.assertIs(HexBoard(6).neighbour_table, HexBoard(6).neighbour_table)
+
+    def test_move_off_board_keeps_source_piece(self):
+        board = HexBoard(2)
+        board.set(2, 0, 'rook', 'white')
+        with self.assertRaises(ValueError):
+            board.move(2, 0, 3, 0)
+        self.assertIsNotNone(board.get(2, 0))
+
     def test_coord_key_parse_roundtrip(self):
         for q in range(-3, 4):
             for r in range(-3, 4):
@@ -184,6 +359,38 @@ class HexBoardTestCase(TestCase):
         self.assertEqual(hex_distance((0, 0), (3, -3)), 3)
 
 
+# ---------------------------------------------------------------------------
+# Geometry tests
+# ---------------------------------------------------------------------------
+
+class HexGeometryTestCase(TestCase):
+    """Tests for the shared per-radius geometry tables."""
+
+    def test_geometry_is_shared_per_radius(self):
+        self.assertIs(get_geometry(11), get_geometry(11))
+        self.assertIs(HexBoard(11).geometry, get_geometry(11))
+
+    def test_keys_match_coord_key(self):
+        geo = get_geometry(3)
+        for i, (q, r) in enumerate(geo.coords):
+            self.assertEqual(geo.keys[i], coord_key(q, r))
+            self.assertEqual(geo.key_index[coord_key(q, r)], i)
+
+    def test_rings(self):
+        geo = get_geometry(4)
+        self.assertEqual(geo.rings[0], (geo.index[(0, 0)],))
+        for d in range(1, 5):
+            self.assertEqual(len(geo.rings[d]), 6 * d)
+            for i in geo.rings[d]:
+                self.assertEqual(geo.ring[i], d)
+
+    def test_distance_matches_hex_distance(self):
+        geo = get_geometry(3)
+        for a in range(geo.size):
+            for b in range(0, geo.size, 5):
+                self.assertEqual(geo.distance(a, b), hex_distance(geo.coords[a], geo.coords[b]))
+
+
 # ---------------------------------------------------------------------------
 # Config loader tests
 # ---------------------------------------------------------------------------
@@ -233,6 +440,58 @@ class ConfigLoaderTestCase(TestCase):
         self.assertGreater(white_king['hp'], 0)
         self.assertEqual(white_king['hp'], white_king['max_hp'])
 
+    def test_compiled_config(self):
+        raw = load_config(None)
+        config = compile_config(raw)
+        self.assertIsInstance(config, GameConfig)
+        self.assertIs(config.raw, raw)
+        self.assertIs(compile_config(config), config)
+        self.assertEqual(config.radius, 11)
+        self.assertEqual((config.max_turns, config.turn_time_limit), (0, 0))
+        self.assertEqual([u.code for u in config.units], list(range(len(raw['units']))))
+        queen = config.unit_by_id['queen']
+        self.assertIs(config.units[queen.code], queen)
+        self.assertEqual((queen.move, queen.attack, queen.hp), (6, 6, 8))
+        self.assertEqual(config.move_ranges['pawn'], 6)
+        # Dict-style reads still work
+        self.assertEqual(config['board']['radius'], 11)
+        self.assertEqual(config.get('rules', {}).get('maxTurns'), 0)
+
+        with self.assertRaises(AttributeError):
+            config.radius = 5  # type: ignore[misc]
+        with self.assertRaises(AttributeError):
+            queen.attack = 99  # type: ignore[misc]
+
+    def test_initial_position_is_built_once_and_cloned(self):
+        raw = load_config(None)
+        config = compile_config(raw)
+        position = config.initial_position
+        self.assertIs(config.initial_position, position)
+        self.assertEqual(position.board_state, build_initial_board(raw).to_dict())
+
+        board = build_initial_board(config)
+        self.assertIsNot(board, position.board)
+        self.assertEqual(board.to_dict(), position.board_state)
+        self.assertEqual(board.zobrist_hash, build_initial_board(raw).zobrist_hash)
+
+        # Playing on a started board leaves the template untouched
+        board.deal_damage(-5, 11, 3)
+        board.remove(5, -11)
+        self.assertEqual(position.board.get(-5, 11)['hp'], position.board.get(-5, 11)['max_hp'])
+        self.assertIn('5,-11', position.board_state)
+        self.assertEqual(build_initial_board(config).to_dict(), position.board_state)
+
+    def test_fingerprint_is_content_based(self):
+        raw = load_config(None)
+        reordered = dict(reversed(list(copy.deepcopy(raw).items())))
+        self.assertEqual(config_fingerprint(raw), config_fingerprint(reordered))
+        self.assertEqual(len(config_fingerprint(raw)), 64)  # SHA-256 hex
+        self.assertEqual(compile_config(raw), compile_config(reordered))
+
+        changed = copy.deepcopy(raw)
+        changed['units']['pawn']['attack'] = 3
+        self.assertNotEqual(compile_config(changed).fingerprint, compile_config(raw).fingerprint)
+
     def test_invalid_config_raises(self):
         with self.assertRaises(ValueError):
             load_config({'board': {'radius': 0}})  # missing version, bad radius
@@ -243,7 +502,7 @@ class ConfigLoaderTestCase(TestCase):
             'board': {'radius': 3},
             'units': {
                 'king': {'id': 'king', 'name': 'K', 'symbol': 'K',
-                         'movement': [{'direction': 'E', 'range': 1}], 'value': 0}
+                         'move': 1, 'value': 0, 'hp': 5, 'attack': 1}
             },
             'abilities': {},
             'setup': {
@@ -257,6 +516,97 @@ class ConfigLoaderTestCase(TestCase):
         self.assertEqual(board.radius, 3)
         self.assertEqual(len(board.to_dict()), 2)
 
+    def test_config_is_checked_against_the_shared_schema(self):
+        def errors_for(mutate):
+            config = load_config(None)
+            mutate(config)
+            with self.assertRaises(ValueError) as ctx:
+                load_config(config)
+            return str(ctx.exception)
+
+        # The legacy per-direction 'movement' unit shape is no longer accepted
+        self.assertIn("units.pawn: unexpected property 'movement'",
+                      errors_for(lambda c: c['units']['pawn'].update(movement=[])))
+        self.assertIn("units.pawn: missing required property 'hp'",
+                      errors_for(lambda c: c['units']['pawn'].pop('hp')))
+        self.assertIn('units.pawn.hp: must be >= 1',
+                      errors_for(lambda c: c['units']['pawn'].update(hp=0)))
+        self.assertIn('units.pawn.move: must be an integer',
+                      errors_for(lambda c: c['units']['pawn'].update(move=True)))
+        self.assertIn('units.pawn.symbol: must be at most 4 characters',
+                      errors_for(lambda c: c['units']['pawn'].update(symbol='PAWNS')))
+        self.assertIn('board.radius: must be <= 50',
+                      errors_for(lambda c: c['board'].update(radius=51)))
+        self.assertIn("board.orientation: must be one of",
+                      errors_for(lambda c: c['board'].update(orientation='diagonal')))
+        self.assertIn("setup.white.1;2 (name): must match",
+                      errors_for(lambda c: c['setup']['white'].update({'1;2': 'pawn'})))
+        self.assertIn("config: unexpected property 'extra'",
+                      errors_for(lambda c: c.update(extra=1)))
+        # Cross-reference checks the schema can't express still run
+        self.assertIn("Unknown unit 'ghost' at 0,0 in setup.white",
+                      errors_for(lambda c: c['setup']['white'].update({'0,0': 'ghost'})))
+
+    def test_schema_errors_are_capped(self):
+        config = load_config(None)
+        for unit in config['units'].values():
+            unit.update(hp='x', move='x', attack='x', value='x')
+        errors = validate_config_schema(config)
+        self.assertEqual(len(errors), MAX_ERRORS + 1)
+        self.assertIn('stopped after', errors[-1])
+
+    def test_compiled_schema_rejects_unsupported_keywords(self):
+        self.assertEqual(validate_config_schema(None), ['config: must be an object'])
+        with self.assertRaises(ValueError):
+            compile_schema({'type': 'array', 'items': {'type': 'string'}})
+
+
+class CompiledConfigCacheTestCase(TestCase):
+    """CompiledConfigCache: one shared GameConfig per fingerprint."""
+
+    def setUp(self):
+        self.cache = CompiledConfigCache(maxsize=2)
+
+    def _custom(self, radius: int) -> Dict[str, Any]:
+        config = load_config(None)
+        config['board']['radius'] = radius
+        return config
+
+    def test_default_and_equal_configs_share_one_instance(self):
+        default = self.cache.get(None)
+        self.assertIs(self.cache.get({}), default)
+        self.assertIs(self.cache.get(load_config(None)), default)  # same content
+        self.assertEqual(default.fingerprint, config_fingerprint(load_config(None)))
+        stats = self.cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses']), (1, 2, 1))
+        self.assertGreater(stats['nbytes'], 0)
+
+    def test_cached_config_does_not_alias_the_input(self):
+        raw = self._custom(9)
+        config = self.cache.get(raw)
+        raw['board']['radius'] = 3
+        self.assertEqual(config.radius, 9)
+        self.assertEqual(config['board']['radius'], 9)
+
+    def test_invalid_config_raises_and_is_not_cached(self):
+        with self.assertRaises(ValueError):
+            self.cache.get({'board': {'radius': 0}})
+        self.assertEqual(len(self.cache), 0)
+        # Callers that already validated can skip it
+        self.assertEqual(self.cache.get({'board': {'radius': 4}}, validate=False).radius, 4)
+
+    def test_lru_bound_and_footprint(self):
+        a = self.cache.get(self._custom(5))
+        self.cache.get(self._custom(6))
+        self.cache.get(self._custom(7))
+        stats = self.cache.stats()
+        self.assertEqual((stats['size'], stats['evictions']), (2, 1))
+        self.assertIsNone(self.cache.get_by_fingerprint(a.fingerprint))
+        self.assertIsNot(self.cache.get(self._custom(5)), a)  # recompiled
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['nbytes'], 0)
+
 
 # ---------------------------------------------------------------------------
 # Move validator tests
@@ -366,6 +716,178 @@ class MoveValidatorTestCase(TestCase):
             self.assertEqual(unit_def.get('move'), 6, unit_id)
 
 
+    def test_all_legal_moves_matches_per_piece(self):
+        config = load_config(None)
+        board = build_initial_board(config)
+        board.move(-5, 10, 0, 0)
+        board.set(1, 1, 'ghost', 'white')  # unknown unit - cannot move
+        for color in ('white', 'black'):
+            expected = {}
+            for coord, _cell in board.iter_pieces(color):
+                moves = get_legal_moves(board, coord, config, color)
+                if moves:
+                    expected[coord] = set(moves)
+            batch = get_all_legal_moves(board, color, config)
+            self.assertEqual({c: set(m) for c, m in batch.items()}, expected)
+            self.assertNotIn((1, 1), batch)
+            self.assertEqual(
+                get_all_legal_move_keys(board, color, config),
+                {coord_key(*c): [coord_key(*d) for d in m] for c, m in batch.items()},
+            )
+
+    def test_has_any_legal_move_when_boxed_in(self):
+        board = self._make_board(radius=1)
+        board.set(0, 0, 'unit', 'white')
+        for q, r in board.valid_neighbours(0, 0):
+            board.set(q, r, 'unit', 'black')
+        self.assertFalse(has_any_legal_move(board, 'white', self._cfg()))
+        board.remove(1, 0)
+        self.assertTrue(has_any_legal_move(board, 'white', self._cfg()))
+        self.assertTrue(has_any_legal_move(board, 'black', self._cfg()))
+        self.assertFalse(has_any_legal_move(board, 'black', self._cfg(move=0)))
+
+
+class BitboardMoveValidatorTestCase(MoveValidatorTestCase):
+    """The same movement rules, run on the bitboard reachability engine."""
+
+    def setUp(self):
+        super().setUp()
+        previous = get_move_engine()
+        set_move_engine('bitboard')
+        self.addCleanup(set_move_engine, previous)
+
+    def test_engines_agree_on_random_boards(self):
+        rng = random.Random(7)
+        for radius in (1, 2, 5, 11):
+            for _ in range(15):
+                board = HexBoard(radius)
+                coords = board.all_coords()
+                rng.shuffle(coords)
+                for c in coords[:rng.randint(1, len(coords) // 2 + 1)]:
+                    board.set(*c, 'queen', rng.choice(('white', 'black')))
+                config = {'units': {'queen': {'move': rng.randint(1, 2 * radius)}}}
+                for coord, _cell in board.iter_pieces('white'):
+                    results = {}
+                    for name in MOVE_ENGINES:
+                        set_move_engine(name)
+                        moves = get_legal_moves(board, coord, config, 'white')
+                        self.assertEqual(len(moves), len(set(moves)))
+                        results[name] = set(moves)
+                    for name, moves in results.items():
+                        self.assertEqual(moves, results['bfs'], (radius, coord, name))
+
+    def test_engines_agree_on_whole_side_batches(self):
+        rng = random.Random(11)
+        board = HexBoard(25)
+        coords = board.all_coords()
+        rng.shuffle(coords)
+        for n, c in enumerate(coords[:400]):
+            board.set(*c, 'unit', 'white' if n % 2 else 'black')
+        config = {'units': {'unit': {'move': 7}}}
+        results = {}
+        for name in MOVE_ENGINES:
+            set_move_engine(name)
+            batch = get_all_legal_moves(board, 'white', config)
+            results[name] = {c: set(m) for c, m in batch.items()}
+        for name, batch in results.items():
+            self.assertEqual(batch, results['bfs'], name)
+
+    def test_cached_free_mask_follows_board_changes(self):
+        board = HexBoard(3)
+        board.set(0, 0, 'queen', 'white')
+        config = {'units': {'queen': {'move': 1}}}
+        self.assertIn((1, 0), get_legal_moves(board, (0, 0), config, 'white'))
+        self.assertIsNotNone(board.cached_free_mask)
+        board.set(1, 0, 'queen', 'black')
+        self.assertIsNone(board.cached_free_mask)
+        self.assertNotIn((1, 0), get_legal_moves(board, (0, 0), config, 'white'))
+        # Per board: another position of the same radius has its own mask
+        other = HexBoard(3)
+        other.set(0, 0, 'queen', 'white')
+        self.assertIn((1, 0), get_legal_moves(other, (0, 0), config, 'white'))
+        board.deal_damage(1, 0, 0)  # occupancy unchanged: the mask stands
+        self.assertIsNotNone(board.cached_free_mask)
+        self.assertNotIn((1, 0), get_legal_moves(board, (0, 0), config, 'white'))
+        board.remove(1, 0)
+        self.assertIn((1, 0), get_legal_moves(board, (0, 0), config, 'white'))
+
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            set_move_engine('quantum')
+        self.assertEqual(get_move_engine(), 'bitboard')
+
+
+class NumpyMoveValidatorTestCase(MoveValidatorTestCase):
+    """The same movement rules on the NumPy engine (plain BFS without numpy)."""
+
+    def setUp(self):
+        super().setUp()
+        previous = get_move_engine()
+        set_move_engine('numpy')
+        self.addCleanup(set_move_engine, previous)
+
+
+# ---------------------------------------------------------------------------
+# Legal-move cache tests
+# ---------------------------------------------------------------------------
+
+class LegalMoveCacheTestCase(TestCase):
+    """LegalMoveCache: LRU keyed by position hash, config fingerprint and piece."""
+
+    def setUp(self):
+        self.config = load_config(None)
+        self.board = build_initial_board(self.config)
+        self.cache = LegalMoveCache(maxsize=4)
+
+    def test_repeat_query_is_a_hit_with_same_answer(self):
+        first = self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white')
+        second = self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white')
+        self.assertEqual(first, second)
+        self.assertEqual(set(first), set(get_legal_moves(self.board, (-5, 10), self.config, 'white')))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+        # Callers get their own list
+        first.clear()
+        self.assertTrue(self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white'))
+
+    def test_board_mutation_changes_the_key(self):
+        before = self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white')
+        self.board.set(-5, 9, 'pawn', 'black', hp=4)
+        after = self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertIn((-5, 9), before)
+        self.assertNotIn((-5, 9), after)
+
+        # Reverting the mutation restores the hash - and the cached answer
+        self.board.remove(-5, 9)
+        self.assertEqual(self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white'), before)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_config_change_changes_the_key(self):
+        slow = copy.deepcopy(self.config)
+        slow['units']['pawn']['move'] = 1
+        self.cache.get_legal_moves(self.board, (-5, 10), self.config, 'white')
+        moves = self.cache.get_legal_moves(self.board, (-5, 10), slow, 'white')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertTrue(all(hex_distance((-5, 10), m) == 1 for m in moves))
+        self.assertEqual(config_fingerprint(self.config), config_fingerprint(load_config(None)))
+
+    def test_lru_eviction(self):
+        pawns = [(-7, 10), (-6, 10), (-5, 10), (-4, 10), (-3, 10)]
+        for coord in pawns:
+            self.cache.get_legal_moves(self.board, coord, self.config, 'white')
+        stats = self.cache.stats()
+        self.assertEqual((stats['size'], stats['evictions']), (4, 1))
+        self.cache.get_legal_moves(self.board, pawns[-1], self.config, 'white')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.cache.get_legal_moves(self.board, pawns[0], self.config, 'white')
+        self.assertEqual(self.cache.stats()['misses'], 6)  # oldest was evicted
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats(), {'size': 0, 'maxsize': 4, 'hits': 0, 'misses': 0, 'evictions': 0})
+
+
 # ---------------------------------------------------------------------------
 # Game logic tests
 # ---------------------------------------------------------------------------
@@ -432,6 +954,74 @@ class GameLogicTestCase(TestCase):
         self.assertTrue(result['defender_eliminated'])
         self.assertTrue(result['moved'])
 
+    def test_engine_accepts_compiled_config(self):
+        raw = self._cfg()
+        compiled = compile_config(raw)
+        for config in (raw, compiled):
+            board = build_initial_board(config)
+            self.assertEqual(board.piece_count, 26)
+            self.assertEqual(
+                {c: set(m) for c, m in get_all_legal_moves(board, 'white', config).items()},
+                {c: set(m) for c, m in get_all_legal_moves(board, 'white', raw).items()},
+            )
+            board.set(-5, 9, 'pawn', 'black', hp=4, max_hp=4)
+            result = resolve_combat(board, (-5, 10), (-5, 9), config)
+            self.assertEqual(result['damage_dealt'], 2)  # pawn attack
+            self.assertEqual(result['defender_hp'], 2)
+            self.assertTrue(has_any_legal_move(board, 'black', config))
+
+    def test_make_unmake_restores_eliminated_defender(self):
+        board = HexBoard(5)
+        board.set(0, 0, 'queen', 'white', hp=8, max_hp=8)
+        board.set_cell(1, 0, {'unit_id': 'pawn', 'color': 'black', 'hp': 4, 'max_hp': 4, 'tag': 'x'})
+        defender = board.get(1, 0)
+        before = copy.deepcopy(board.to_dict())
+        config = self._cfg()
+
+        result, undo = make_move(board, (0, 0), (1, 0), config)
+        self.assertTrue(result['defender_eliminated'])
+        unmake_move(board, undo)
+
+        self.assertEqual(board.to_dict(), before)
+        self.assertIs(board.get(1, 0), defender)
+        self.assertEqual(board.zobrist_hash, board.compute_zobrist_hash())
+
+        # Kept instead: the move stands and journalling stops.
+        result, undo = make_move(board, (0, 0), (1, 0), config)
+        keep_move(board, undo)
+        kept = board.get(1, 0)
+        assert kept is not None
+        self.assertEqual(kept['unit_id'], 'queen')
+        self.assertIsNone(board._journal)
+        with self.assertRaises(ValueError):
+            unmake_move(board, undo)
+
+    def test_make_unmake_as_search_stack(self):
+        config = self._cfg()
+        board = build_initial_board(config)
+        before = copy.deepcopy(board.to_dict())
+        h = board.zobrist_hash
+        stack = []
+        color = 'white'
+        for _ in range(6):
+            coord, _cell = next(board.iter_pieces(color))
+            moves = get_legal_moves(board, coord, config, color)
+            if moves:
+                stack.append(make_move(board, coord, moves[-1], config)[1])
+            color = 'black' if color == 'white' else 'white'
+        self.assertNotEqual(board.zobrist_hash, h)
+        while stack:
+            unmake_move(board, stack.pop())
+        self.assertEqual(board.to_dict(), before)
+        self.assertEqual(board.zobrist_hash, h)
+
+    def test_make_move_failure_leaves_board_untouched(self):
+        board = HexBoard(5)
+        board.set(0, 0, 'queen', 'white', hp=8)
+        with self.assertRaises(ValueError):
+            make_move(board, (2, 2), (1, 0), self._cfg())
+        self.assertIsNone(board._journal)
+
     # -- is_attacked --------------------------------------------------------
 
     def test_is_attacked_within_move_range(self):
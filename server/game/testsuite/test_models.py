@@ -1,4 +1,6 @@
-from django.test import TestCase
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 from datetime import timedelta
 import uuid
@@ -36,3 +38,216 @@ class GameModelsTestCase(TestCase):
             status='online',
         )
         self.assertIn(username, str(conn))
+
+    def test_game_config_blob_dedupes_identical_configs(self):
+        GameRoom: Any = apps.get_model('game', 'GameRoom')
+        GameState: Any = apps.get_model('game', 'GameState')
+        GameConfigBlob: Any = apps.get_model('game', 'GameConfigBlob')
+        from game.engine.config_loader import compile_config, load_config
+
+        states = []
+        for _ in range(3):
+            room = GameRoom.objects.create(host='alice', opponent='bob')
+            states.append(GameState.objects.create(
+                game=room, current_turn='alice', player_white='alice', player_black='bob',
+                config_blob=GameConfigBlob.intern(load_config(None)),
+            ))
+        # A compiled config with the same content resolves to the same row
+        self.assertEqual(GameConfigBlob.intern(compile_config(load_config(None))), states[0].config_blob)
+        self.assertEqual(GameConfigBlob.objects.count(), 1)
+
+        state = GameState.objects.get(pk=states[1].pk)
+        self.assertEqual(state.config_snapshot, load_config(None))
+        self.assertEqual(state.config_hash, compile_config(load_config(None)).fingerprint)
+
+    def test_config_snapshot_is_empty_without_blob(self):
+        GameRoom: Any = apps.get_model('game', 'GameRoom')
+        GameState: Any = apps.get_model('game', 'GameState')
+        room = GameRoom.objects.create(host='alice', opponent='bob')
+        state = GameState.objects.create(game=room, current_turn='alice', player_white='alice', player_black='bob')
+        self.assertEqual(state.config_snapshot, {})
+        self.assertEqual(state.config_hash, '')
+
+    def test_move_log_round_trips_move_records(self):
+        GameRoom: Any = apps.get_model('game', 'GameRoom')
+        GameState: Any = apps.get_model('game', 'GameState')
+        GameMove: Any = apps.get_model('game', 'GameMove')
+        room = GameRoom.objects.create(host='alice', opponent='bob')
+        state = GameState.objects.create(game=room, current_turn='alice', player_white='alice', player_black='bob')
+        records = [
+            {'from': '0,1', 'to': '0,0', 'unit_id': 'rook', 'color': 'black', 'turn': 2, 'captured': 'pawn',
+             'attacked': True, 'damage_dealt': 4, 'defender_eliminated': True, 'moved': True},
+            {'from': '0,2', 'to': '0,1', 'unit_id': 'pawn', 'color': 'white', 'turn': 1, 'captured': None,
+             'attacked': True, 'damage_dealt': 1, 'defender_eliminated': False, 'moved': False,
+             'defender_hp': 3},
+        ]
+        GameMove.objects.bulk_create(GameMove.from_record(state.pk, r) for r in records)
+
+        self.assertEqual(GameState.objects.get(pk=state.pk).move_history, records[::-1])  # play order
+        fetch, read = self.assertNumQueries(2), self.assertNumQueries(0)
+        assert fetch is not None and read is not None
+        with fetch:
+            prefetched = GameState.objects.prefetch_related('moves').get(pk=state.pk)
+        with read:
+            self.assertEqual(len(prefetched.move_history), 2)
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Runs each test from the ``before`` migration state, and leaves the
+    database fully migrated again."""
+
+    before: Any = []
+    after: Any = []
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.before)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _apps(self, targets) -> Any:
+        """The historical app registry at *targets*."""
+        return self.executor.loader.project_state(targets).apps
+
+
+class CustomConfigMigrationTestCase(MigrationTestCase):
+    """0011 moves GameRoom.custom_config JSON into shared GameConfigBlob rows."""
+
+    before = [('game', '0010_board_deltas')]
+    after = [('game', '0011_gameroom_custom_config_blob')]
+
+    def test_custom_configs_share_blobs_and_are_restorable(self):
+        old_apps = self._apps(self.before)
+        GameRoom = old_apps.get_model('game', 'GameRoom')
+        GameState = old_apps.get_model('game', 'GameState')
+        GameConfigBlob = old_apps.get_model('game', 'GameConfigBlob')
+        from game.engine.config_loader import config_fingerprint
+
+        custom = {'version': '1.0', 'board': {'radius': 5}}
+        # g0 already started on it: the rooms reuse its game's blob
+        blob = GameConfigBlob.objects.create(fingerprint=config_fingerprint(custom), config=custom)
+        started = GameRoom.objects.create(game_id='g0', host='a', opponent='b', custom_config=custom)
+        GameState.objects.create(game=started, current_turn='a', player_white='a', player_black='b',
+                                 config_blob=blob)
+        GameRoom.objects.create(game_id='g1', host='a', opponent='b', custom_config=dict(reversed(custom.items())))
+        GameRoom.objects.create(game_id='g2', host='a', opponent='b')
+
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.after)
+        new_apps = self._apps(self.after)
+        GameRoom = new_apps.get_model('game', 'GameRoom')
+        self.assertEqual(new_apps.get_model('game', 'GameConfigBlob').objects.count(), 1)
+        configs = dict(GameRoom.objects.values_list('pk', 'custom_config_blob__config'))
+        self.assertEqual(configs, {'g0': custom, 'g1': custom, 'g2': None})
+
+        # And back again
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.before)
+        GameRoom = self._apps(self.before).get_model('game', 'GameRoom')
+        self.assertEqual(GameRoom.objects.get(pk='g1').custom_config, custom)
+        self.assertEqual(GameRoom.objects.get(pk='g2').custom_config, {})
+
+
+class BoardDeltaMigrationTestCase(MigrationTestCase):
+    """0010 adds per-move board deltas on top of a GameState board snapshot."""
+
+    before = [('game', '0009_gamemove_move_log')]
+    after = [('game', '0010_board_deltas')]
+
+    def test_existing_boards_become_snapshots_and_deltas_fold_back(self):
+        old_apps = self._apps(self.before)
+        GameRoom = old_apps.get_model('game', 'GameRoom')
+        GameState = old_apps.get_model('game', 'GameState')
+        pawn = {'unit_id': 'pawn', 'color': 'white', 'hp': 1}
+        room = GameRoom.objects.create(game_id='g0', host='a', opponent='b')
+        GameState.objects.create(game=room, current_turn='a', player_white='a', player_black='b',
+                                 turn_number=3, board_state={'0,2': pawn})
+
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.after)
+        new_apps = self._apps(self.after)
+        GameState = new_apps.get_model('game', 'GameState')
+        self.assertEqual(GameState.objects.get(pk='g0').snapshot_turn, 3)
+        new_apps.get_model('game', 'GameMove').objects.create(
+            game_id='g0', ply=3, from_coord='0,2', to_coord='0,1', unit_id='pawn', color='white',
+            delta={'0,2': None, '0,1': pawn},
+        )
+
+        # Going back, the board must include the move the snapshot predates
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.before)
+        GameState = self._apps(self.before).get_model('game', 'GameState')
+        self.assertEqual(GameState.objects.get(pk='g0').board_state, {'0,1': pawn})
+
+
+class MoveLogMigrationTestCase(MigrationTestCase):
+    """0009 splits GameState.move_history JSON into GameMove rows."""
+
+    before = [('game', '0008_gameconfigblob_dedupe_config_snapshots')]
+    after = [('game', '0009_gamemove_move_log')]
+
+    def test_histories_become_rows_and_back(self):
+        old_apps = self._apps(self.before)
+        GameRoom = old_apps.get_model('game', 'GameRoom')
+        GameState = old_apps.get_model('game', 'GameState')
+        history = [
+            {'from': '0,2', 'to': '0,1', 'unit_id': 'pawn', 'color': 'white', 'turn': 1, 'captured': None,
+             'attacked': False, 'damage_dealt': 0, 'defender_eliminated': False, 'moved': True},
+            {'from': '0,-2', 'to': '0,1', 'unit_id': 'rook', 'color': 'black', 'turn': 2, 'captured': None,
+             'attacked': True, 'damage_dealt': 2, 'defender_eliminated': False, 'moved': False,
+             'defender_hp': 4},
+        ]
+        for n, moves in enumerate([history, []]):
+            room = GameRoom.objects.create(game_id=f'g{n}', host='a', opponent='b')
+            GameState.objects.create(game=room, current_turn='a', player_white='a', player_black='b',
+                                     move_history=moves)
+
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.after)
+        GameMove = self._apps(self.after).get_model('game', 'GameMove')
+        self.assertEqual(list(GameMove.objects.values_list('game_id', 'ply', 'defender_hp')),
+                         [('g0', 1, None), ('g0', 2, 4)])
+
+        # And back again
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.before)
+        GameState = self._apps(self.before).get_model('game', 'GameState')
+        self.assertEqual(GameState.objects.get(pk='g0').move_history, history)
+        self.assertEqual(GameState.objects.get(pk='g1').move_history, [])
+
+
+class ConfigBlobMigrationTestCase(MigrationTestCase):
+    """0008 moves per-game config_snapshot JSON into shared GameConfigBlob rows."""
+
+    before = [('game', '0007_playerconnection_secret')]
+    after = [('game', '0008_gameconfigblob_dedupe_config_snapshots')]
+
+    def test_snapshots_are_deduplicated_and_restorable(self):
+        old_apps = self._apps(self.before)
+        GameRoom = old_apps.get_model('game', 'GameRoom')
+        GameState = old_apps.get_model('game', 'GameState')
+        default = {'version': '1.0', 'board': {'radius': 11}}
+        custom = {'version': '1.0', 'board': {'radius': 5}}
+        for n, snapshot in enumerate([default, custom, dict(reversed(default.items())), {}]):
+            room = GameRoom.objects.create(game_id=f'g{n}', host='a', opponent='b')
+            GameState.objects.create(game=room, current_turn='a', player_white='a', player_black='b',
+                                     config_snapshot=snapshot)
+
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.after)
+        new_apps = self._apps(self.after)
+        GameState = new_apps.get_model('game', 'GameState')
+        GameConfigBlob = new_apps.get_model('game', 'GameConfigBlob')
+        self.assertEqual(GameConfigBlob.objects.count(), 2)
+        blobs = dict(GameState.objects.values_list('pk', 'config_blob__config'))
+        self.assertEqual(blobs, {'g0': default, 'g1': custom, 'g2': default, 'g3': None})
+
+        # And back again
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.before)
+        GameState = self._apps(self.before).get_model('game', 'GameState')
+        self.assertEqual(GameState.objects.get(pk='g1').config_snapshot, custom)
+        self.assertEqual(GameState.objects.get(pk='g2').config_snapshot, default)
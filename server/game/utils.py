@@ -4,34 +4,171 @@ Shared utilities for game consumer operations
 import json
 import logging
 from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
 from django.utils import timezone
 from django.core.cache import cache
 
+from . import wire
+
+if TYPE_CHECKING:
+    import orjson
+    import msgspec
+    import ujson
+else:
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional
+        orjson = None
+
+    try:
+        import msgspec
+    except ImportError:  # pragma: no cover - optional
+        msgspec = None
+
+    try:
+        import ujson
+    except ImportError:  # pragma: no cover - optional
+        ujson = None
+
 logger = logging.getLogger('game')
 
 
+# ==================== JSON codec ====================
+#
+# Every JSON frame in and out of the consumer layer - inbound parsing,
+# responses, pre-encoded broadcasts and structured logs - goes through
+# encode_json / decode_json, backed by the fastest codec installed:
+# orjson, then msgspec, then ujson, then the stdlib. All of them produce
+# compact JSON that decodes to the same values; the stored config
+# fingerprints (config_loader.config_fingerprint) deliberately stay on the
+# stdlib, whose canonical form they were hashed from.
+# ``manage.py bench_json_codecs`` compares them on game_state_update payloads.
+
+class JsonDecodeError(ValueError):
+    """Text handed to decode_json is not valid JSON (whatever the codec)."""
+
+
+class JsonCodec(NamedTuple):
+    name: str
+    # (obj, default) -> str; default(obj) is called for unserialisable values
+    dumps: Callable[[Any, Optional[Callable[[Any], Any]]], str]
+    # str | bytes -> obj
+    loads: Callable[[Any], Any]
+    # exceptions loads raises for malformed input
+    errors: Tuple[Type[Exception], ...]
+
+
+def _stdlib_codec() -> JsonCodec:
+    def dumps(obj, default=None):
+        return json.dumps(obj, default=default, separators=(',', ':'), ensure_ascii=False)
+    return JsonCodec('json', dumps, json.loads, (ValueError, RecursionError))
+
+
+def _orjson_codec() -> JsonCodec:
+    option = orjson.OPT_NON_STR_KEYS  # int keys become strings, as with json.dumps
+
+    def dumps(obj, default=None):
+        return orjson.dumps(obj, default=default, option=option).decode()
+    return JsonCodec('orjson', dumps, orjson.loads, (ValueError,))
+
+
+def _msgspec_codec() -> JsonCodec:
+    encoder = msgspec.json.Encoder()
+
+    def dumps(obj, default=None):
+        if default is None:
+            return encoder.encode(obj).decode()
+        return msgspec.json.encode(obj, enc_hook=default).decode()
+    return JsonCodec('msgspec', dumps, msgspec.json.Decoder().decode, (msgspec.DecodeError, ValueError))
+
+
+def _ujson_codec() -> JsonCodec:
+    def dumps(obj, default=None):
+        return ujson.dumps(obj, default=default, ensure_ascii=False, escape_forward_slashes=False)
+    return JsonCodec('ujson', dumps, ujson.loads, (ValueError,))
+
+
+# Available codecs, fastest first
+JSON_CODECS: Dict[str, JsonCodec] = {
+    codec.name: codec for codec in (
+        _orjson_codec() if orjson is not None else None,
+        _msgspec_codec() if msgspec is not None else None,
+        _ujson_codec() if ujson is not None else None,
+        _stdlib_codec(),
+    ) if codec is not None
+}
+_KNOWN_CODECS = ('orjson', 'msgspec', 'ujson', 'json')
+
+_codec = next(iter(JSON_CODECS.values()))
+
+
+def set_json_codec(name: str) -> None:
+    """Select the JSON codec process-wide; 'auto' picks the fastest installed.
+
+    A known codec that isn't installed falls back to 'auto' with a warning.
+    """
+    global _codec
+    if name == 'auto':
+        _codec = next(iter(JSON_CODECS.values()))
+    elif name in JSON_CODECS:
+        _codec = JSON_CODECS[name]
+    elif name in _KNOWN_CODECS:
+        _codec = next(iter(JSON_CODECS.values()))
+        logger.warning(f"JSON codec {name!r} is not installed - using {_codec.name!r}")
+    else:
+        raise ValueError(f"Unknown JSON codec {name!r}; choose from {['auto', *_KNOWN_CODECS]}")
+
+
+def get_json_codec() -> str:
+    """Name of the currently selected JSON codec."""
+    return _codec.name
+
+
+def encode_json(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialise *obj* to JSON text with the selected codec."""
+    return _codec.dumps(obj, default)
+
+
+def decode_json(data: Any) -> Any:
+    """Parse JSON text (str or UTF-8 bytes); raises JsonDecodeError."""
+    codec = _codec
+    try:
+        return codec.loads(data)
+    except codec.errors as e:
+        raise JsonDecodeError(str(e)) from e
+
+
+
+_LOG_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+
+
 def structured_log(level: str, event: str, **kwargs) -> None:
     """Log a structured JSON message to the game logger.
 
+    The timestamp and JSON are only built if the logger has *level*
+    enabled, so a disabled debug call on a hot path costs one cached
+    level check.
+
     Args:
         level: Log level as string ('info','warning','error','debug')
         event: Short event name
         kwargs: Additional context to include
     """
+    levelno = _LOG_LEVELS.get(level, logging.DEBUG)
+    if not logger.isEnabledFor(levelno):
+        return
     payload = {'event': event, 'ts': timezone.now().isoformat()}
     payload.update(kwargs)
     try:
-        text = json.dumps(payload, default=str)
+        text = encode_json(payload, default=str)
     except Exception:
         text = str(payload)
-    if level == 'info':
-        logger.info(text)
-    elif level == 'warning':
-        logger.warning(text)
-    elif level == 'error':
-        logger.error(text)
-    else:
-        logger.debug(text)
+    logger.log(levelno, text)
 
 
 def get_idempotency(key: str):
@@ -55,16 +192,59 @@ def set_idempotency(key: str, value, timeout: int = 60):
         logger.warning(f'Idempotency cache set failed: {e}')
 
 
+def uses_msgpack(consumer) -> bool:
+    """Did the consumer's client negotiate the MessagePack wire format?"""
+    return getattr(consumer, 'wire_format', 'json') == 'msgpack'
+
+
 async def send_json_response(consumer, data: dict) -> None:
     """
-    Send a JSON response to a WebSocket consumer
+    Send a response to a WebSocket consumer - a JSON text frame, or a
+    MessagePack binary frame if its client negotiated that (see wire.py)
     
     Args:
         consumer: AsyncWebsocketConsumer instance
-        data: Dictionary to send as JSON
+        data: Dictionary to send
+    """
+    try:
+        if uses_msgpack(consumer):
+            await consumer.send(bytes_data=wire.pack_message(data))
+        else:
+            await consumer.send(text_data=encode_json(data))
+    except Exception as e:
+        logger.error(f"Error sending response to {consumer.channel_name}: {e}")
+
+
+def encode_frames(message: dict) -> dict:
+    """
+    Encode a message once, for sending to many consumers
+
+    The MessagePack frame is packed from the message too, but only while
+    the subprotocol is enabled (wire.enabled) - otherwise no client can
+    have negotiated it.
+
+    Returns:
+        {'text': JSON text frame, 'binary': MessagePack frame (if enabled)}
+    """
+    frames: Dict[str, Any] = {'text': encode_json(message)}
+    if wire.enabled():
+        frames['binary'] = wire.pack_message(message)
+    return frames
+
+
+async def send_frames(consumer, frames: dict) -> None:
+    """
+    Send pre-encoded frames (see encode_frames) in the consumer's wire format
+
+    Args:
+        consumer: AsyncWebsocketConsumer instance
+        frames: The message, already encoded by encode_frames
     """
     try:
-        await consumer.send(text_data=json.dumps(data))
+        if uses_msgpack(consumer):
+            await consumer.send(bytes_data=frames['binary'])
+        else:
+            await consumer.send(text_data=frames['text'])
     except Exception as e:
         logger.error(f"Error sending response to {consumer.channel_name}: {e}")
 
@@ -88,17 +268,34 @@ async def send_error(consumer, code: str, message: str) -> None:
 async def broadcast_to_group(channel_layer, group_name: str, message: dict) -> None:
     """
     Broadcast a message to all members of a group
-    
+
+    The message is encoded once here (encode_frames); every member forwards
+    the same frame (GameConsumer.broadcast_message) instead of re-encoding
+    it.
+
     Args:
         channel_layer: The channel layer
         group_name: Name of the group (e.g., 'game_lobby')
         message: Message dictionary to broadcast
     """
+    await group_send_event(channel_layer, group_name, {
+        'type': 'broadcast_message',
+        'frames': encode_frames(message)
+    })
+
+
+async def group_send_event(channel_layer, group_name: str, event: dict) -> None:
+    """
+    Send a raw channel-layer event to a group, logging rather than raising
+    on failure (like broadcast_to_group)
+
+    Args:
+        channel_layer: The channel layer
+        group_name: Name of the group
+        event: Event dictionary; its 'type' names the consumer handler
+    """
     try:
-        await channel_layer.group_send(group_name, {
-            'type': 'broadcast_message',
-            'data': message
-        })
+        await channel_layer.group_send(group_name, event)
     except Exception as e:
         logger.error(f"Error broadcasting to {group_name}: {e}")
 
@@ -11,22 +11,6 @@ class ValidationError(Exception):
         super().__init__(message)
 
 
-def validate_required_fields(data: dict, required_fields: list) -> None:
-    """
-    Validate that all required fields are present in data
-    
-    Args:
-        data: Dictionary to validate
-        required_fields: List of field names that must be present
-        
-    Raises:
-        ValidationError: If any required field is missing
-    """
-    for field in required_fields:
-        if field not in data or data[field] is None:
-            raise ValidationError('MISSING_FIELD', f'Missing required field: {field}')
-
-
 def validate_username(username: str) -> None:
     """
     Validate username format and length
@@ -115,3 +99,17 @@ def validate_chat_message(content: str) -> None:
     
     if len(content) > 1000:
         raise ValidationError('MESSAGE_TOO_LONG', 'Message cannot exceed 1000 characters')
+
+
+def validate_reveal_action(action: str) -> None:
+    """
+    Validate a reveal mode request action
+    
+    Args:
+        action: Requested action (already lowercased)
+        
+    Raises:
+        ValidationError: If action is invalid
+    """
+    if action not in ('enable', 'disable'):
+        raise ValidationError('INVALID_ACTION', 'Action must be enable or disable')
@@ -0,0 +1,198 @@
+"""
+MessagePack wire format - a binary alternative to the JSON protocol.
+
+When ``settings.GAME_MSGPACK_WIRE`` is on, a client selects it by offering
+the ``SUBPROTOCOL`` WebSocket subprotocol when it connects; clients that
+don't keep getting JSON text frames, served side by side from the same
+broadcasts (see utils.encode_frames). Every
+message is then a MessagePack map sent as a binary frame, in both
+directions, with the same keys as its JSON form. The board-heavy fields are
+recast so the common case is a handful of fixints instead of quoted keys:
+
+  coordinate      "q,r"                       -> [q, r]
+  cell            {unit_id, color, hp, max_hp, ...}
+                                              -> [q, r, unit_id, side, hp, max_hp]
+                  side is 0 (white) or 1 (black); hp and max_hp are nil
+                  when the cell has none; any other cell fields follow as
+                  a trailing map
+  boardState      {"q,r": cell, ...}          -> [cell, ...]
+  changes         {"q,r": cell | null, ...}   -> [cell | [q, r], ...]
+                  (a bare [q, r] is a hex the move emptied)
+  legalMoves      {"q,r": ["q,r", ...], ...}  -> [[q, r, q1, r1, q2, r2, ...], ...]
+  'from'/'to' of the message itself (make_move) and of the move and
+  moveHistory records                         -> [q, r]
+
+``unpack_message`` undoes all of the above. Client messages only ever
+carry their own 'from'/'to' (make_move, either way), so the server reads
+them with the cheaper ``unpack_request``; handlers see exactly what the
+JSON path gives them.
+
+The format buys size, not speed: frames come out roughly a third smaller
+than the JSON text, but with the compaction done in Python, packing and
+unpacking cost more than the orjson JSON path (``manage.py
+bench_json_codecs`` measures both). Hence the setting, off by default.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import msgpack
+from django.conf import settings
+
+from .engine.board import coord_key, parse_coord
+
+SUBPROTOCOL = 'chesspp.msgpack.v1'
+
+_SIDES = ('white', 'black')
+_SIDE_INDEX = {name: i for i, name in enumerate(_SIDES)}
+_CELL_FIELDS = frozenset({'unit_id', 'color', 'hp', 'max_hp'})
+
+
+class WireDecodeError(ValueError):
+    """An inbound binary frame is not a valid MessagePack map."""
+
+
+def enabled() -> bool:
+    """Is the subprotocol offered to clients (settings.GAME_MSGPACK_WIRE)?"""
+    return getattr(settings, 'GAME_MSGPACK_WIRE', False)
+
+
+# -- Compact forms ----------------------------------------------------------
+
+@lru_cache(maxsize=16384)  # every hex of the largest board, several times over
+def _pair(key: str) -> Tuple[int, int]:
+    """'q,r' -> (q, r), packed as a two-element array."""
+    return parse_coord(key)
+
+
+def _cell_row(key: str, cell: Dict[str, Any]) -> List[Any]:
+    q, r = _pair(key)
+    color = cell['color']
+    row = [q, r, cell['unit_id'], _SIDE_INDEX.get(color, color), cell.get('hp'), cell.get('max_hp')]
+    if len(cell) > 2 + ('hp' in cell) + ('max_hp' in cell):
+        row.append({k: v for k, v in cell.items() if k not in _CELL_FIELDS})
+    return row
+
+
+def _row_cell(row: List[Any]) -> Dict[str, Any]:
+    side = row[3]
+    cell: Dict[str, Any] = {'unit_id': row[2], 'color': _SIDES[side] if isinstance(side, int) else side}
+    if row[4] is not None:
+        cell['hp'] = row[4]
+    if row[5] is not None:
+        cell['max_hp'] = row[5]
+    if len(row) > 6:
+        cell.update(row[6])
+    return cell
+
+
+def _key(value: Any) -> Any:
+    """[q, r] -> "q,r"; anything else is left for the handler to reject."""
+    if (isinstance(value, list) and len(value) == 2
+            and all(isinstance(n, int) and not isinstance(n, bool) for n in value)):
+        return coord_key(value[0], value[1])
+    return value
+
+
+def _compact_move(record: Any) -> Any:
+    if not isinstance(record, dict):
+        return record
+    out = dict(record)
+    for field in ('from', 'to'):
+        if isinstance(out.get(field), str):
+            out[field] = _pair(out[field])
+    return out
+
+
+def _restore_move(record: Any) -> Any:
+    if not isinstance(record, dict):
+        return record
+    out = dict(record)
+    for field in ('from', 'to'):
+        if field in out:
+            out[field] = _key(out[field])
+    return out
+
+
+def compact_message(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The message with its board-heavy fields in compact form (a shallow
+    copy - *data* is not modified)."""
+    out = _compact_move(data)  # make_move's own 'from'/'to'
+    board = out.get('boardState')
+    if isinstance(board, dict):
+        out['boardState'] = [_cell_row(key, cell) for key, cell in board.items()]
+    changes = out.get('changes')
+    if isinstance(changes, dict):
+        out['changes'] = [_cell_row(key, cell) if cell is not None else _pair(key)
+                          for key, cell in changes.items()]
+    legal = out.get('legalMoves')
+    if isinstance(legal, dict):
+        rows = []
+        for src, dests in legal.items():
+            row = list(_pair(src))
+            for dst in dests:
+                row.extend(_pair(dst))
+            rows.append(row)
+        out['legalMoves'] = rows
+    if 'move' in out:
+        out['move'] = _compact_move(out['move'])
+    history = out.get('moveHistory')
+    if isinstance(history, list):
+        out['moveHistory'] = [_compact_move(record) for record in history]
+    return out
+
+
+def restore_message(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of ``compact_message``."""
+    out = _restore_move(data)
+    board = out.get('boardState')
+    if isinstance(board, list):
+        out['boardState'] = {coord_key(row[0], row[1]): _row_cell(row) for row in board}
+    changes = out.get('changes')
+    if isinstance(changes, list):
+        out['changes'] = {coord_key(row[0], row[1]): _row_cell(row) if len(row) > 2 else None
+                          for row in changes}
+    legal = out.get('legalMoves')
+    if isinstance(legal, list):
+        out['legalMoves'] = {
+            coord_key(row[0], row[1]): [coord_key(row[i], row[i + 1]) for i in range(2, len(row), 2)]
+            for row in legal
+        }
+    if 'move' in out:
+        out['move'] = _restore_move(out['move'])
+    history = out.get('moveHistory')
+    if isinstance(history, list):
+        out['moveHistory'] = [_restore_move(record) for record in history]
+    return out
+
+
+# -- Frames -----------------------------------------------------------------
+
+def pack_message(data: Dict[str, Any]) -> bytes:
+    """Encode an outbound message as a binary frame."""
+    return cast(bytes, msgpack.packb(compact_message(data), use_bin_type=True))
+
+
+def _unpack(frame: bytes, restore) -> Dict[str, Any]:
+    try:
+        data: Optional[Any] = msgpack.unpackb(frame, raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise WireDecodeError(str(e)) from e
+    if not isinstance(data, dict):
+        raise WireDecodeError('Message must be a map')
+    try:
+        return restore(data)
+    except (IndexError, KeyError, TypeError, ValueError) as e:
+        raise WireDecodeError(f'Malformed compact field: {e}') from e
+
+
+def unpack_message(frame: bytes) -> Dict[str, Any]:
+    """Decode a binary frame into the message dict the JSON path would give."""
+    return _unpack(frame, restore_message)
+
+
+def unpack_request(frame: bytes) -> Dict[str, Any]:
+    """``unpack_message`` for a client's frame, which has no compact field
+    but its own 'from'/'to'."""
+    return _unpack(frame, _restore_move)
@@ -37,12 +37,19 @@ export const RESIGN               = 'resign';
 export const OFFER_DRAW           = 'offer_draw';
 export const RESPOND_DRAW         = 'respond_draw';
 export const REQUEST_GAME_STATE   = 'request_game_state';
+export const REQUEST_CONFIG       = 'request_config';
 
 // -- Server -> Client broadcasts -------------------------------------------
 export const GAME_STATE_UPDATE    = 'game_state_update';
+export const GAME_CONFIG          = 'game_config';
 export const GAME_STARTED         = 'game_started';
 export const GAME_OVER            = 'game_over';
 export const MOVE_MADE            = 'move_made';
 export const DRAW_OFFERED         = 'draw_offered';
 export const DRAW_RESPONSE        = 'draw_response';
 export const INVALID_MOVE         = 'invalid_move';
+
+// -- Wire format -----------------------------------------------------------
+// WebSocket subprotocol selecting MessagePack binary frames instead of JSON
+// text (see server/game/wire.py for the compact board/coordinate forms).
+export const MSGPACK_SUBPROTOCOL  = 'chesspp.msgpack.v1';